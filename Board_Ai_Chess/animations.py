@@ -8,14 +8,14 @@ def animate_move(sr, sc, tr, tc, chip, steps=10):
     - 玩家棋子：显示棋子原色
     - AI 棋子：统一显示黄色（隐藏等级信息）
     """
-    from board import board, draw_board
+    from board import state, draw_board
     
     start_x, start_y = sc * CELL_SIZE, sr * CELL_SIZE
     end_x, end_y = tc * CELL_SIZE, tr * CELL_SIZE
     
     # 临时移除起点的棋子，避免重复绘制
-    temp_chip = board[sr][sc]
-    board[sr][sc] = None
+    temp_chip = state.board[sr][sc]
+    state.board[sr][sc] = None
     
     for i in range(1, steps + 1):
         # 重绘整个棋盘
@@ -37,7 +37,7 @@ def animate_move(sr, sc, tr, tc, chip, steps=10):
         pygame.time.delay(25)
     
     # 恢复棋子到起点（调用方会处理最终位置）
-    board[sr][sc] = temp_chip
+    state.board[sr][sc] = temp_chip
 
 def animate_attack_failed(sr, sc, tr, tc, attacker, draw_board):
     """
@@ -49,7 +49,7 @@ def animate_attack_failed(sr, sc, tr, tc, attacker, draw_board):
     
     注意：AI 棋子移动时统一显示黄色
     """
-    from board import board
+    from board import state
     
     start_x, start_y = sc * CELL_SIZE, sr * CELL_SIZE
     target_x, target_y = tc * CELL_SIZE, tr * CELL_SIZE
@@ -61,8 +61,8 @@ def animate_attack_failed(sr, sc, tr, tc, attacker, draw_board):
         move_color = (255, 200, 0)  # AI 棋子统一黄色
     
     # 临时移除起点的棋子
-    temp_chip = board[sr][sc]
-    board[sr][sc] = None
+    temp_chip = state.board[sr][sc]
+    state.board[sr][sc] = None
     
     # 第一阶段：冲刺动画（快速移动 80% 距离）
     steps = 8
@@ -103,7 +103,8 @@ def animate_attack_failed(sr, sc, tr, tc, attacker, draw_board):
         pygame.display.flip()
         pygame.time.delay(50)
     
-    # 不恢复棋子（因为攻击失败，棋子已消失）
+    # 恢复棋子到起点（调用方会移除攻击失败的棋子并更新 defeat）
+    state.board[sr][sc] = temp_chip
 
 def animate_athena_fusion(r1, c1, r2, c2, draw_board, flashes=6):
     """雅典娜融合 / 同归于尽特效"""
@@ -1,6 +1,16 @@
 # animations.py
 import pygame
-from settings import SCREEN, CELL_SIZE, CHIP_COLORS, FONT, HEIGHT, WIDTH
+from settings import SCREEN, CELL_SIZE, CHIP_COLORS, FONT, HEIGHT, WIDTH, FPS
+
+def _wait(ms):
+    """等待 ms 毫秒，期间持续处理窗口消息（窗口不会无响应，事件留在队列中由主循环处理）"""
+    end = pygame.time.get_ticks() + ms
+    while True:
+        pygame.event.pump()
+        remaining = end - pygame.time.get_ticks()
+        if remaining <= 0:
+            break
+        pygame.time.delay(min(remaining, 1000 // FPS))
 
 def animate_move(sr, sc, tr, tc, chip, steps=10):
     """
@@ -8,14 +18,14 @@ def animate_move(sr, sc, tr, tc, chip, steps=10):
     - 玩家棋子：显示棋子原色
     - AI 棋子：统一显示黄色（隐藏等级信息）
     """
-    from board import board, draw_board
+    from board import state, draw_board
     
     start_x, start_y = sc * CELL_SIZE, sr * CELL_SIZE
     end_x, end_y = tc * CELL_SIZE, tr * CELL_SIZE
     
     # 临时移除起点的棋子，避免重复绘制
-    temp_chip = board[sr][sc]
-    board[sr][sc] = None
+    temp_chip = state.board[sr][sc]
+    state.board[sr][sc] = None
     
     for i in range(1, steps + 1):
         # 重绘整个棋盘
@@ -34,10 +44,10 @@ def animate_move(sr, sc, tr, tc, chip, steps=10):
         # 绘制移动中的棋子
         pygame.draw.rect(SCREEN, color, (x + 6, y + 6, CELL_SIZE - 12, CELL_SIZE - 12))
         pygame.display.flip()
-        pygame.time.delay(25)
+        _wait(25)
     
     # 恢复棋子到起点（调用方会处理最终位置）
-    board[sr][sc] = temp_chip
+    state.board[sr][sc] = temp_chip
 
 def animate_attack_failed(sr, sc, tr, tc, attacker, draw_board):
     """
@@ -49,7 +59,7 @@ def animate_attack_failed(sr, sc, tr, tc, attacker, draw_board):
     
     注意：AI 棋子移动时统一显示黄色
     """
-    from board import board
+    from board import state
     
     start_x, start_y = sc * CELL_SIZE, sr * CELL_SIZE
     target_x, target_y = tc * CELL_SIZE, tr * CELL_SIZE
@@ -61,8 +71,8 @@ def animate_attack_failed(sr, sc, tr, tc, attacker, draw_board):
         move_color = (255, 200, 0)  # AI 棋子统一黄色
     
     # 临时移除起点的棋子
-    temp_chip = board[sr][sc]
-    board[sr][sc] = None
+    temp_chip = state.board[sr][sc]
+    state.board[sr][sc] = None
     
     # 第一阶段：冲刺动画（快速移动 80% 距离）
     steps = 8
@@ -73,7 +83,7 @@ def animate_attack_failed(sr, sc, tr, tc, attacker, draw_board):
         y = start_y + (target_y - start_y) * progress
         pygame.draw.rect(SCREEN, move_color, (x + 6, y + 6, CELL_SIZE - 12, CELL_SIZE - 12))
         pygame.display.flip()
-        pygame.time.delay(30)
+        _wait(30)
     
     # 第二阶段：撞击闪光（红白闪烁）
     for i in range(6):
@@ -87,7 +97,7 @@ def animate_attack_failed(sr, sc, tr, tc, attacker, draw_board):
         pygame.draw.rect(SCREEN, move_color, (attack_x + 6, attack_y + 6, CELL_SIZE - 12, CELL_SIZE - 12))
         pygame.draw.rect(SCREEN, color, (attack_x + 6, attack_y + 6, CELL_SIZE - 12, CELL_SIZE - 12), 3)
         pygame.display.flip()
-        pygame.time.delay(100)
+        _wait(100)
     
     # 第三阶段：消散动画（逐渐缩小）
     for i in range(8, 0, -1):
@@ -101,9 +111,10 @@ def animate_attack_failed(sr, sc, tr, tc, attacker, draw_board):
             pygame.draw.rect(SCREEN, move_color, 
                            (attack_x + 6 + offset, attack_y + 6 + offset, size, size))
         pygame.display.flip()
-        pygame.time.delay(50)
+        _wait(50)
     
-    # 不恢复棋子（因为攻击失败，棋子已消失）
+    # 恢复棋子到起点（调用方会移除攻击失败的棋子并更新 defeat）
+    state.board[sr][sc] = temp_chip
 
 def animate_athena_fusion(r1, c1, r2, c2, draw_board, flashes=6):
     """雅典娜融合 / 同归于尽特效"""
@@ -113,7 +124,7 @@ def animate_athena_fusion(r1, c1, r2, c2, draw_board, flashes=6):
         pygame.draw.rect(SCREEN, color, (c1 * CELL_SIZE, r1 * CELL_SIZE, CELL_SIZE, CELL_SIZE))
         pygame.draw.rect(SCREEN, color, (c2 * CELL_SIZE, r2 * CELL_SIZE, CELL_SIZE, CELL_SIZE))
         pygame.display.flip()
-        pygame.time.delay(100)
+        _wait(100)
 
 def animate_ai_select(r, c, draw_board, flashes=6):
     """AI 选中棋子的闪光动画（3秒，闪烁6次）"""
@@ -123,7 +134,7 @@ def animate_ai_select(r, c, draw_board, flashes=6):
         color = (255, 255, 0) if i % 2 == 0 else (255, 255, 255)
         pygame.draw.rect(SCREEN, color, (c * CELL_SIZE, r * CELL_SIZE, CELL_SIZE, CELL_SIZE), 5)
         pygame.display.flip()
-        pygame.time.delay(500)  # 每次闪烁持续 500ms，共 3 秒
+        _wait(500)  # 每次闪烁持续 500ms，共 3 秒
 
 def animate_defeat_update(r, c, draw_board, flashes=4):
     """defeat 信息更新闪光提示（2秒，闪烁4次）"""
@@ -133,4 +144,4 @@ def animate_defeat_update(r, c, draw_board, flashes=4):
         color = (255, 0, 0) if i % 2 == 0 else (255, 255, 0)
         pygame.draw.rect(SCREEN, color, (c * CELL_SIZE, r * CELL_SIZE, CELL_SIZE, CELL_SIZE), 5)
         pygame.display.flip()
-        pygame.time.delay(500)  # 每次闪烁持续 500ms，共 2 秒
\ No newline at end of file
+        _wait(500)  # 每次闪烁持续 500ms，共 2 秒
\ No newline at end of file
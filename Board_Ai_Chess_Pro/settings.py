@@ -1,11 +1,18 @@
 # settings.py
+import os
+import sys
 import pygame
 
+# 共享引擎 kof_engine 位于仓库根目录
+_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if _ROOT not in sys.path:
+    sys.path.insert(0, _ROOT)
+from kof_engine.rules import ROWS, COLS, CHIP_NAMES, MAX_TURNS, MAX_IDLE_TURNS
+
 # -------- 基本设置 --------
 pygame.init()
 
 CELL_SIZE = 80
-ROWS, COLS = 5, 6
 WIDTH, HEIGHT = COLS * CELL_SIZE, ROWS * CELL_SIZE
 SCREEN = pygame.display.set_mode((WIDTH, HEIGHT))
 pygame.display.set_caption("Board AI LocalBattle")
@@ -14,7 +21,6 @@ FONT = pygame.font.SysFont(None, 24)
 FPS = 30
 
 # -------- 棋子定义 --------
-CHIP_NAMES = ["orichi", "yagami", "kula", "k", "mai", "kyo", "athena"]
 CHIP_COLORS = {
     "orichi": (255, 0, 0),
     "yagami": (255, 165, 0),
@@ -26,8 +32,17 @@ CHIP_COLORS = {
 }
 
 BACK_COLOR = (50, 50, 50)  # 背面颜色
-MAX_TURNS = 60
 TURN_TIME = 15
 
-# -------- 无动作惩罚设置 --------
-MAX_IDLE_TURNS = 5  # 连续无动作最大回合数
\ No newline at end of file
+# -------- AI 设置 --------
+AI_ENGINE = "ismcts"  # "ismcts": 信息集蒙特卡洛树搜索, "expectimax": 期望极小极大, "heuristic": 单步启发式, "learned": 学习模型
+AI_THINK_TIME = 1.0   # 每步思考时间上限（秒），到时返回目前最佳动作
+AI_NODE_LIMIT = None  # 每步搜索节点上限（ISMCTS 为迭代次数），None 表示只受时间限制
+AI_WORKERS = 1        # ISMCTS 并行进程数，>1 时启用根并行搜索
+AI_SEARCH_DEPTH = 4   # expectimax 迭代加深的最大深度（单方行动为一层）
+AI_PONDER = True      # 玩家思考期间 AI 在后台搜索（单进程 ismcts / expectimax）
+AI_HORIZON_PLIES = 4  # 距回合上限的剩余单方步数不超过该值时精确搜索到上限（0 表示不启用）
+AI_WEIGHTS = os.path.join(_ROOT, "kof_weights.json")  # 启发式评分权重（python -m kof_engine.tune 生成），文件不存在时用默认值
+AI_MODEL = os.path.join(_ROOT, "kof_model.npz")  # learned 使用的模型（python -m kof_engine.learned 训练），文件不存在时退回 heuristic
+AI_OPPONENT_MODEL = os.path.join(_ROOT, "kof_opponent.json")  # 行为模型（python -m kof_engine.opponent 拟合），文件不存在时用内置模型，None 表示不使用
+AI_TABLEBASE = os.path.join(_ROOT, "kof_endgame.tb")  # 残局库（python -m kof_engine.tablebase 生成），文件不存在时不使用
@@ -4,8 +4,7 @@ import socket
 import threading
 import argparse
 from settings import *
-from board import board, defeat_board, random_init, draw_board, can_attack, check_winner, should_update_defeat
-from animations import animate_move, animate_athena_fusion, animate_defeat_update, animate_attack_failed
+from board import state, random_init, draw_board, play_action, check_winner
 from network import send_json, recv_json
 
 class LANClient:
@@ -89,42 +88,23 @@ class LANClient:
             except:
                 pass
 
+# 发送方走子的一方：两端客户端都操作各自本地棋盘上 is_player=True 的棋子
+PEER_SIDE = True
+
 def apply_opponent_move(msg):
-    """应用对方的移动到本地棋盘"""
+    """
+    应用对方的移动到本地棋盘
+    返回: 是否已应用（对发送方不合法说明两端棋盘不同步，不修改棋盘）
+    """
+    if msg["action"] == "idle":
+        return True
     sr, sc = msg["from"]
     tr, tc = msg["to"]
-    action = msg["action"]
-    
-    chip = board[sr][sc]
-    target = board[tr][tc]
-    
-    if action == "move":
-        # 普通移动
-        animate_move(sr, sc, tr, tc, chip)
-        board[tr][tc], board[sr][sc] = chip, None
-        
-    elif action == "attack_success":
-        # 攻击成功
-        if should_update_defeat(chip.defeat, target.name):
-            chip.defeat = target.name
-        animate_move(sr, sc, tr, tc, chip)
-        board[tr][tc], board[sr][sc] = chip, None
-        if "defeat" in msg and msg["defeat"]:
-            animate_defeat_update(tr, tc, draw_board)
-            
-    elif action == "attack_fail":
-        # 攻击失败
-        animate_attack_failed(sr, sc, tr, tc, chip, draw_board)
-        board[sr][sc] = None
-        if "defeat" in msg and msg["defeat"]:
-            if should_update_defeat(target.defeat, chip.name):
-                target.defeat = chip.name
-            animate_defeat_update(tr, tc, draw_board)
-            
-    elif action == "fusion":
-        # Athena 融合
-        animate_athena_fusion(sr, sc, tr, tc, draw_board)
-        board[sr][sc] = board[tr][tc] = None
+    if not state.is_legal(PEER_SIDE, (sr, sc, tr, tc)):
+        print(f"[CLIENT] Desync: illegal move from peer {(sr, sc)} -> {(tr, tc)}")
+        return False
+    play_action(sr, sc, tr, tc, show_defeat=bool(msg.get("defeat")))
+    return True
 
 def main():
     parser = argparse.ArgumentParser(description="LAN Battle Client")
@@ -165,14 +145,9 @@ def main():
     selected = None
     game_over = False
     winner = None
-    turn_count = 0
     turn_timer = TURN_TIME
     last_tick = pygame.time.get_ticks()
     
-    # 无动作惩罚
-    player_idle_count = 0
-    opponent_idle_count = 0
-    
     # 等待对方标志
     waiting_for_peer = (client.current_turn != client.my_side)
     
@@ -180,7 +155,7 @@ def main():
         # 检查是否是我的回合
         is_my_turn = (client.current_turn == client.my_side)
         
-        draw_board(selected, turn_count, turn_timer, game_over, winner, 
+        draw_board(selected, state.turn_count, turn_timer, game_over, winner, 
                    waiting_for_peer, client.my_side, client.current_turn)
         
         if game_over:
@@ -194,19 +169,22 @@ def main():
         msgs = client.get_messages()
         for msg in msgs:
             if msg["type"] == "move":
-                # 对方的移动
-                apply_opponent_move(msg)
+                # 对方的移动（两端不同步时结束对局，不再推进回合）
+                if not apply_opponent_move(msg):
+                    game_over = True
+                    winner = "None (desync)"
+                    break
                 # 切换回合
                 client.current_turn = client.my_side
                 waiting_for_peer = False
-                turn_count += 1
+                state.turn_count += 1
                 turn_timer = TURN_TIME
-                opponent_idle_count = 0
+                state.ai_idle_count = 0  # ai_idle_count 记录对方
                 
                 # 检查游戏结束
-                if turn_count >= MAX_TURNS or \
-                   not any(b and b.is_player for row in board for b in row) or \
-                   not any(b and not b.is_player for row in board for b in row):
+                if state.turn_count >= MAX_TURNS or \
+                   not state.has_chips(True) or \
+                   not state.has_chips(False):
                     game_over = True
                     winner = check_winner()
                     
@@ -227,9 +205,9 @@ def main():
                 if turn_timer <= 0:
                     # 超时，跳过回合
                     selected = None
-                    player_idle_count += 1
+                    state.player_idle_count += 1
                     
-                    if player_idle_count >= MAX_IDLE_TURNS:
+                    if state.player_idle_count >= MAX_IDLE_TURNS:
                         game_over = True
                         winner = "Opponent (You Idle)"
                         continue
@@ -238,7 +216,7 @@ def main():
                     client.send_move([0,0], [0,0], "idle")
                     client.current_turn = "A" if client.my_side == "B" else "B"
                     waiting_for_peer = True
-                    turn_count += 1
+                    state.turn_count += 1
                     turn_timer = TURN_TIME
         
         # 处理玩家输入（仅在自己回合）
@@ -252,68 +230,26 @@ def main():
                     if not (0 <= r < ROWS and 0 <= c < COLS):
                         continue
                     
-                    clicked = board[r][c]
+                    clicked = state.board[r][c]
                     if selected:
                         sr, sc = selected
-                        s_chip = board[sr][sc]
+                        s_chip = state.board[sr][sc]
                         if s_chip is None:
                             selected = None
                             continue
                         
-                        if abs(sr - r) + abs(sc - c) == 1:
-                            target_chip = board[r][c]
-                            action_executed = False
-                            action_type = None
-                            defeat_info = None
-                            
-                            if target_chip is None:
-                                # 移动
-                                animate_move(sr, sc, r, c, s_chip)
-                                board[r][c], board[sr][sc] = s_chip, None
-                                action_type = "move"
-                                action_executed = True
-                                
-                            elif target_chip.is_player != s_chip.is_player:
-                                if s_chip.name == "athena" or target_chip.name == "athena":
-                                    # 融合
-                                    animate_athena_fusion(sr, sc, r, c, draw_board)
-                                    board[sr][sc] = board[r][c] = None
-                                    action_type = "fusion"
-                                    action_executed = True
-                                    
-                                elif can_attack(s_chip, target_chip):
-                                    # 攻击成功
-                                    defeat_updated = should_update_defeat(s_chip.defeat, target_chip.name)
-                                    if defeat_updated:
-                                        s_chip.defeat = target_chip.name
-                                        defeat_info = target_chip.name
-                                    animate_move(sr, sc, r, c, s_chip)
-                                    board[r][c], board[sr][sc] = s_chip, None
-                                    action_type = "attack_success"
-                                    action_executed = True
-                                    
-                                else:
-                                    # 攻击失败
-                                    animate_attack_failed(sr, sc, r, c, s_chip, draw_board)
-                                    board[sr][sc] = None
-                                    defeat_updated = should_update_defeat(target_chip.defeat, s_chip.name)
-                                    if defeat_updated:
-                                        target_chip.defeat = s_chip.name
-                                        defeat_info = s_chip.name
-                                        animate_defeat_update(r, c, draw_board)
-                                    action_type = "attack_fail"
-                                    action_executed = True
+                        if state.is_legal(True, (sr, sc, r, c)):
+                            # 移动 / 攻击 / 融合
+                            action_type, defeat_info = play_action(sr, sc, r, c)
+                            # 发送移动消息
+                            client.send_move([sr, sc], [r, c], action_type, defeat_info)
+                            selected = None
+                            state.player_idle_count = 0
                             
-                            if action_executed:
-                                # 发送移动消息
-                                client.send_move([sr, sc], [r, c], action_type, defeat_info)
-                                selected = None
-                                player_idle_count = 0
-                                
-                                # 切换回合
-                                client.current_turn = "A" if client.my_side == "B" else "B"
-                                waiting_for_peer = True
-                                turn_timer = TURN_TIME
+                            # 切换回合
+                            client.current_turn = "A" if client.my_side == "B" else "B"
+                            waiting_for_peer = True
+                            turn_timer = TURN_TIME
                         else:
                             selected = (r, c) if clicked and clicked.is_player else None
                     else:
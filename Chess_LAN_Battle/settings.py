@@ -1,11 +1,18 @@
 # settings.py (LAN版本)
+import os
+import sys
 import pygame
 
+# 共享引擎 kof_engine 位于仓库根目录
+_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if _ROOT not in sys.path:
+    sys.path.insert(0, _ROOT)
+from kof_engine.rules import ROWS, COLS, CHIP_NAMES, MAX_TURNS, MAX_IDLE_TURNS
+
 # -------- 基本设置 --------
 pygame.init()
 
 CELL_SIZE = 80
-ROWS, COLS = 5, 6
 WIDTH, HEIGHT = COLS * CELL_SIZE, ROWS * CELL_SIZE
 SCREEN = pygame.display.set_mode((WIDTH, HEIGHT))
 pygame.display.set_caption("Board AI LAN Battle")
@@ -14,7 +21,6 @@ FONT = pygame.font.SysFont(None, 24)
 FPS = 30
 
 # -------- 棋子定义 --------
-CHIP_NAMES = ["orichi", "yagami", "kula", "k", "mai", "kyo", "athena"]
 CHIP_COLORS = {
     "orichi": (255, 0, 0),
     "yagami": (255, 165, 0),
@@ -26,12 +32,8 @@ CHIP_COLORS = {
 }
 
 BACK_COLOR = (50, 50, 50)  # 背面颜色
-MAX_TURNS = 60
 TURN_TIME = 15
 
-# -------- 无动作惩罚设置 --------
-MAX_IDLE_TURNS = 5  # 连续无动作最大回合数
-
 # -------- 网络设置 --------
 DEFAULT_SERVER_HOST = "127.0.0.1"  # 默认服务器地址
 DEFAULT_SERVER_PORT = 50007
\ No newline at end of file
@@ -0,0 +1,9 @@
+# kof_engine: 无 pygame 依赖的游戏引擎核心，供 Board_Ai_Chess / Board_Ai_Chess_Pro / Chess_LAN_Battle 共用
+from .rules import (ROWS, COLS, MAX_TURNS, MAX_IDLE_TURNS, CHIP_NAMES, START_COMPOSITION,
+                    CHIP_HIERARCHY, DIRECTIONS, NUM_CHIP_TYPES, CHIP_IDS, CHIP_LEVELS,
+                    ATTACK_SUCCESS, ATTACK_FAIL, FUSION, OUTCOME_NAMES, COMBAT_TABLE,
+                    NO_DEFEAT, DEFEAT_UPDATE,
+                    get_chip_level, should_update_defeat, can_attack, check_winner)
+from .chip import Chip, encode_chip, decode_chip
+from .game import new_board, random_init, resolve_action, apply_action, legal_actions, has_chips
+from .state import GameState
@@ -0,0 +1,29 @@
+# ai_basic.py
+# 基础 AI（无 pygame 依赖）：随机顺序遍历棋子和方向，执行第一个可行动作
+import random
+from .rules import ROWS, COLS, DIRECTIONS
+from .bitboard import SQUARE_POS, iter_bits
+
+def choose_action(state, rng=random):
+    """
+    AI 单步决策
+    返回: (sr, sc, tr, tc)，无动作可执行返回 None
+    """
+    board = state.board
+    ai_positions = [SQUARE_POS[sq] for sq in iter_bits(state.occupancy[False])]
+    rng.shuffle(ai_positions)
+
+    for sr, sc in ai_positions:
+        directions = list(DIRECTIONS)
+        rng.shuffle(directions)
+
+        for dr, dc in directions:
+            r, c = sr + dr, sc + dc
+            if not (0 <= r < ROWS and 0 <= c < COLS):
+                continue
+            target = board[r][c]
+            if target is None or target.is_player:
+                return sr, sc, r, c
+
+    # 遍历完所有棋子和方向都没有可执行的动作
+    return None
@@ -0,0 +1,296 @@
+# ai_pro.py (智能版本 - 信息受限，无 pygame 依赖)
+import json
+import random
+import numpy as np
+from .rules import ROWS, COLS, CHIP_NAMES, ATHENA, ATTACK_SUCCESS, ATTACK_FAIL, FUSION
+from .bitboard import SQUARES, SQUARE_POS, square, iter_bits
+from .belief import BeliefTracker, ATTACK_OUTCOMES, DEFENCE_OUTCOMES
+
+# 棋子价值评估（用于决策）
+CHIP_VALUES = {
+    "orichi": 100,
+    "yagami": 80,
+    "kula": 60,
+    "k": 40,
+    "mai": 20,
+    "kyo": 10,
+    "athena": 50  # 特殊价值
+}
+CHIP_VALUE_BY_ID = [CHIP_VALUES[name] for name in CHIP_NAMES]  # 按类型编号查表
+CHIP_VALUE_ARRAY = np.array(CHIP_VALUE_BY_ID, dtype=float)
+# 可用于试探的低价值棋子（按默认价值划分，不随调优的价值变化）：攻击试探（'probe'）/ 靠近未知棋子
+_PROBE_ATTACKERS = {t for t, value in enumerate(CHIP_VALUE_BY_ID) if value <= 20}  # kyo, mai
+_PROBE_MOVERS = {t for t, value in enumerate(CHIP_VALUE_BY_ID) if value <= 30}
+
+# 评分中的其余手选常数（默认值）
+EVAL_PARAMS = {
+    "probe_bonus": 20,      # 低价值棋子攻击试探：每比特期望信息增益的加分
+    "attack_centre": 10,    # 攻击中心区域的棋子
+    "move_centre": 20,      # 移动到中心区域
+    "approach": 1.0,        # 靠近能打败的玩家棋子（TurnMaps.approach 的倍数）
+    "threat": 10,           # 威胁等级的扣分倍数
+    "strategic": 15,        # 移动到边界
+    "unknown_probe": 15,    # 低价值棋子靠近未知棋子
+    "fusion_bonus": 40,     # Athena 融合划算
+    "fusion_penalty": -20,  # Athena 融合不划算
+}
+
+class EvalWeights:
+    """
+    启发式评分的全部权重：chip_values（{名称: 价值}）与 EVAL_PARAMS 中的各项（同名属性）
+    可保存为 JSON（python -m kof_engine.tune 自对弈调优的结果），Pro 版本启动时加载
+    """
+    def __init__(self, chip_values=None, **params):
+        unknown = set(params) - set(EVAL_PARAMS)
+        if unknown:
+            raise ValueError(f"unknown weights: {sorted(unknown)}")
+        self.chip_values = dict(CHIP_VALUES, **(chip_values or {}))
+        for name, default in EVAL_PARAMS.items():
+            setattr(self, name, params.get(name, default))
+        self.value_by_id = [self.chip_values[name] for name in CHIP_NAMES]
+        self.value_array = np.array(self.value_by_id, dtype=float)
+
+    def vector(self):
+        """按 CHIP_NAMES + EVAL_PARAMS 顺序展开为列表（供调优）"""
+        return self.value_by_id + [getattr(self, name) for name in EVAL_PARAMS]
+
+    @classmethod
+    def from_vector(cls, vector):
+        vector = [float(x) for x in vector]
+        return cls(dict(zip(CHIP_NAMES, vector)), **dict(zip(EVAL_PARAMS, vector[len(CHIP_NAMES):])))
+
+    def to_dict(self):
+        return dict({"chip_values": self.chip_values}, **{name: getattr(self, name) for name in EVAL_PARAMS})
+
+    def save(self, path):
+        with open(path, "w") as f:
+            json.dump(self.to_dict(), f, indent=2)
+
+    @classmethod
+    def load(cls, path):
+        with open(path) as f:
+            return cls(**json.load(f))
+
+DEFAULT_WEIGHTS = EvalWeights()
+
+# 格子间曼哈顿距离 / 相邻关系 [sq1, sq2]
+_DISTANCE = np.array([[abs(r1 - r2) + abs(c1 - c2) for r2, c2 in SQUARE_POS] for r1, c1 in SQUARE_POS])
+_ADJACENT = (_DISTANCE == 1).astype(float)
+# [对方类型, 己方类型]: 己方攻击成功 / 对方攻击时己方被击败或融合
+_WIN_BY_TYPE = ATTACK_OUTCOMES[:, :, ATTACK_SUCCESS].T
+_THREAT_BY_TYPE = (DEFENCE_OUTCOMES[:, :, ATTACK_SUCCESS] + DEFENCE_OUTCOMES[:, :, FUSION]).T
+
+def beliefs(state):
+    """
+    AI 对玩家棋子身份的后验分布（belief.BeliefTracker，按棋子对象索引，随新局清空）
+    约束来自 state.knowledge[False]，由 GameState.apply_action 在每次公开结果后更新
+    """
+    belief = state.ai_memory.get("belief")
+    if belief is None or belief.tracker is not state.knowledge[False]:
+        belief = state.ai_memory["belief"] = BeliefTracker(state.knowledge[False])
+    belief.update()
+    return belief
+
+class TurnMaps:
+    """
+    每个局面一次性计算的评估表（按目标格子查表，evaluate_move 为 O(1)）
+      - approach[type_id][sq]: 该类型棋子位于 sq 时，靠近能打败的玩家棋子的加分
+      - threat[type_id][sq]: 该类型棋子位于 sq 时相邻玩家棋子的威胁等级
+      - unknown_distance[sq]: 到最近未知玩家棋子的距离，没有未知棋子时为 None
+    """
+    def __init__(self, state):
+        self.key = state.key
+        belief = beliefs(state)
+        enemies = list(iter_bits(state.occupancy[True]))
+        if not enemies:
+            self.approach = self.threat = [[0.0] * SQUARES for _ in CHIP_NAMES]
+            self.unknown_distance = [None] * SQUARES
+            return
+        probs = np.array([belief.distribution(state.board[r][c]) for r, c in (SQUARE_POS[sq] for sq in enemies)])
+        distance = _DISTANCE[enemies]
+        # 多源合并：每个玩家棋子按 (己方类型 x 格子) 的贡献一次矩阵乘法累加
+        self.approach = ((probs @ _WIN_BY_TYPE).T @ np.maximum(0, 10 - distance * 2)).tolist()
+        self.threat = ((probs @ _THREAT_BY_TYPE).T @ _ADJACENT[enemies] * 5).tolist()
+        unknown = probs.max(axis=1) < 0.5
+        if unknown.any():
+            self.unknown_distance = distance[unknown].min(axis=0).tolist()
+        else:
+            self.unknown_distance = [None] * SQUARES
+
+def turn_maps(state):
+    """当前局面的 TurnMaps（按 state.key 缓存，同一回合内只计算一次）"""
+    maps = state.ai_memory.get("maps")
+    if maps is None or maps.key != state.key:
+        maps = state.ai_memory["maps"] = TurnMaps(state)
+    return maps
+
+def estimate_player_chip_value(state, r, c, weights=DEFAULT_WEIGHTS):
+    """
+    估算玩家棋子的价值（AI 只能通过有限信息推断）
+    
+    AI 可以知道：
+    1. 该位置是否有玩家棋子（能看到白色圆圈）
+    2. 双方棋子的 defeat 信息与每次战斗的结果
+    3. 初始阵容（每种棋子的数量）
+    
+    AI 不能知道：
+    - 玩家棋子的具体名称
+    因此按身份后验分布求期望价值
+    """
+    player_chip = state.board[r][c]
+    if not player_chip or not player_chip.is_player:
+        return 0
+    return beliefs(state).expected(player_chip, weights.value_array)
+
+def get_all_possible_actions(state, is_ai=True, weights=DEFAULT_WEIGHTS):
+    """
+    获取所有可能的行动及其评分（weights: EvalWeights）
+    返回: [(score, sr, sc, tr, tc, action_type), ...]
+    action_type: 'move', 'attack_attempt', 'fusion_attempt', 'probe'（低价值棋子的攻击试探，按期望信息增益加分）
+    """
+    actions = []
+    probes = []  # 试探: [(actions 中的下标, 攻击方, 目标)]
+    # 增量维护的合法动作（空格或对方棋子），评分期间不修改局面，可直接迭代
+    for sr, sc, r, c in state.iter_actions(not is_ai):
+        chip = state.board[sr][sc]
+        target = state.board[r][c]
+
+        if target is None:
+            # 移动到空格 - 评估位置价值
+            score = evaluate_move(state, chip, sr, sc, r, c, weights)
+            actions.append((score, sr, sc, r, c, 'move'))
+
+        elif chip.type_id == ATHENA:
+            # 己方 Athena 与任何棋子融合（AI 知道自己的棋子）
+            score = evaluate_fusion(state, chip, target, r, c, weights)
+            actions.append((score, sr, sc, r, c, 'fusion_attempt'))
+
+        elif chip.type_id in _PROBE_ATTACKERS:
+            # 低价值棋子试探：风险评估之外按期望信息增益加分（循环结束后批量计算）
+            score = evaluate_attack_attempt(state, chip, target, r, c, weights)
+            probes.append((len(actions), chip, target))
+            actions.append((score, sr, sc, r, c, 'probe'))
+
+        else:
+            # AI 不知道能否攻击成功（对方也可能是 Athena），按后验概率评估风险
+            score = evaluate_attack_attempt(state, chip, target, r, c, weights)
+            actions.append((score, sr, sc, r, c, 'attack_attempt'))
+
+    if probes:
+        gains = beliefs(state).information_gain([p[1] for p in probes], [p[2] for p in probes])
+        for (i, _, _), gain in zip(probes, gains):
+            entry = actions[i]
+            actions[i] = (entry[0] + weights.probe_bonus * float(gain),) + entry[1:]
+
+    return actions
+
+def evaluate_attack_attempt(state, attacker, defender_chip, defender_r, defender_c, weights=DEFAULT_WEIGHTS):
+    """
+    评估攻击尝试（AI 不知道结果，只能评估风险）
+    """
+    # 估算对手价值（基于身份后验）
+    estimated_defender_value = estimate_player_chip_value(state, defender_r, defender_c, weights)
+    
+    # 自己的价值
+    attacker_value = weights.value_by_id[attacker.type_id]
+    
+    # 成功 / 失败 / 融合的概率
+    outcomes = beliefs(state).attack_outcomes(attacker, defender_chip)
+    
+    # 期望价值 = 预期收益 - 预期损失（融合时双方同归于尽）
+    score = (outcomes[ATTACK_SUCCESS] * estimated_defender_value
+             - outcomes[ATTACK_FAIL] * attacker_value
+             + outcomes[FUSION] * (estimated_defender_value - attacker_value))
+    
+    # 中心位置加成
+    if is_center_position(defender_r, defender_c):
+        score += weights.attack_centre
+    
+    return score
+
+def evaluate_fusion(state, attacker, defender_chip, defender_r, defender_c, weights=DEFAULT_WEIGHTS):
+    """评估融合尝试（AI 不确定对方是否是 Athena）"""
+    # Athena 融合风险评估
+    attacker_value = weights.value_by_id[attacker.type_id]
+    estimated_defender_value = estimate_player_chip_value(state, defender_r, defender_c, weights)
+    
+    # 如果估算对方价值很高，融合可能划算
+    if estimated_defender_value > attacker_value * 1.5:
+        return weights.fusion_bonus
+    else:
+        return weights.fusion_penalty  # 不确定，保守
+
+def evaluate_move(state, chip, sr, sc, tr, tc, weights=DEFAULT_WEIGHTS):
+    """评估移动到空格的价值"""
+    score = 0
+    
+    # 1. 目标位置价值
+    if is_center_position(tr, tc):
+        score += weights.move_centre  # 中心位置价值高
+    
+    # 2. 靠近能打败的玩家棋子（按攻击成功概率加权）
+    maps = turn_maps(state)
+    sq = square(tr, tc)
+    score += maps.approach[chip.type_id][sq] * weights.approach
+    
+    # 3. 远离已知强敌
+    score -= maps.threat[chip.type_id][sq] * weights.threat
+    
+    # 4. 控制重要区域
+    if is_strategic_position(tr, tc):
+        score += weights.strategic
+    
+    # 5. 靠近未知的玩家棋子（试探）
+    nearest_unknown = maps.unknown_distance[sq]
+    if nearest_unknown and nearest_unknown <= 2:
+        # 用低价值棋子靠近未知目标试探
+        if chip.type_id in _PROBE_MOVERS:
+            score += weights.unknown_probe
+    
+    return score
+
+def get_nearest_unknown_player(state, r, c):
+    """获取到最近未知玩家棋子（最可能的类型概率不足 0.5）的距离"""
+    return turn_maps(state).unknown_distance[square(r, c)]
+
+def get_position_from_board(state, chip):
+    """获取棋子在棋盘上的位置"""
+    for r in range(ROWS):
+        for c in range(COLS):
+            if state.board[r][c] == chip:
+                return r, c
+    return None, None
+
+def is_center_position(r, c):
+    """判断是否是中心区域"""
+    center_r, center_c = ROWS // 2, COLS // 2
+    return abs(r - center_r) <= 1 and abs(c - center_c) <= 1
+
+def is_strategic_position(r, c):
+    """判断是否是战略位置（边界、角落）"""
+    if r == 0 or r == ROWS - 1 or c == 0 or c == COLS - 1:
+        return True
+    return False
+
+def get_threat_level(state, chip, r, c):
+    """评估位置的威胁等级（相邻玩家棋子攻击时击败或融合己方棋子的概率）"""
+    return turn_maps(state).threat[chip.type_id][square(r, c)]
+
+def choose_action(state, rng=random, weights=DEFAULT_WEIGHTS):
+    """
+    AI 智能单步决策（信息受限版本，weights: EvalWeights）
+    返回: (score, sr, sc, tr, tc, action_type)，无动作可执行返回 None
+    """
+    # 获取所有可能的行动并评分
+    actions = get_all_possible_actions(state, is_ai=True, weights=weights)
+
+    if not actions:
+        return None  # 无动作可执行
+
+    # 按分数排序（降序）
+    actions.sort(reverse=True, key=lambda x: x[0])
+
+    # 选择最佳行动（加入一些随机性）
+    if rng.random() < 0.8 or len(actions) == 1:
+        return actions[0]
+    return rng.choice(actions[:min(3, len(actions))])
@@ -0,0 +1,80 @@
+# anytime.py
+# 统一的随时可停 AI 入口（无 pygame 依赖）：截止时刻与节点上限任一用完即返回目前最佳动作
+import random
+import time
+from . import ai_pro, ismcts, expectimax, learned, tablebase as endgame
+
+ENGINES = ("expectimax", "ismcts", "heuristic", "learned")
+DEFAULT_ITERATIONS = 1000  # ISMCTS 既无截止时刻也无节点上限时的迭代次数
+
+def tree_depth(root):
+    """ISMCTS 树的最大深度"""
+    depth, stack = 0, [(root, 0)]
+    while stack:
+        node, d = stack.pop()
+        depth = max(depth, d)
+        stack.extend((child, d + 1) for child in node.children.values())
+    return depth
+
+def think(state, engine="expectimax", is_player=False, deadline=None, node_limit=None,
+          max_depth=64, searcher=None, reuse=None, tablebase=None, horizon=None, weights=None, model=None, rng=random):
+    """
+    engine: ENGINES 之一（heuristic 为玩家一方决策时在 state.mirror() 上进行）
+    deadline: 截止时刻（time.perf_counter() 的取值），None 表示不限
+    node_limit: 节点上限（expectimax 为搜索节点数，ISMCTS 为迭代次数），None 表示不限
+    searcher: 可选的 parallel.ParallelSearcher，engine 为 "ismcts" 时用于根并行搜索
+    reuse: ponder.Ponderer.reuse() 的结果（ISMCTS 子树 / expectimax 置换表），None 表示从头搜索
+    tablebase: 可选的 tablebase.Tablebase，局面在库中且对方身份已确定时直接查表（engine 记为 "tablebase"）
+    horizon: 可选的 horizon.HorizonSolver，临近回合上限时先用至多一半的预算精确搜索到上限（engine 记为
+             "horizon"），未完成时其余预算交给 engine
+    weights: heuristic 使用的 ai_pro.EvalWeights，None 表示默认权重
+    model: learned 使用的 learned.ValueModel（engine 为 "learned" 时必须提供）
+    返回: (动作 (sr, sc, tr, tc) 或 None, {"engine", "nodes", "depth", "time"})
+    """
+    start = time.perf_counter()
+    hit = tablebase is not None and endgame.choose_action(tablebase, state, is_player)
+    if hit:
+        stats = {"engine": "tablebase", "nodes": len(state.legal_actions(is_player)), "depth": 1,
+                 "time": time.perf_counter() - start}
+        return hit[0], stats
+    if horizon is not None:
+        share = start + (deadline - start) / 2 if deadline is not None else None
+        solved = horizon.solve(state, is_player, share, node_limit)
+        if solved:
+            stats = {"engine": "horizon", "nodes": horizon.nodes, "depth": endgame.remaining_plies(state),
+                     "time": time.perf_counter() - start}
+            return solved[0], stats
+    time_limit = max(0.0, deadline - time.perf_counter()) if deadline is not None else None
+
+    if engine == "expectimax":
+        action, _, depth, nodes = expectimax.search(state, is_player, max_depth, time_limit, node_limit, reuse)
+    elif engine == "ismcts" and searcher is not None:
+        iterations = node_limit if node_limit or time_limit is not None else DEFAULT_ITERATIONS
+        iterations = iterations and max(1, iterations // searcher.workers)  # 总预算分给各进程
+        if time_limit is not None:
+            time_limit = max(0.0, time_limit - searcher.grace)  # 等待工作进程的时间也计入预算
+        action, merged = searcher.search(state, is_player, iterations, time_limit, rng)
+        nodes = sum(visits for visits, _ in merged.values())
+        depth = 1 if merged else 0
+    elif engine == "ismcts":
+        iterations = node_limit if node_limit or time_limit is not None else DEFAULT_ITERATIONS
+        action, root = ismcts.search(state, is_player, iterations, time_limit, rng=rng, root=reuse)
+        nodes = root.visits
+        depth = tree_depth(root)
+    elif engine == "heuristic":
+        view = state.mirror() if is_player else state  # ai_pro 只为 AI 一方决策，坐标在镜像中不变
+        scored = ai_pro.choose_action(view, rng, weights or ai_pro.DEFAULT_WEIGHTS)
+        action = scored and scored[1:5]
+        nodes = len(state.legal_actions(is_player))
+        depth = 1
+    elif engine == "learned":
+        if model is None:
+            raise ValueError("learned engine requires a model")
+        action = learned.choose_action(state, model, is_player)
+        nodes = len(state.legal_actions(is_player))
+        depth = 1
+    else:
+        raise ValueError(f"unknown engine: {engine}")
+
+    stats = {"engine": engine, "nodes": nodes, "depth": depth, "time": time.perf_counter() - start}
+    return action, stats
@@ -0,0 +1,221 @@
+# batch.py
+# 向量化的批量对局模拟（NumPy，无 pygame 依赖）：成千上万局按结构化数组同步推进，
+# 每个单方步对所有未结束的对局做一次数组运算（合法动作掩码、战斗结算、无动作与回合上限判定）。
+# 只模拟公开规则，不维护身份约束与 defeat 标签（两者不影响胜负），供大量随机对局、统计与调参使用
+# 基准: python -m kof_engine.batch --games 100000 --batch 10000 --seed 1
+import argparse
+import random
+import time
+import numpy as np
+from .rules import (NUM_CHIP_TYPES, START_COMPOSITION, CHIP_IDS, DIRECTIONS, COMBAT_TABLE, WINNER_ORDER,
+                    ATTACK_SUCCESS, FUSION, MAX_TURNS, MAX_IDLE_TURNS, ROWS, COLS)
+from .bitboard import SQUARES, SQUARE_POS, square
+from .state import GameState
+from .tablebase import PLAYER_WIN, DRAW, AI_WIN, piece_code
+
+# 格子编码: 棋子为 tablebase.piece_code（is_player * NUM_CHIP_TYPES + type_id），另有空格与棋盘外
+EMPTY = 2 * NUM_CHIP_TYPES
+WALL = EMPTY + 1
+_CODES = WALL + 1
+N_DIRECTIONS = len(DIRECTIONS)
+
+# _NEIGHBOURS[格子][方向]: 相邻格子编号，越界为 SQUARES（board 最后一列恒为 WALL）
+_NEIGHBOURS = np.array([[square(r + dr, c + dc) if 0 <= r + dr < ROWS and 0 <= c + dc < COLS else SQUARES
+                         for dr, dc in DIRECTIONS] for r, c in SQUARE_POS])
+# _LEGAL[is_player][起点编码 * _CODES + 目标编码]: 起点为该方棋子且目标为空格或对方棋子
+_LEGAL = np.array([[src < EMPTY and src // NUM_CHIP_TYPES == side and
+                    (dst == EMPTY or (dst < EMPTY and dst // NUM_CHIP_TYPES != side))
+                    for src in range(_CODES) for dst in range(_CODES)] for side in (0, 1)])
+# _AFTER[攻击方编码][目标编码]: 目标格的新编码（按 COMBAT_TABLE 结算，攻击失败时目标不变）
+def _after_table():
+    after = np.tile(np.arange(_CODES, dtype=np.int8), (_CODES, 1))
+    for a in range(EMPTY):
+        after[a, EMPTY] = a
+        for t in range(EMPTY):
+            outcome = COMBAT_TABLE[a % NUM_CHIP_TYPES][t % NUM_CHIP_TYPES]
+            if outcome == ATTACK_SUCCESS:
+                after[a, t] = a
+            elif outcome == FUSION:
+                after[a, t] = EMPTY
+    return after
+
+_AFTER = _after_table()
+
+_START_CODES = np.array([piece_code(True, CHIP_IDS[name]) for name in START_COMPOSITION] +
+                        [piece_code(False, CHIP_IDS[name]) for name in START_COMPOSITION] +
+                        [EMPTY] * (SQUARES - 2 * len(START_COMPOSITION)), dtype=np.int8)
+_ORDER = np.array(WINNER_ORDER)
+
+def random_actions(games, legal, rng):
+    """默认策略：在每局的合法动作中均匀随机选择（legal: (n, SQUARES * N_DIRECTIONS)）"""
+    k = (rng.random(len(legal)) * legal.sum(axis=1)).astype(np.int16)  # 选第 k 个合法动作
+    return (legal.cumsum(axis=1, dtype=np.int16) > k[:, None]).argmax(axis=1)
+
+class BatchGames:
+    """
+    n 局同步推进的对局（结构化数组，所有对局轮到同一方行动）
+      - board: (n, SQUARES + 1) 的格子编码，最后一列为 WALL
+      - turn_count / player_idle / ai_idle: 每局的回合数与双方连续无动作计数
+      - player_to_move: 当前行动方（所有对局相同）
+      - done / winner: 每局是否结束与结果（PLAYER_WIN / DRAW / AI_WIN，玩家视角）
+    """
+    def __init__(self, n, rng=None):
+        self.rng = rng if rng is not None else np.random.default_rng()
+        self.n = n
+        # 与 game.random_init 相同：棋子随机占据不同格子
+        order = self.rng.random((n, SQUARES)).argsort(axis=1)
+        self._reset(np.concatenate([_START_CODES[order], np.full((n, 1), WALL, dtype=np.int8)], axis=1))
+
+    def _reset(self, board, turn_count=0, player_idle=0, ai_idle=0, player_to_move=True):
+        n = len(board)
+        self.board = board
+        self.turn_count = np.full(n, turn_count, dtype=np.int16)
+        self.player_idle = np.full(n, player_idle, dtype=np.int8)
+        self.ai_idle = np.full(n, ai_idle, dtype=np.int8)
+        self.player_to_move = player_to_move
+        self.done = np.zeros(n, dtype=bool)
+        self.winner = np.zeros(n, dtype=np.int8)
+        self._finish()
+
+    @classmethod
+    def from_state(cls, state, n, rng=None):
+        """把 GameState 的公开局面复制 n 份（例如从当前局面出发做随机对局）"""
+        board = np.full(SQUARES + 1, WALL, dtype=np.int8)
+        for sq, (r, c) in enumerate(SQUARE_POS):
+            chip = state.board[r][c]
+            board[sq] = piece_code(chip.is_player, chip.type_id) if chip is not None else EMPTY
+        games = cls.__new__(cls)
+        games.rng = rng if rng is not None else np.random.default_rng()
+        games.n = n
+        games._reset(np.tile(board, (n, 1)), state.turn_count, state.player_idle_count, state.ai_idle_count,
+                     state.player_to_move)
+        return games
+
+    def legal_mask(self, is_player=None):
+        """
+        合法动作掩码 (n, SQUARES * N_DIRECTIONS)，动作编号 = 起点格子 * N_DIRECTIONS + 方向
+        已结束的对局全部为 False
+        """
+        side = self.player_to_move if is_player is None else is_player
+        board = self.board
+        legal = _LEGAL[int(side)][board[:, :SQUARES, None].astype(np.intp) * _CODES + board[:, _NEIGHBOURS]]
+        legal &= ~self.done[:, None, None]
+        return legal.reshape(self.n, -1)
+
+    def counts(self):
+        """双方各类型的剩余数量 (n, 2, NUM_CHIP_TYPES)，[:, is_player]"""
+        offsets = np.arange(self.n)[:, None] * _CODES
+        flat = np.bincount((offsets + self.board).ravel(), minlength=self.n * _CODES)
+        return flat.reshape(self.n, _CODES)[:, :EMPTY].reshape(self.n, 2, NUM_CHIP_TYPES)
+
+    def check_winner(self):
+        """按 check_winner 判定每局（从 orichi 到 kyo 逐级比较剩余数量），返回玩家视角的结果"""
+        counts = self.counts()
+        diff = np.sign(counts[:, 1, _ORDER] - counts[:, 0, _ORDER])
+        first = (diff != 0).argmax(axis=1)
+        return diff[np.arange(self.n), first].astype(np.int8)  # 全部相等时 diff 全为 0，即 DRAW
+
+    def _finish(self):
+        """与 GameState.result() 相同的判定顺序，标记新结束的对局"""
+        active = ~self.done
+        player_idle = active & (self.player_idle >= MAX_IDLE_TURNS)
+        ai_idle = active & ~player_idle & (self.ai_idle >= MAX_IDLE_TURNS)
+        counts = self.counts().sum(axis=2)
+        limit = active & ~player_idle & ~ai_idle & (
+            (self.turn_count >= MAX_TURNS) | (counts[:, 0] == 0) | (counts[:, 1] == 0))
+        self.winner[player_idle] = AI_WIN
+        self.winner[ai_idle] = PLAYER_WIN
+        if limit.any():
+            self.winner[limit] = self.check_winner()[limit]
+        self.done |= player_idle | ai_idle | limit
+
+    def step(self, policy=random_actions):
+        """
+        行动方在所有未结束的对局中各走一步（无合法动作的对局记为无动作），然后判定结束
+        policy(games, legal, rng) -> (n,) 动作编号，只需对 legal 中有 True 的行给出合法动作
+        """
+        side = self.player_to_move
+        legal = self.legal_mask()
+        acted = legal.any(axis=1)
+        games = np.flatnonzero(acted)
+        if len(games):
+            action = policy(self, legal, self.rng)[games]
+            s, d = np.divmod(action, N_DIRECTIONS)
+            t = _NEIGHBOURS[s, d]
+            attacker, target = self.board[games, s], self.board[games, t]
+            self.board[games, t] = _AFTER[attacker, target]
+            self.board[games, s] = EMPTY  # 攻击方在任何结果下都离开起点
+        active = ~self.done
+        idle = self.player_idle if side else self.ai_idle
+        idle[active & acted] = 0
+        idle[active & ~acted] += 1
+        if not side:
+            self.turn_count[active] += 1
+        self.player_to_move = not side
+        self._finish()
+
+    def run(self, policy=random_actions):
+        """推进到所有对局结束，返回 winner"""
+        while not self.done.all():
+            self.step(policy)
+        return self.winner
+
+def playouts(state, n, rng=None, policy=random_actions):
+    """
+    从 state 出发的 n 局随机对局
+    返回: (玩家胜, 平, AI 胜) 的局数
+    """
+    winner = BatchGames.from_state(state, n, rng).run(policy)
+    return int((winner == PLAYER_WIN).sum()), int((winner == DRAW).sum()), int((winner == AI_WIN).sum())
+
+def benchmark(games, batch, seed=0):
+    """
+    games 局随机对局（每批 batch 局同步推进）
+    返回: {"player_wins", "draws", "ai_wins", "avg_turns", "games_per_second"}
+    """
+    rng = np.random.default_rng(seed)
+    totals = np.zeros(3, dtype=np.int64)
+    turns = 0
+    start = time.perf_counter()
+    for offset in range(0, games, batch):
+        sim = BatchGames(min(batch, games - offset), rng)
+        winner = sim.run()
+        totals += [(winner == PLAYER_WIN).sum(), (winner == DRAW).sum(), (winner == AI_WIN).sum()]
+        turns += int(sim.turn_count.sum())
+    elapsed = time.perf_counter() - start
+    return {"player_wins": int(totals[0]), "draws": int(totals[1]), "ai_wins": int(totals[2]),
+            "avg_turns": turns / games, "games_per_second": games / elapsed}
+
+def scalar_benchmark(games, seed=0):
+    """对照：同样的随机对局逐局用 GameState 推进，返回每秒对局数"""
+    rng = random.Random(seed)
+    state = GameState()
+    start = time.perf_counter()
+    for _ in range(games):
+        state.random_init(rng)
+        while state.result() is None:
+            side = state.player_to_move
+            actions = state.legal_actions(side)
+            action = rng.choice(actions) if actions else None
+            if action is not None:
+                state.apply_action(*action)
+            state.end_turn(side, action is not None)
+    return games / (time.perf_counter() - start)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="KOF 向量化批量随机对局的吞吐基准")
+    parser.add_argument("--games", type=int, default=100000, help="对局数（默认 100000）")
+    parser.add_argument("--batch", type=int, default=10000, help="同步推进的对局数（默认 10000）")
+    parser.add_argument("--seed", type=int, default=0, help="随机种子（默认 0）")
+    parser.add_argument("--scalar", type=int, default=0, help="对照的逐局 GameState 对局数（默认 0 表示不对照）")
+    args = parser.parse_args(argv)
+    stats = benchmark(args.games, args.batch, args.seed)
+    print(f"{args.games} random games (batch {args.batch}): player +{stats['player_wins']} "
+          f"={stats['draws']} AI +{stats['ai_wins']}, average length {stats['avg_turns']:.1f} turns")
+    print(f"{stats['games_per_second']:.0f} games/s")
+    if args.scalar:
+        scalar = scalar_benchmark(args.scalar, args.seed)
+        print(f"GameState loop: {scalar:.0f} games/s ({stats['games_per_second'] / scalar:.1f}x)")
+
+if __name__ == "__main__":
+    main()
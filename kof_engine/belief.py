@@ -0,0 +1,267 @@
+# belief.py
+# 对方隐藏棋子身份的精确后验分布（NumPy 向量化，无 pygame 依赖）
+# random_init 对位置均匀洗牌，战斗结果由类型唯一决定，因此后验在
+# “与初始阵容及全部观察一致的身份分配”上均匀分布，边缘概率可用计数 DP 精确求出
+import random
+import numpy as np
+from .rules import NUM_CHIP_TYPES, COMBAT_TABLE, DEFEAT_UPDATE, ATTACK_SUCCESS
+from .knowledge import START_COUNTS, ALL_TYPES, types_of
+
+_SHAPE = tuple(n + 1 for n in START_COUNTS)  # DP 状态：每种类型已分配的数量
+_START = (0,) * NUM_CHIP_TYPES
+_FULL = tuple(START_COUNTS)
+
+# ATTACK_OUTCOMES[己方攻击方类型]: (7, 3) 矩阵，第 d 行为攻击 d 类型时结果的 one-hot
+ATTACK_OUTCOMES = np.zeros((NUM_CHIP_TYPES, NUM_CHIP_TYPES, 3))
+# DEFENCE_OUTCOMES[己方防守方类型]: (7, 3) 矩阵，第 a 行为被 a 类型攻击时结果的 one-hot
+DEFENCE_OUTCOMES = np.zeros((NUM_CHIP_TYPES, NUM_CHIP_TYPES, 3))
+for _a in range(NUM_CHIP_TYPES):
+    for _d in range(NUM_CHIP_TYPES):
+        ATTACK_OUTCOMES[_a, _d, COMBAT_TABLE[_a][_d]] = 1
+        DEFENCE_OUTCOMES[_d, _a, COMBAT_TABLE[_a][_d]] = 1
+
+# 己方攻击后观察方看到的公开信息：结果，且攻击成功并更新 defeat 标签时还透露防守方的类型
+# OBSERVATIONS[攻击方类型][攻击方 defeat_id + 1]: (7, 3 + 7) 矩阵，第 d 行为防守方是 d 类型时观察类别的 one-hot
+# （类别 0~2 为只看到结果，3 + d 为标签更新透露出 d）
+OBSERVATIONS = np.zeros((NUM_CHIP_TYPES, NUM_CHIP_TYPES + 1, NUM_CHIP_TYPES, 3 + NUM_CHIP_TYPES))
+for _a in range(NUM_CHIP_TYPES):
+    for _cur in range(NUM_CHIP_TYPES + 1):
+        for _d in range(NUM_CHIP_TYPES):
+            _outcome = COMBAT_TABLE[_a][_d]
+            _revealed = _outcome == ATTACK_SUCCESS and DEFEAT_UPDATE[_cur][_d]
+            OBSERVATIONS[_a, _cur, _d, 3 + _d if _revealed else _outcome] = 1
+
+def _axis_slices(t, lo):
+    """沿类型 t 的轴取 [:-1]（lo=True）或 [1:] 的切片"""
+    index = [slice(None)] * NUM_CHIP_TYPES
+    index[t] = slice(None, -1) if lo else slice(1, None)
+    return tuple(index)
+
+_LO = [_axis_slices(t, True) for t in range(NUM_CHIP_TYPES)]
+_HI = [_axis_slices(t, False) for t in range(NUM_CHIP_TYPES)]
+
+def marginals(masks, n_total=sum(START_COUNTS), weights=None):
+    """
+    masks: 每个对方棋子的可能类型掩码（可含已阵亡棋子），不足 n_total 个时其余视为未知
+    weights: 可选，与 masks 对应的各类型似然 [7]（None 表示不加权），每个分配的权重为各棋子似然之积
+    返回: (len(masks), 7) 的后验概率矩阵，无一致分配时返回 None
+    """
+    masks = list(masks) + [ALL_TYPES] * (n_total - len(masks))
+    n = len(masks)
+    weights = list(weights or ()) + [None] * (n - len(weights or ()))
+    # forward[i][u]: 前 i 个棋子恰好用掉 u 的分配数；backward[i][u]: 已用 u 时第 i 个起的补全数
+    forward = [np.zeros(_SHAPE)]
+    forward[0][_START] = 1.0
+    for mask, w in zip(masks, weights):
+        f = forward[-1]
+        g = np.zeros(_SHAPE)
+        for t in types_of(mask):
+            g[_HI[t]] += f[_LO[t]] if w is None else f[_LO[t]] * w[t]
+        forward.append(g)
+    total = forward[n][_FULL]
+    if total == 0:
+        return None
+
+    probs = np.zeros((n, NUM_CHIP_TYPES))
+    b = np.zeros(_SHAPE)
+    b[_FULL] = 1.0
+    for i in range(n - 1, -1, -1):
+        f = forward[i]
+        w = weights[i]
+        g = np.zeros(_SHAPE)
+        for t in types_of(masks[i]):
+            pulled = b[_HI[t]] if w is None else b[_HI[t]] * w[t]
+            probs[i, t] = np.vdot(f[_LO[t]], pulled)
+            g[_LO[t]] += pulled
+        b = g
+    return probs / total
+
+def count_distribution(live, dead=(), n_total=sum(START_COUNTS)):
+    """
+    live / dead: 存活 / 已阵亡对方棋子的可能类型掩码，不足 n_total 个时其余视为已阵亡的未知棋子
+    返回: 形状为 (START_COUNTS[t] + 1, ...) 的数组，[u] 为存活棋子中各类型数量恰为 u 的后验概率，
+          无一致分配时返回 None（check_winner 只看数量，比逐个棋子的边缘概率更直接）
+    """
+    dead = list(dead) + [ALL_TYPES] * (n_total - len(live) - len(dead))
+    f = np.zeros(_SHAPE)
+    f[_START] = 1.0
+    for mask in live:
+        g = np.zeros(_SHAPE)
+        for t in types_of(mask):
+            g[_HI[t]] += f[_LO[t]]
+        f = g
+    # b[u]: 已用 u 时阵亡棋子的补全数
+    b = np.zeros(_SHAPE)
+    b[_FULL] = 1.0
+    for mask in dead:
+        g = np.zeros(_SHAPE)
+        for t in types_of(mask):
+            g[_LO[t]] += b[_HI[t]]
+        b = g
+    joint = f * b
+    total = joint.sum()
+    return joint / total if total else None
+
+def conditional(mask, others, n_total=sum(START_COUNTS)):
+    """
+    某个对方棋子（可能类型 mask）在其余棋子约束 others 下的后验 [7]（只做一次前向计数）
+    无一致分配时返回 None
+    """
+    others = list(others) + [ALL_TYPES] * (n_total - 1 - len(others))
+    f = np.zeros(_SHAPE)
+    f[_START] = 1.0
+    for other in others:
+        g = np.zeros(_SHAPE)
+        for t in types_of(other):
+            g[_HI[t]] += f[_LO[t]]
+        f = g
+    probs = np.zeros(NUM_CHIP_TYPES)
+    for t in types_of(mask):
+        rest = list(_FULL)
+        rest[t] -= 1
+        probs[t] = f[tuple(rest)]
+    total = probs.sum()
+    return probs / total if total else None
+
+def completions(masks, weights=None):
+    """
+    逐个抽样用的后向计数: 返回 len(masks) + 1 个数组，[i][u] 为已用 u 时第 i 个棋子起的（加权）补全数
+    masks 须已补足 n_total 个，[0][_START] 为 0 表示无一致分配
+    """
+    weights = list(weights or ()) + [None] * (len(masks) - len(weights or ()))
+    b = np.zeros(_SHAPE)
+    b[_FULL] = 1.0
+    backward = [b]
+    for mask, w in zip(reversed(masks), reversed(weights)):
+        g = np.zeros(_SHAPE)
+        for t in types_of(mask):
+            g[_LO[t]] += b[_HI[t]] if w is None else b[_HI[t]] * w[t]
+        b = g
+        backward.append(b)
+    backward.reverse()
+    return backward
+
+def draw(masks, backward, weights=None, rng=random):
+    """
+    按 completions 的结果从后验中抽取一组分配：前面的棋子固定后，逐个按条件边缘分布抽取
+    返回: 与 masks 对应的类型编号列表，无一致分配时返回 None
+    """
+    if backward[0][_START] == 0:
+        return None
+    weights = list(weights or ()) + [None] * (len(masks) - len(weights or ()))
+    used = list(_START)
+    types = []
+    for i, mask in enumerate(masks):
+        options, probs = [], []
+        for t in types_of(mask):
+            if used[t] == _FULL[t]:
+                continue
+            used[t] += 1
+            p = backward[i + 1][tuple(used)]
+            used[t] -= 1
+            if weights[i] is not None:
+                p *= weights[i][t]
+            if p > 0:
+                options.append(t)
+                probs.append(p)
+        t = rng.choices(options, probs)[0]
+        used[t] += 1
+        types.append(t)
+    return types
+
+class BeliefTracker:
+    """
+    观察方对每个存活的对方棋子的类型后验分布（按棋子对象索引，跟随棋子移动）
+      - tracker: 提供约束的 IdentityTracker（GameState.knowledge[观察方]）
+      - probs: {Chip: np.ndarray(7)}
+      - use_evidence: 是否按 tracker 的行为证据（tracker.behaviour 的对数似然）加权
+    约束与行为证据未变化时 update() 只比较签名，不重新计算；使用行为证据时对方每走一步证据都会变化，
+    每次都要重新做一遍计数 DP（约 1 ms，不使用时只在战斗结果收紧约束后重算）
+    sample() 从同一后验（含行为证据）中抽取完整的身份分配，供 ismcts 确定化
+    """
+    def __init__(self, tracker, use_evidence=True):
+        self.tracker = tracker
+        self.use_evidence = use_evidence
+        self.probs = {}
+        self._signature = None
+        self._chips = []
+        self._masks = []
+        self._weights = None
+        self._backward = None
+
+    def update(self):
+        """按当前约束刷新后验（每回合调用一次即可）"""
+        tracker = self.tracker
+        behaviour = tracker.behaviour if self.use_evidence and tracker.observed_moves else None
+        signature = (tuple(tracker.allowed.items()), tuple(tracker.dead),
+                     tracker.evidence_version if behaviour is not None else None)
+        if signature == self._signature:
+            return
+        self._signature = signature
+        chips = list(tracker.allowed)
+        weights = None
+        if behaviour is not None:
+            # 每个存活棋子都有 observed_moves 次“未被选中”的证据，走过子的棋子再加上各次走子的证据
+            idle = np.array(behaviour.log_idle) * tracker.observed_moves
+            weights = []
+            for chip in chips:
+                ll = tracker.evidence.get(chip)
+                ll = idle if ll is None else idle + ll
+                weights.append(np.exp(ll - ll.max()))
+        masks = [tracker.allowed[chip] for chip in chips] + tracker.dead
+        self._chips = chips
+        self._masks = masks + [ALL_TYPES] * (sum(START_COUNTS) - len(masks))
+        self._weights = weights
+        self._backward = None
+        result = marginals(masks, weights=weights)
+        if result is None:
+            # 约束互相矛盾（如局面由 unpack 还原），退回到按掩码均匀分布
+            result = np.array([[mask >> t & 1 for t in range(NUM_CHIP_TYPES)]
+                               for mask in tracker.allowed.values()], dtype=float)
+            result /= result.sum(axis=1, keepdims=True)
+        self.probs = dict(zip(chips, result))
+
+    def sample(self, rng=random):
+        """
+        从后验中抽取一组与全部观察一致的身份分配（后向计数在后验不变期间复用）
+        返回: {Chip: type_id}（仅存活棋子），约束互相矛盾时返回 None
+        """
+        self.update()
+        if self._backward is None:
+            self._backward = completions(self._masks, self._weights)
+        types = draw(self._masks, self._backward, self._weights, rng)
+        return None if types is None else dict(zip(self._chips, types))
+
+    def distribution(self, chip):
+        """对方某个棋子的类型分布"""
+        probs = self.probs.get(chip)
+        if probs is None:
+            self.update()
+            probs = self.probs.get(chip)
+        return probs if probs is not None else np.full(NUM_CHIP_TYPES, 1.0 / NUM_CHIP_TYPES)
+
+    def attack_outcomes(self, attacker, chip):
+        """己方 attacker 攻击对方 chip 时 (成功, 失败, 融合) 的概率"""
+        return self.distribution(chip) @ ATTACK_OUTCOMES[attacker.type_id]
+
+    def defence_outcomes(self, defender, chip):
+        """对方 chip 攻击己方 defender 时 (成功, 失败, 融合) 的概率（以攻击方视角）"""
+        return self.distribution(chip) @ DEFENCE_OUTCOMES[defender.type_id]
+
+    def information_gain(self, attackers, chips):
+        """
+        己方 attackers[i] 攻击对方 chips[i] 的期望信息增益（比特），全部候选一次向量化计算
+        观察由防守方类型唯一决定，且后验是全部隐藏身份（含初始阵容约束）的联合分布，
+        因此联合分布熵的期望减少量恰为观察本身的熵
+        返回: (len(chips),) 数组
+        """
+        if not chips:
+            return np.zeros(0)
+        probs = np.array([self.distribution(chip) for chip in chips])
+        tables = OBSERVATIONS[[a.type_id for a in attackers], [a.defeat_id + 1 for a in attackers]]
+        q = np.einsum("nd,ndk->nk", probs, tables)
+        return -(q * np.log2(np.where(q > 0, q, 1.0))).sum(axis=1)
+
+    def expected(self, chip, values):
+        """对方棋子的期望值，values: 按类型编号的数值数组"""
+        return float(self.distribution(chip) @ values)
@@ -0,0 +1,71 @@
+# bitboard.py
+# 位棋盘工具：5x6 棋盘共 30 格，每格一位，第 r 行第 c 列对应 bit (r*COLS + c)
+from .rules import ROWS, COLS
+
+SQUARES = ROWS * COLS
+FULL_MASK = (1 << SQUARES) - 1
+FIRST_COL = sum(1 << (r * COLS) for r in range(ROWS))
+LAST_COL = FIRST_COL << (COLS - 1)
+
+def square(r, c):
+    """坐标 -> 格子编号"""
+    return r * COLS + c
+
+SQUARE_POS = [divmod(sq, COLS) for sq in range(SQUARES)]  # 格子编号 -> (r, c)
+
+# -------- 整体平移（越界的位被丢弃） --------
+def shift_down(bb):
+    return (bb << COLS) & FULL_MASK
+
+def shift_up(bb):
+    return bb >> COLS
+
+def shift_right(bb):
+    return (bb & ~LAST_COL) << 1
+
+def shift_left(bb):
+    return (bb & ~FIRST_COL) >> 1
+
+# 每个方向: (dr, dc, 格子编号增量, 把目标格平移回起点格的函数)
+# 与 rules.DIRECTIONS 顺序一致
+SOURCE_SHIFTS = [
+    (1, 0, COLS, shift_up),
+    (-1, 0, -COLS, shift_down),
+    (0, 1, 1, shift_left),
+    (0, -1, -1, shift_right),
+]
+
+# 每格的四邻域掩码
+NEIGHBOUR_MASKS = [shift_down(1 << sq) | shift_up(1 << sq) | shift_right(1 << sq) | shift_left(1 << sq)
+                   for sq in range(SQUARES)]
+
+# 以每格为中心的五格掩码（自身 + 四邻域）：该格变化时起点可能受影响的格子
+AROUND_MASKS = [NEIGHBOUR_MASKS[sq] | 1 << sq for sq in range(SQUARES)]
+# ACTION_TUPLES[from_sq][to_sq] = (sr, sc, tr, tc)，复用同一个元组对象
+ACTION_TUPLES = [[SQUARE_POS[s] + SQUARE_POS[t] for t in range(SQUARES)] for s in range(SQUARES)]
+
+def iter_bits(bb):
+    """按编号从小到大遍历所有置位的格子"""
+    while bb:
+        low = bb & -bb
+        yield low.bit_length() - 1
+        bb ^= low
+
+def popcount(bb):
+    """置位数量"""
+    return bb.bit_count()
+
+def sources_and_targets(own, allowed):
+    """
+    生成从 own 中的棋子走到 allowed 中格子的所有动作
+    返回: [(from_sq, to_sq), ...]
+    """
+    pairs = []
+    for dr, dc, delta, back in SOURCE_SHIFTS:
+        sources = own & back(allowed)
+        while sources:
+            low = sources & -sources
+            sq = low.bit_length() - 1
+            pairs.append((sq, sq + delta))
+            sources ^= low
+    return pairs
@@ -0,0 +1,56 @@
+# chip.py
+from .rules import CHIP_IDS, CHIP_NAMES, NO_DEFEAT
+
+class Chip:
+    """
+    棋子类（__slots__，无实例 __dict__），包含：
+      - type_id: 棋子类型编号（rules.CHIP_IDS，用于查表）
+      - is_player: 是否为玩家一方
+      - defeat_id: 曾击败的最高等级棋子类型编号，NO_DEFEAT 表示没有
+    name / defeat 为按名称读写的兼容属性（界面显示、网络消息使用）
+    """
+    __slots__ = ("type_id", "is_player", "defeat_id")
+
+    def __init__(self, name, is_player=True):
+        self.type_id = CHIP_IDS[name]
+        self.is_player = is_player
+        self.defeat_id = NO_DEFEAT  # 记录击败过的最高等级棋子
+
+    @property
+    def name(self):
+        """棋子名字（kyo / mai / orichi 等）"""
+        return CHIP_NAMES[self.type_id]
+
+    @property
+    def defeat(self):
+        """曾击败的棋子名称（用于背面显示，跟随棋子移动）"""
+        return CHIP_NAMES[self.defeat_id] if self.defeat_id != NO_DEFEAT else None
+
+    @defeat.setter
+    def defeat(self, name):
+        self.defeat_id = CHIP_IDS[name] if name is not None else NO_DEFEAT
+
+    def copy(self):
+        """复制棋子（类型、阵营与 defeat 相同的新对象）"""
+        chip = Chip.__new__(Chip)
+        chip.type_id, chip.is_player, chip.defeat_id = self.type_id, self.is_player, self.defeat_id
+        return chip
+
+    def __repr__(self):
+        return f"{'P' if self.is_player else 'A'}:{self.name}"
+
+# -------- 单字节编码（用于紧凑存储局面） --------
+# bit0-2: type_id + 1（0 表示空格），bit3: is_player，bit4-7: defeat_id + 1
+def encode_chip(chip):
+    """棋子 -> 0..255 的整数编码，空格为 0"""
+    if chip is None:
+        return 0
+    return (chip.type_id + 1) | (chip.is_player << 3) | ((chip.defeat_id + 1) << 4)
+
+def decode_chip(code):
+    """整数编码 -> 新的棋子对象，0 返回 None"""
+    if not code:
+        return None
+    chip = Chip(CHIP_NAMES[(code & 7) - 1], bool(code & 8))
+    chip.defeat_id = (code >> 4) - 1
+    return chip
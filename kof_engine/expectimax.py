@@ -0,0 +1,304 @@
+# expectimax.py
+# 带机会节点的深度受限 *-minimax（Star1 剪枝，无 pygame 依赖）
+# 攻击结果取决于对方棋子身份：按身份后验把可能类型分组（结果相同、defeat 标签相同的归为一支），
+# 每支按概率加权；分支中该棋子的约束收紧为这一组类型，随后的搜索与估值都基于收紧后的约束
+import time
+from .rules import NUM_CHIP_TYPES, COMBAT_TABLE, DEFEAT_UPDATE, ATTACK_SUCCESS, FUSION, MAX_TURNS, MAX_IDLE_TURNS
+from .knowledge import types_of
+from .bitboard import SQUARE_POS, square, iter_bits, popcount
+from .zobrist import cell_key
+from .ttable import TranspositionTable, EXACT, LOWER, UPPER
+from .belief import BeliefTracker
+from .ai_pro import CHIP_VALUE_BY_ID, beliefs
+
+WIN = 1000.0   # 估值上界（material 差距不会超过它）
+LOSS = -WIN
+
+class _Timeout(Exception):
+    """超过时间或节点上限，中止当前一轮迭代加深"""
+
+class ExpectimaxSearch:
+    """
+    一次搜索的上下文（搜索方视为 AI：player 方搜索时在私有副本中镜像双方阵营）
+      - sim: 私有局面副本，对方棋子的 type_id 只用于执行动作，估值只看约束与后验
+      - probs: 对方棋子 -> 根局面的类型后验 [7]
+      - values: 对方棋子 -> 当前约束下的期望价值
+      - tt: 置换表（GameState.key 已包含对方棋子的约束）
+      - deadline / node_limit: 截止时刻（time.perf_counter()）/ 节点上限，None 表示不限
+      - stop: 可选的 threading.Event，置位后尽快中止（ponder 使用）
+    enemy_to_move: 根局面是否由对方行动（ponder 时为 True，置换表键与对方落子后的局面一致）
+    """
+    def __init__(self, state, is_player=False, tt=None, enemy_to_move=False):
+        self.tt = tt if tt is not None else TranspositionTable()
+        self.nodes = 0
+        self.deadline = None
+        self.node_limit = None
+        self.stop = None
+        if is_player:
+            belief = BeliefTracker(state.knowledge[True])
+            belief.update()
+        else:
+            belief = beliefs(state)
+        source = state.knowledge[is_player]
+
+        sim = self.sim = state.copy()
+        self.tracker = sim.knowledge[False]
+        self.probs = {}
+        self.values = {}
+        for row, sim_row in zip(state.board, sim.board):
+            for c, chip in enumerate(row):
+                if chip is None:
+                    continue
+                copy = sim_row[c]
+                copy.is_player = chip.is_player != is_player
+                if copy.is_player:
+                    self.tracker.allowed[copy] = source.mask(chip)
+                    self.probs[copy] = belief.distribution(chip).tolist()
+                    self.values[copy] = self._expected(copy, self.tracker.allowed[copy])
+        if is_player:
+            sim.player_idle_count, sim.ai_idle_count = state.ai_idle_count, state.player_idle_count
+        sim.player_to_move = enemy_to_move
+        sim.sync_bitboards()
+
+    # -------- 约束与估值 --------
+    def _expected(self, chip, mask):
+        """对方棋子在约束 mask 下的期望价值"""
+        probs = self.probs[chip]
+        total = value = 0.0
+        for t in types_of(mask):
+            total += probs[t]
+            value += probs[t] * CHIP_VALUE_BY_ID[t]
+        if total == 0:
+            options = types_of(mask)
+            return sum(CHIP_VALUE_BY_ID[t] for t in options) / len(options)
+        return value / total
+
+    def _narrow(self, sq, chip, mask):
+        """把 sq 上对方棋子的约束收紧为 mask（同步位棋盘与哈希），返回恢复用的旧值"""
+        sim, tracker = self.sim, self.tracker
+        old = (chip.type_id, tracker.allowed[chip], self.values[chip])
+        sim.key ^= cell_key(sq, chip, tracker)
+        bit = 1 << sq
+        sim.piece_masks[chip.type_id] &= ~bit
+        chip.type_id = types_of(mask)[0]  # 同组类型的战斗结果相同，任取其一执行动作
+        sim.piece_masks[chip.type_id] |= bit
+        tracker.allowed[chip] = mask
+        self.values[chip] = self._expected(chip, mask)
+        sim.key ^= cell_key(sq, chip, tracker)
+        return old
+
+    def _restore(self, sq, chip, old):
+        sim, tracker = self.sim, self.tracker
+        sim.key ^= cell_key(sq, chip, tracker)
+        bit = 1 << sq
+        sim.piece_masks[chip.type_id] &= ~bit
+        chip.type_id, tracker.allowed[chip], self.values[chip] = old
+        sim.piece_masks[chip.type_id] |= bit
+        sim.key ^= cell_key(sq, chip, tracker)
+
+    def type_probs(self, chip):
+        """对方棋子的类型概率 [7]（机会分支的权重，取根局面的后验）"""
+        return self.probs[chip]
+
+    def position_key(self, depth):
+        """置换表键（depth 为剩余搜索深度）"""
+        return self.sim.key
+
+    def evaluate(self):
+        """搜索方视角的估值：己方棋子价值 - 对方棋子期望价值"""
+        sim = self.sim
+        own = sim.occupancy[False]
+        score = 0.0
+        for t in range(NUM_CHIP_TYPES):
+            score += CHIP_VALUE_BY_ID[t] * popcount(sim.piece_masks[t] & own)
+        board, values = sim.board, self.values
+        for sq in iter_bits(sim.occupancy[True]):
+            r, c = SQUARE_POS[sq]
+            score -= values[board[r][c]]
+        return score
+
+    def _leaf(self, depth):
+        """终局或深度用尽时的估值，否则返回 None（回合上限时按估值，避免用到隐藏身份）"""
+        sim = self.sim
+        if not sim.occupancy[True]:
+            return WIN
+        if not sim.occupancy[False]:
+            return LOSS
+        if sim.player_idle_count >= MAX_IDLE_TURNS:
+            return WIN
+        if sim.ai_idle_count >= MAX_IDLE_TURNS:
+            return LOSS
+        if depth <= 0 or sim.turn_count >= MAX_TURNS:
+            return self.evaluate()
+        return None
+
+    # -------- 搜索 --------
+    def _branches(self, attacker, defender, enemy_attacks):
+        """
+        攻击的机会分支: [(概率, 对方棋子收紧后的约束), ...]
+        按 (结果, 己方获胜棋子的新 defeat 标签) 把对方可能的类型分组
+        """
+        enemy = attacker if enemy_attacks else defender
+        mine = defender if enemy_attacks else attacker
+        probs = self.type_probs(enemy)
+        groups = {}
+        for t in types_of(self.tracker.allowed[enemy]):
+            outcome = COMBAT_TABLE[t][mine.type_id] if enemy_attacks else COMBAT_TABLE[mine.type_id][t]
+            mine_won = outcome != FUSION and (outcome == ATTACK_SUCCESS) != enemy_attacks
+            label = t if mine_won and DEFEAT_UPDATE[mine.defeat_id + 1][t] else None
+            group = groups.setdefault((outcome, label), [0, 0.0])
+            group[0] |= 1 << t
+            group[1] += probs[t]
+        total = sum(weight for _, weight in groups.values())
+        if total == 0:
+            total = len(groups)
+            return [(1.0 / total, mask) for mask, _ in groups.values()]
+        return [(weight / total, mask) for mask, weight in groups.values() if weight > 0]
+
+    def _tick(self):
+        self.nodes += 1
+        if self.node_limit is not None and self.nodes >= self.node_limit:
+            raise _Timeout()
+        if not self.nodes & 255 and ((self.deadline is not None and time.perf_counter() >= self.deadline)
+                                     or (self.stop is not None and self.stop.is_set())):
+            raise _Timeout()
+
+    def _child(self, side, action, depth, alpha, beta):
+        """执行一个动作后的值；攻击为机会节点（Star1：按剩余概率推出子节点窗口）"""
+        sim = self.sim
+        target = None
+        if action is not None:
+            sr, sc, tr, tc = action
+            target = sim.board[tr][tc]
+        if target is None:
+            sim.make_move(side, action)
+            try:
+                return self._node(depth - 1, alpha, beta, not side)
+            finally:
+                sim.unmake_move()
+
+        attacker = sim.board[sr][sc]
+        enemy_sq = square(sr, sc) if side else square(tr, tc)
+        enemy = attacker if side else target
+        expected, remaining = 0.0, 1.0
+        for p, mask in self._branches(attacker, target, side):
+            remaining -= p
+            lo = max(LOSS, (alpha - expected - WIN * remaining) / p)
+            hi = min(WIN, (beta - expected - LOSS * remaining) / p)
+            old = self._narrow(enemy_sq, enemy, mask)
+            sim.make_move(side, action)
+            try:
+                value = self._node(depth - 1, lo, hi, not side)
+            finally:
+                sim.unmake_move()
+                self._restore(enemy_sq, enemy, old)
+            expected += p * value
+            if expected + WIN * remaining <= alpha:
+                return alpha
+            if expected + LOSS * remaining >= beta:
+                return beta
+        return expected
+
+    def ordered_actions(self, side, first=None):
+        """动作排序：置换表动作 -> 攻击（目标价值高、攻击方价值低优先）-> 移动"""
+        sim = self.sim
+        board, values = sim.board, self.values
+        scored = []
+        for action in sim.legal_actions(side):
+            sr, sc, tr, tc = action
+            target = board[tr][tc]
+            if action == first:
+                key = 2 * WIN
+            elif target is None:
+                key = LOSS
+            elif side:
+                key = CHIP_VALUE_BY_ID[target.type_id] - values[board[sr][sc]] / 10
+            else:
+                key = values[target] - CHIP_VALUE_BY_ID[board[sr][sc].type_id] / 10
+            scored.append((key, action))
+        scored.sort(key=lambda item: item[0], reverse=True)
+        return [action for _, action in scored]
+
+    def _node(self, depth, alpha, beta, side):
+        """side 为 False 时取最大（搜索方），True 时取最小（对方）"""
+        self._tick()
+        value = self._leaf(depth)
+        if value is not None:
+            return value
+        key = self.position_key(depth)
+        entry = self.tt.probe(key)
+        first = None
+        if entry is not None:
+            stored_depth, value, flag, first = entry
+            if stored_depth >= depth and (flag == EXACT or (flag == LOWER and value >= beta)
+                                          or (flag == UPPER and value <= alpha)):
+                return value
+
+        actions = self.ordered_actions(side, first) or [None]
+        alpha0, beta0 = alpha, beta
+        best, best_action = (WIN + 1, None) if side else (LOSS - 1, None)
+        for action in actions:
+            value = self._child(side, action, depth, alpha, beta)
+            if side:
+                if value < best:
+                    best, best_action = value, action
+                    beta = min(beta, value)
+            elif value > best:
+                best, best_action = value, action
+                alpha = max(alpha, value)
+            if alpha >= beta:
+                break
+
+        flag = UPPER if best <= alpha0 else LOWER if best >= beta0 else EXACT
+        self.tt.store(key, depth, best, flag, best_action)
+        return best
+
+    def search_root(self, depth, first=None):
+        """完整搜索一层深度，返回 (最佳动作, 估值)"""
+        self.tt.new_search()
+        best, best_value = None, LOSS - 1
+        alpha = LOSS - 1
+        for action in self.ordered_actions(False, first) or [None]:
+            value = self._child(False, action, depth, alpha, WIN + 1)
+            if value > best_value:
+                best, best_value = action, value
+                alpha = value
+        return best, best_value
+
+def search(state, is_player=False, max_depth=4, time_limit=None, node_limit=None, tt=None):
+    """
+    迭代加深搜索，时间或节点用完后返回最近一轮完整搜索的结果
+    返回: (动作 (sr, sc, tr, tc) 或 None, 估值, 完成的深度, 搜索节点数)
+    """
+    searcher = ExpectimaxSearch(state, is_player, tt)
+    if time_limit is not None:
+        searcher.deadline = time.perf_counter() + time_limit
+    searcher.node_limit = node_limit
+    actions = searcher.ordered_actions(False)
+    best, value, completed = (actions[0] if actions else None), 0.0, 0
+    for depth in range(1, max_depth + 1):
+        try:
+            best, value = searcher.search_root(depth, best)
+        except _Timeout:
+            break
+        completed = depth
+    return best, value, completed, searcher.nodes
+
+def ponder(state, tt, stop, is_player=False, max_depth=64):
+    """
+    对方行动期间的后台搜索：以对方为行动方迭代加深，直到 stop.is_set()
+    结果只写入置换表 tt，对方落子后用同一个 tt 搜索即可复用匹配的部分
+    """
+    searcher = ExpectimaxSearch(state, is_player, tt, enemy_to_move=True)
+    searcher.stop = stop
+    for depth in range(1, max_depth + 1):
+        tt.new_search()
+        try:
+            searcher._node(depth, LOSS - 1, WIN + 1, True)
+        except _Timeout:
+            break
+    return searcher.nodes
+
+def choose_action(state, is_player=False, max_depth=4, time_limit=None):
+    """AI 单步决策，返回 (sr, sc, tr, tc)，无动作可执行返回 None"""
+    return search(state, is_player, max_depth, time_limit)[0]
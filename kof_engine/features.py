@@ -0,0 +1,91 @@
+# features.py
+# 局面与候选动作的定长特征（NumPy，无 pygame 依赖），供学习得到的评估模型（learned.py）使用
+# 视角为行动方：己方棋子类型已知，对方棋子按行动方的身份后验；坐标不翻转（布局随机，没有方向性）
+import numpy as np
+from .rules import NUM_CHIP_TYPES, CHIP_LEVELS, MAX_TURNS, MAX_IDLE_TURNS, ATTACK_SUCCESS, ATTACK_FAIL, FUSION
+from .knowledge import START_COUNTS
+from .bitboard import SQUARES, SQUARE_POS, square, iter_bits
+from .belief import BeliefTracker, ATTACK_OUTCOMES
+
+# 每格的通道
+OWN_TYPES = slice(0, NUM_CHIP_TYPES)                        # 己方棋子类型 one-hot
+ENEMY_TYPES = slice(NUM_CHIP_TYPES, 2 * NUM_CHIP_TYPES)     # 对方棋子类型后验
+OWN_DEFEAT, ENEMY_DEFEAT = 2 * NUM_CHIP_TYPES, 2 * NUM_CHIP_TYPES + 1  # defeat 标签（按等级归一化）
+CHANNELS = 2 * NUM_CHIP_TYPES + 2
+# 全局特征：回合进度、双方无动作计数、己方各类型剩余数量、对方各类型期望剩余数量（均归一化）
+TURN, OWN_IDLE, ENEMY_IDLE = 0, 1, 2
+OWN_COUNTS = slice(3, 3 + NUM_CHIP_TYPES)
+ENEMY_COUNTS = slice(3 + NUM_CHIP_TYPES, 3 + 2 * NUM_CHIP_TYPES)
+GLOBALS = 3 + 2 * NUM_CHIP_TYPES
+N_FEATURES = SQUARES * CHANNELS + GLOBALS
+
+# defeat 标签 -> 特征值（defeat_id + 1 索引）：无标签 0，Athena 最低，其余按等级
+_DEFEAT_VALUE = [0.0] + [(max(level, 0) + 1) / (max(CHIP_LEVELS) + 1) for level in CHIP_LEVELS]
+_COUNT_SCALE = np.array(START_COUNTS, dtype=float)
+
+def observer_beliefs(state, is_player=False):
+    """is_player 一方对对方棋子身份的后验（AI 一方复用 ai_pro 缓存的后验）"""
+    if is_player:
+        belief = BeliefTracker(state.knowledge[True])
+        belief.update()
+        return belief
+    from .ai_pro import beliefs
+    return beliefs(state)
+
+def position_features(state, is_player=False):
+    """
+    is_player 一方视角的局面特征
+    返回: (planes (SQUARES, CHANNELS), globals (GLOBALS,))
+    """
+    belief = observer_beliefs(state, is_player)
+    planes = np.zeros((SQUARES, CHANNELS))
+    glob = np.zeros(GLOBALS)
+    board = state.board
+    for sq in iter_bits(state.occupancy[is_player]):
+        r, c = SQUARE_POS[sq]
+        chip = board[r][c]
+        planes[sq, chip.type_id] = 1.0
+        planes[sq, OWN_DEFEAT] = _DEFEAT_VALUE[chip.defeat_id + 1]
+        glob[OWN_COUNTS.start + chip.type_id] += 1
+    for sq in iter_bits(state.occupancy[not is_player]):
+        r, c = SQUARE_POS[sq]
+        chip = board[r][c]
+        planes[sq, ENEMY_TYPES] = belief.distribution(chip)
+        planes[sq, ENEMY_DEFEAT] = _DEFEAT_VALUE[chip.defeat_id + 1]
+    glob[ENEMY_COUNTS] = planes[:, ENEMY_TYPES].sum(axis=0)
+    glob[OWN_COUNTS] /= _COUNT_SCALE
+    glob[ENEMY_COUNTS] /= _COUNT_SCALE
+    glob[TURN] = state.turn_count / MAX_TURNS
+    own_idle, enemy_idle = ((state.player_idle_count, state.ai_idle_count) if is_player
+                            else (state.ai_idle_count, state.player_idle_count))
+    glob[OWN_IDLE] = own_idle / MAX_IDLE_TURNS
+    glob[ENEMY_IDLE] = enemy_idle / MAX_IDLE_TURNS
+    return planes, glob
+
+def action_features(state, actions, is_player=False):
+    """
+    每个候选动作执行后的期望局面特征（攻击按后验概率对成功 / 失败 / 融合三种结果加权），批量构造
+    actions: [(sr, sc, tr, tc), ...]
+    返回: (len(actions), N_FEATURES) 矩阵
+    """
+    planes, glob = position_features(state, is_player)
+    n = len(actions)
+    s = np.array([square(sr, sc) for sr, sc, _, _ in actions], dtype=int)
+    t = np.array([square(tr, tc) for _, _, tr, tc in actions], dtype=int)
+    rows = np.arange(n)
+    src, dst = planes[s], planes[t]
+    enemy = dst[:, ENEMY_TYPES]  # 目标格对方棋子的后验，空格为 0
+
+    # 结果概率 [成功, 失败, 融合]：己方类型 one-hot x 对方后验 x 战斗结果表；移动到空格视为成功
+    outcomes = np.einsum("na,nd,adk->nk", src[:, OWN_TYPES], enemy, ATTACK_OUTCOMES)
+    outcomes[enemy.sum(axis=1) == 0] = (1.0, 0.0, 0.0)
+    success, fail, fusion = outcomes[:, ATTACK_SUCCESS], outcomes[:, ATTACK_FAIL], outcomes[:, FUSION]
+
+    after = np.repeat(planes[None], n, axis=0)
+    after[rows, s] = 0.0  # 攻击方在任何结果下都离开起点
+    after[rows, t] = success[:, None] * src + fail[:, None] * dst
+    after_glob = np.repeat(glob[None], n, axis=0)
+    after_glob[:, OWN_COUNTS] -= (fail + fusion)[:, None] * src[:, OWN_TYPES] / _COUNT_SCALE
+    after_glob[:, ENEMY_COUNTS] -= (success + fusion)[:, None] * enemy / _COUNT_SCALE
+    after_glob[:, OWN_IDLE] = 0.0
+    return np.concatenate([after.reshape(n, -1), after_glob], axis=1)
@@ -0,0 +1,91 @@
+# game.py
+# 棋盘操作（无 pygame 依赖）：初始化、动作判定与执行
+import random
+from .rules import ROWS, COLS, START_COMPOSITION, DIRECTIONS, COMBAT_TABLE, OUTCOME_NAMES, DEFEAT_UPDATE
+from .chip import Chip
+
+def new_board():
+    """创建空棋盘"""
+    return [[None for _ in range(COLS)] for _ in range(ROWS)]
+
+def random_init(board, rng=random):
+    """
+    原地初始化棋盘（保留 board 对象本身，避免其他模块持有过期引用）
+    rng: 随机数来源，LAN 版本传入 random.Random(seed) 确保双方一致
+    """
+    for r in range(ROWS):
+        for c in range(COLS):
+            board[r][c] = None
+    positions = [(r, c) for r in range(ROWS) for c in range(COLS)]
+    rng.shuffle(positions)
+    for i, name in enumerate(START_COMPOSITION):
+        r, c = positions[i]
+        board[r][c] = Chip(name, True)
+    for i, name in enumerate(START_COMPOSITION):
+        r, c = positions[i+len(START_COMPOSITION)]
+        board[r][c] = Chip(name, False)
+
+def resolve_action(board, sr, sc, tr, tc):
+    """
+    判定 (sr,sc) -> (tr,tc) 的动作类型（不修改棋盘）
+    返回: 'move' / 'attack_success' / 'attack_fail' / 'fusion'，非法动作返回 None
+    """
+    if not (0 <= tr < ROWS and 0 <= tc < COLS) or abs(sr - tr) + abs(sc - tc) != 1:
+        return None
+    chip = board[sr][sc]
+    target = board[tr][tc]
+    if chip is None:
+        return None
+    if target is None:
+        return "move"
+    if target.is_player == chip.is_player:
+        return None
+    return OUTCOME_NAMES[COMBAT_TABLE[chip.type_id][target.type_id]]
+
+def apply_action(board, sr, sc, tr, tc):
+    """
+    执行动作并修改棋盘（defeat 信息跟随获胜的棋子）
+    返回: (action_type, defeat_info)，defeat_info 为更新后的 defeat 名称，未更新为 None
+    """
+    action_type = resolve_action(board, sr, sc, tr, tc)
+    chip = board[sr][sc]
+    target = board[tr][tc]
+    defeat_info = None
+
+    if action_type == "move":
+        board[tr][tc], board[sr][sc] = chip, None
+    elif action_type == "attack_success":
+        if DEFEAT_UPDATE[chip.defeat_id + 1][target.type_id]:
+            chip.defeat_id = target.type_id
+            defeat_info = target.name
+        board[tr][tc], board[sr][sc] = chip, None
+    elif action_type == "attack_fail":
+        board[sr][sc] = None
+        if DEFEAT_UPDATE[target.defeat_id + 1][chip.type_id]:
+            target.defeat_id = chip.type_id
+            defeat_info = chip.name
+    elif action_type == "fusion":
+        board[sr][sc] = board[tr][tc] = None
+
+    return action_type, defeat_info
+
+def legal_actions(board, is_player):
+    """某一方所有合法动作: [(sr, sc, tr, tc), ...]"""
+    actions = []
+    for sr in range(ROWS):
+        for sc in range(COLS):
+            chip = board[sr][sc]
+            if not chip or chip.is_player != is_player:
+                continue
+            for dr, dc in DIRECTIONS:
+                r, c = sr + dr, sc + dc
+                if not (0 <= r < ROWS and 0 <= c < COLS):
+                    continue
+                target = board[r][c]
+                if target is None or target.is_player != is_player:
+                    actions.append((sr, sc, r, c))
+    return actions
+
+def has_chips(board, is_player):
+    """某一方是否还有棋子"""
+    return any(b and b.is_player == is_player for row in board for b in row)
@@ -0,0 +1,157 @@
+# horizon.py
+# 回合上限附近的精确求解（无 pygame 依赖）：剩余步数不多时直接搜索到 MAX_TURNS，
+# 终局按 check_winner（从 orichi 到 kyo 逐级比较剩余数量）计分，不再使用 material 估值。
+# 对方身份未知：终局得分取对方存活棋子数量的后验分布下的期望，
+# 机会分支的权重取当前约束（含分支中收紧的约束）下的精确后验
+import numpy as np
+from .rules import NUM_CHIP_TYPES, WINNER_ORDER, MAX_IDLE_TURNS
+from .knowledge import START_COUNTS
+from .bitboard import SQUARE_POS, iter_bits, popcount
+from .belief import conditional, count_distribution
+from .zobrist import PLY_KEYS, DEAD_KEYS, dead_key
+from .ttable import TranspositionTable
+from .expectimax import ExpectimaxSearch, WIN, LOSS, _Timeout
+from .tablebase import remaining_plies
+
+HORIZON_PLIES = 4  # 距回合上限的剩余单方步数不超过该值时启用
+
+_COUNTS = np.indices([n + 1 for n in START_COUNTS])  # _COUNTS[t][u] = u[t]
+
+def score_grid(own_counts):
+    """
+    搜索方各类型数量为 own_counts 时，check_winner 在对方数量网格上的得分（搜索方视角）
+    胜 WIN，负 LOSS，平 0
+    """
+    grid = np.zeros(_COUNTS.shape[1:])
+    decided = np.zeros(grid.shape, dtype=bool)
+    for t in WINNER_ORDER:
+        theirs = _COUNTS[t]
+        grid[~decided & (theirs < own_counts[t])] = WIN
+        grid[~decided & (theirs > own_counts[t])] = LOSS
+        decided |= theirs != own_counts[t]
+    return grid
+
+class HorizonSearch(ExpectimaxSearch):
+    """
+    搜索到回合上限的 ExpectimaxSearch（depth 即剩余单方步数）
+      - dead: 根局面已阵亡的对方棋子的约束（搜索中被吃掉的棋子按其在 tracker.allowed 中的约束计入）
+      - leaf_cache: {(存活约束, 阵亡约束, 己方数量): 期望得分}，不同摆放共享
+    置换表键额外包含剩余步数与已阵亡约束（含搜索中被吃掉的棋子），同一个置换表可跨步复用
+    """
+    def __init__(self, state, is_player=False, tt=None):
+        super().__init__(state, is_player, tt)
+        source = state.knowledge[is_player]
+        self.dead = list(source.dead)
+        self.dead_key = dead_key(source)
+        self.dead_counts = {}
+        for mask in self.dead:
+            self.dead_counts[mask] = self.dead_counts.get(mask, 0) + 1
+        self.marginal_cache = {}
+        self.leaf_cache = {}
+        self.grids = {}
+
+    def type_probs(self, chip):
+        """当前全部约束下的精确后验（按该棋子与其余棋子的约束组合缓存）"""
+        allowed = self.tracker.allowed
+        mask = allowed[chip]
+        others = sorted(allowed.values())
+        others.remove(mask)
+        key = (mask, tuple(others))
+        probs = self.marginal_cache.get(key)
+        if probs is None:
+            probs = conditional(mask, others + self.dead)
+            probs = self.marginal_cache[key] = probs.tolist() if probs is not None else self.probs[chip]
+        return probs
+
+    def position_key(self, depth):
+        key = self.sim.key ^ PLY_KEYS[depth] ^ self.dead_key
+        if len(self.tracker.allowed) != popcount(self.sim.occupancy[True]):
+            key ^= self.captured_key()  # 搜索中有对方棋子被吃掉，其约束影响终局得分
+        return key
+
+    def captured_key(self):
+        """搜索中被吃掉的对方棋子约束的哈希分量（与 zobrist.dead_key 接续编号，与根局面的阵亡约束合并计数）"""
+        sim, allowed = self.sim, self.tracker.allowed
+        live = {sim.board[r][c] for r, c in (SQUARE_POS[sq] for sq in iter_bits(sim.occupancy[True]))}
+        key = 0
+        seen = dict(self.dead_counts)
+        for chip, mask in allowed.items():
+            if chip not in live:
+                n = seen.get(mask, 0)
+                key ^= DEAD_KEYS[mask][n]
+                seen[mask] = n + 1
+        return key
+
+    def evaluate(self):
+        """回合上限或一方棋子耗尽时 check_winner 的期望得分（搜索方视角）"""
+        sim = self.sim
+        own = sim.occupancy[False]
+        counts = tuple(popcount(sim.piece_masks[t] & own) for t in range(NUM_CHIP_TYPES))
+        board, allowed = sim.board, self.tracker.allowed
+        live = sorted(allowed[board[r][c]] for r, c in (SQUARE_POS[sq] for sq in iter_bits(sim.occupancy[True])))
+        # 全部约束减去存活约束即为搜索中被吃掉的棋子，根局面的阵亡约束不变
+        key = (tuple(live), tuple(sorted(allowed.values())), counts)
+        value = self.leaf_cache.get(key)
+        if value is None:
+            dead = list(key[1])
+            for mask in live:
+                dead.remove(mask)
+            distribution = count_distribution(live, dead + self.dead)
+            if distribution is None:
+                return super().evaluate()  # 约束互相矛盾，退回 material 估值
+            grid = self.grids.get(counts)
+            if grid is None:
+                grid = self.grids[counts] = score_grid(counts)
+            value = self.leaf_cache[key] = float((distribution * grid).sum())
+        return value
+
+    def _child(self, side, action, depth, alpha, beta):
+        if depth == 1 and action is not None:
+            sr, sc, tr, tc = action
+            if self.sim.board[tr][tc] is None:
+                # 最后一步的移动不改变数量与约束，终局得分与当前局面相同，无需执行
+                return self.evaluate()
+        return super()._child(side, action, depth, alpha, beta)
+
+    def _leaf(self, depth):
+        """depth 为剩余单方步数，用完即到达回合上限（与 result() 相同的判定顺序）"""
+        sim = self.sim
+        if sim.player_idle_count >= MAX_IDLE_TURNS:
+            return WIN
+        if sim.ai_idle_count >= MAX_IDLE_TURNS:
+            return LOSS
+        if depth <= 0 or not sim.occupancy[True] or not sim.occupancy[False]:
+            return self.evaluate()
+        return None
+
+class HorizonSolver:
+    """
+    回合上限附近的求解器（跨步复用置换表）
+      - max_plies: 距回合上限的剩余单方步数不超过该值时启用
+      - nodes: 最近一次求解的节点数
+    """
+    def __init__(self, max_plies=HORIZON_PLIES, tt=None):
+        self.max_plies = max_plies
+        self.tt = tt if tt is not None else TranspositionTable()
+        self.nodes = 0
+
+    def solve(self, state, is_player=False, deadline=None, node_limit=None):
+        """
+        is_player 一方行动时精确搜索到回合上限
+        deadline: 截止时刻（time.perf_counter() 的取值），node_limit: 节点上限，None 表示不限
+        返回: (动作 (sr, sc, tr, tc) 或 None, 搜索方视角的期望得分 [-1, 1])，
+              不在启用范围内或未能在预算内完成时返回 None
+        """
+        plies = remaining_plies(state)
+        if plies > self.max_plies or state.result() is not None:
+            return None
+        searcher = HorizonSearch(state, is_player, self.tt)
+        searcher.deadline = deadline
+        searcher.node_limit = node_limit
+        try:
+            action, value = searcher.search_root(plies)
+        except _Timeout:
+            return None
+        finally:
+            self.nodes = searcher.nodes
+        return action, float(value) / WIN
@@ -0,0 +1,130 @@
+# ismcts.py
+# 信息集蒙特卡洛树搜索（SO-ISMCTS，无 pygame 依赖）
+# AI 看不到对方棋子身份：每次迭代从身份后验（约束 + 行为证据）采样一组身份，在确定化的局面上搜索
+import math
+import random
+import time
+from .knowledge import ALL_TYPES, types_of
+from .belief import BeliefTracker
+
+class Node:
+    """
+    搜索树节点，包含：
+      - action: 到达该节点的动作 (sr, sc, tr, tc)，None 表示无动作
+      - mover: 执行该动作的一方（is_player）
+      - visits / wins: 访问次数与 mover 一方的累计得分
+      - avail: 该动作在父节点可选的次数（不同确定化下可选动作不同）
+    """
+    __slots__ = ("action", "parent", "mover", "children", "visits", "wins", "avail")
+
+    def __init__(self, action=None, parent=None, mover=None):
+        self.action = action
+        self.parent = parent
+        self.mover = mover
+        self.children = {}
+        self.visits = 0
+        self.wins = 0.0
+        self.avail = 1
+
+def determinize(state, observer_is_player, rng=random, belief=None):
+    """
+    复制局面并把对方棋子替换为一组采样身份：按观察方的精确后验（与已知的全部结果一致，
+    设置了行为模型时按行为证据加权）抽取
+    belief: 观察方的 BeliefTracker（同一局面多次确定化时复用后向计数），None 表示新建
+    约束互相矛盾时，退回到每个棋子在自身掩码内独立均匀采样（不满足阵容数量），
+    对方棋子的真实身份不会进入确定化的局面
+    返回: 新的 GameState
+    """
+    tracker = state.knowledge[observer_is_player]
+    if belief is None:
+        belief = BeliefTracker(tracker)
+    assignment = belief.sample(rng) or {}
+    det = state.copy()
+    for row, det_row in zip(state.board, det.board):
+        for c, chip in enumerate(row):
+            if chip is not None and chip.is_player != observer_is_player:
+                t = assignment.get(chip)
+                det_row[c].type_id = t if t is not None else rng.choice(types_of(tracker.mask(chip) or ALL_TYPES))
+    det.sync_bitboards()
+    return det
+
+def _iterate(root, state, is_player, exploration, rollout_depth, rng, belief, to_move=None):
+    """一次迭代：确定化 -> 选择 / 扩展 -> 随机模拟 -> 回传（to_move: 根局面行动方，默认为 is_player）"""
+    det = determinize(state, is_player, rng, belief)
+    node, side = root, is_player if to_move is None else to_move
+
+    # 选择 / 扩展
+    while det.result() is None:
+        legal = det.legal_actions(side) or [None]
+        untried = []
+        for action in legal:
+            child = node.children.get(action)
+            if child is None:
+                untried.append(action)
+            else:
+                child.avail += 1
+        if untried:
+            action = rng.choice(untried)
+            node.children[action] = node = Node(action, node, side)
+            det.make_move(side, action)
+            side = not side
+            break
+        node = max((node.children[a] for a in legal),
+                   key=lambda n: n.wins / n.visits + exploration * math.sqrt(math.log(n.avail) / n.visits))
+        det.make_move(side, node.action)
+        side = not side
+
+    # 模拟：限定步数的随机走子，截断时按 check_winner 计分
+    for _ in range(rollout_depth):
+        if det.result() is not None:
+            break
+        legal = det.legal_actions(side)
+        det.make_move(side, rng.choice(legal) if legal else None)
+        side = not side
+
+    # 回传
+    reward = det.score(is_player)
+    while node is not None:
+        node.visits += 1
+        node.wins += reward if node.mover == is_player else 1.0 - reward
+        node = node.parent
+
+def search(state, is_player=False, iterations=1000, time_limit=None, exploration=0.7,
+           rollout_depth=20, rng=random, root=None):
+    """
+    从 is_player 一方的视角搜索
+    iterations / time_limit: 迭代次数上限 / 时间上限（秒），任一用完即停止，None 表示不限
+    root: 继续使用的已有根节点（如 ponder 保留下来的子树），None 表示新建
+    返回: (访问次数最多的动作, 根节点)，动作为 None 表示无动作可执行
+    """
+    if root is None:
+        root = Node(mover=not is_player)
+    deadline = time.perf_counter() + time_limit if time_limit is not None else None
+    belief = BeliefTracker(state.knowledge[is_player])
+    done = 0
+    while (iterations is None or done < iterations) and \
+          (deadline is None or time.perf_counter() < deadline):
+        _iterate(root, state, is_player, exploration, rollout_depth, rng, belief)
+        done += 1
+    if not root.children:
+        return None, root
+    best = max(root.children.values(), key=lambda n: n.visits)
+    return best.action, root
+
+def ponder(state, stop, is_player=False, exploration=0.7, rollout_depth=20, rng=random):
+    """
+    对方行动期间的后台搜索：根局面由对方行动，直到 stop.is_set()
+    返回: 根节点（对方落子后取 root.children[对方动作] 作为新的根继续搜索）
+    """
+    root = Node(mover=is_player)
+    belief = BeliefTracker(state.knowledge[is_player])
+    while not stop.is_set():
+        _iterate(root, state, is_player, exploration, rollout_depth, rng, belief, to_move=not is_player)
+    return root
+
+def choose_action(state, is_player=False, iterations=1000, time_limit=None, rng=random):
+    """
+    AI 单步决策（供 ai_move_one_step 使用）
+    返回: (sr, sc, tr, tc)，无动作可执行返回 None
+    """
+    return search(state, is_player, iterations, time_limit, rng=rng)[0]
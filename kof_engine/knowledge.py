@@ -0,0 +1,127 @@
+# knowledge.py
+# 观察方对对方隐藏棋子身份的约束（无 pygame 依赖）
+# 每个对方棋子用一个 7 位掩码表示仍可能的类型，约束跟随棋子对象移动
+from .rules import (NUM_CHIP_TYPES, ATHENA, START_COMPOSITION, CHIP_IDS, COMBAT_TABLE,
+                    DEFEAT_UPDATE, NO_DEFEAT, FUSION)
+from .bitboard import SQUARE_POS, NEIGHBOUR_MASKS, square, popcount
+
+ALL_TYPES = (1 << NUM_CHIP_TYPES) - 1
+START_COUNTS = [0] * NUM_CHIP_TYPES  # 每方初始各类型数量
+for _name in START_COMPOSITION:
+    START_COUNTS[CHIP_IDS[_name]] += 1
+
+def types_of(mask):
+    """掩码 -> 类型编号列表"""
+    return [t for t in range(NUM_CHIP_TYPES) if mask >> t & 1]
+
+# DEFENDER_MASKS[攻击方类型][结果]: 产生该结果时防守方可能的类型
+DEFENDER_MASKS = [[sum(1 << d for d in range(NUM_CHIP_TYPES) if COMBAT_TABLE[a][d] == outcome)
+                   for outcome in range(3)] for a in range(NUM_CHIP_TYPES)]
+# ATTACKER_MASKS[防守方类型][结果]: 产生该结果时攻击方可能的类型
+ATTACKER_MASKS = [[sum(1 << a for a in range(NUM_CHIP_TYPES) if COMBAT_TABLE[a][d] == outcome)
+                   for outcome in range(3)] for d in range(NUM_CHIP_TYPES)]
+# KEEP_DEFEAT_MASKS[defeat_id + 1]: 击败后 defeat 标签不变时，被击败方可能的类型
+KEEP_DEFEAT_MASKS = [sum(1 << t for t in range(NUM_CHIP_TYPES) if not DEFEAT_UPDATE[cur + 1][t])
+                     for cur in range(NO_DEFEAT, NUM_CHIP_TYPES)]
+
+_OUTCOME_IDS = {"attack_success": 0, "attack_fail": 1, "fusion": FUSION}
+
+# -------- 对方走子的行为类别（opponent.OpponentModel 按类别给出各类型的似然） --------
+ATTACK, ATTACK_TAGGED, ADVANCE, RETREAT, MANOEUVRE = range(5)
+BEHAVIOURS = ["attack", "attack_tagged", "advance", "retreat", "manoeuvre"]
+# 距离恰为 2 的格子掩码（相邻格子之外的一圈）
+_RING_MASKS = [sum(1 << other for other, (r2, c2) in enumerate(SQUARE_POS) if abs(r - r2) + abs(c - c2) == 2)
+               for r, c in SQUARE_POS]
+
+def _pressure(sq, enemies):
+    """sq 附近的对方棋子：相邻的计 2，距离 2 的计 1"""
+    return 2 * popcount(NEIGHBOUR_MASKS[sq] & enemies) + popcount(_RING_MASKS[sq] & enemies)
+
+def classify_move(state, sr, sc, tr, tc):
+    """
+    (sr, sc) -> (tr, tc) 的行为类别（在动作执行前按公开局面判定，只做位棋盘运算，O(1)）
+    攻击按目标是否带 defeat 标签（已证明能赢）区分，移动按附近对方棋子的多少分为靠近 / 后撤 / 调动
+    """
+    mover = state.board[sr][sc]
+    target = state.board[tr][tc]
+    if target is not None:
+        return ATTACK_TAGGED if target.defeat_id != NO_DEFEAT else ATTACK
+    enemies = state.occupancy[not mover.is_player]
+    before, after = _pressure(square(sr, sc), enemies), _pressure(square(tr, tc), enemies)
+    if after > before:
+        return ADVANCE
+    return RETREAT if after < before else MANOEUVRE
+
+class IdentityTracker:
+    """
+    观察方（observer_is_player）对对方棋子身份的约束，包含：
+      - allowed: 存活的对方棋子 -> 可能类型掩码 {Chip: int}
+      - dead: 已阵亡的对方棋子的可能类型掩码列表（用于约束剩余数量）
+      - behaviour: 可选的行为模型（opponent.OpponentModel），设置后按对方的走子累积行为证据
+      - evidence: 走过子的存活对方棋子 -> 各类型的行为对数似然 [7]（不是硬约束，由 BeliefTracker 加权）
+      - observed_moves: 已观察到的对方走子数（每个存活棋子“未被选中走子”的证据按此统一计算）
+      - evidence_version: 行为证据每更新一次 +1
+    """
+    def __init__(self, observer_is_player=False):
+        self.observer_is_player = observer_is_player
+        self.allowed = {}
+        self.dead = []
+        self.behaviour = None
+        self.evidence = {}
+        self.observed_moves = 0
+        self.evidence_version = 0
+
+    def reset(self, board):
+        """开局：对方所有棋子都可能是任意类型（保留行为模型，清空行为证据）"""
+        self.allowed = {chip: ALL_TYPES for row in board for chip in row
+                        if chip and chip.is_player != self.observer_is_player}
+        self.dead = []
+        self.evidence = {}
+        self.observed_moves = 0
+        self.evidence_version += 1
+
+    def observe_move(self, chip, behaviour_id):
+        """对方 chip 的一次走子（classify_move 的类别），O(1) 累加该棋子的行为对数似然"""
+        row = self.behaviour.log_likelihood[behaviour_id]
+        current = self.evidence.get(chip)
+        self.evidence[chip] = row if current is None else [a + b for a, b in zip(current, row)]
+        self.observed_moves += 1
+        self.evidence_version += 1
+
+    def mask(self, chip):
+        """某个对方棋子当前可能类型的掩码"""
+        return self.allowed.get(chip, ALL_TYPES)
+
+    def observe(self, chip, target, action_type, defeat_info):
+        """
+        根据一次动作的公开结果收紧约束（在 apply_action 之后调用）
+        chip: 攻击方，target: 目标格棋子，action_type / defeat_info: apply_action 的返回值
+        defeat 标签对双方可见：己方棋子获胜时，标签是否更新也透露对方类型
+        """
+        if target is None or action_type is None or action_type == "move":
+            return
+        outcome = _OUTCOME_IDS[action_type]
+        if chip.is_player == self.observer_is_player:
+            mine, theirs = chip, target
+            mask = DEFENDER_MASKS[chip.type_id][outcome]
+            mine_won = outcome == 0
+        else:
+            mine, theirs = target, chip
+            mask = ATTACKER_MASKS[target.type_id][outcome]
+            mine_won = outcome == 1
+        if outcome == FUSION and mine.type_id == ATHENA:
+            mask = ALL_TYPES  # 己方 Athena 与任何棋子都同归于尽，得不到信息
+
+        mask &= self.allowed.pop(theirs, ALL_TYPES)
+        if mine_won:
+            # 标签更新则正好是对方类型，否则对方类型不足以更新标签
+            if defeat_info is not None:
+                mask &= 1 << CHIP_IDS[defeat_info]
+            else:
+                mask &= KEEP_DEFEAT_MASKS[mine.defeat_id + 1]
+        if not mine_won and outcome != FUSION:
+            self.allowed[theirs] = mask  # 对方获胜，棋子仍在场
+        else:
+            self.dead.append(mask)
+            if self.evidence.pop(theirs, None) is not None:
+                self.evidence_version += 1
@@ -0,0 +1,136 @@
+# learned.py
+# 学习得到的动作评估模型（NumPy，无 pygame 依赖）：由自对弈记录离线训练，
+# 一次矩阵乘法为全部候选动作打分（features.action_features 批量构造特征）
+# 记录: python -m kof_engine.selfplay heuristic heuristic --games 2000 --record games.npz
+# 训练: python -m kof_engine.learned games.npz kof_model.npz --hidden 64 --epochs 20
+import argparse
+import numpy as np
+from .features import N_FEATURES, action_features
+
+class ValueModel:
+    """
+    动作价值模型：tanh(relu(x W1 + b1) w2 + b2)，hidden=0 时为线性模型 tanh(x w2 + b2)
+    输入为动作执行后的期望局面特征，输出为行动方视角的期望结果（胜 1，平 0，负 -1）
+      - params: {"W1", "b1", "w2", "b2"}（线性模型只有 w2 / b2）
+    """
+    def __init__(self, n_features=N_FEATURES, hidden=64, seed=0):
+        rng = np.random.default_rng(seed)
+        self.hidden = hidden
+        if hidden:
+            self.params = {"W1": rng.normal(0, np.sqrt(2 / n_features), (n_features, hidden)),
+                           "b1": np.zeros(hidden),
+                           "w2": rng.normal(0, np.sqrt(1 / hidden), hidden),
+                           "b2": np.zeros(())}
+        else:
+            self.params = {"w2": np.zeros(n_features), "b2": np.zeros(())}
+
+    def _forward(self, X):
+        p = self.params
+        h = np.maximum(X @ p["W1"] + p["b1"], 0.0) if self.hidden else X
+        return h, np.tanh(h @ p["w2"] + p["b2"])
+
+    def predict(self, X):
+        """X: (n, n_features) -> (n,) 的预测值"""
+        return self._forward(X)[1]
+
+    def _gradients(self, X, y):
+        """均方误差对各参数的梯度"""
+        p = self.params
+        h, out = self._forward(X)
+        d_out = 2 * (out - y) * (1 - out ** 2) / len(y)
+        grads = {"w2": h.T @ d_out, "b2": d_out.sum()}
+        if self.hidden:
+            d_h = np.outer(d_out, p["w2"]) * (h > 0)
+            grads["W1"] = X.T @ d_h
+            grads["b1"] = d_h.sum(axis=0)
+        return grads
+
+    def fit(self, X, y, epochs=20, batch_size=256, lr=1e-3, seed=0, log=print):
+        """Adam 小批量训练，返回每轮的训练均方误差"""
+        rng = np.random.default_rng(seed)
+        m = {k: np.zeros_like(v) for k, v in self.params.items()}
+        v = {k: np.zeros_like(x) for k, x in self.params.items()}
+        beta1, beta2, eps, step = 0.9, 0.999, 1e-8, 0
+        history = []
+        for epoch in range(epochs):
+            order = rng.permutation(len(y))
+            for start in range(0, len(y), batch_size):
+                batch = order[start:start + batch_size]
+                step += 1
+                for k, g in self._gradients(X[batch], y[batch]).items():
+                    m[k] = beta1 * m[k] + (1 - beta1) * g
+                    v[k] = beta2 * v[k] + (1 - beta2) * g ** 2
+                    m_hat = m[k] / (1 - beta1 ** step)
+                    v_hat = v[k] / (1 - beta2 ** step)
+                    self.params[k] = self.params[k] - lr * m_hat / (np.sqrt(v_hat) + eps)
+            loss = float(np.mean((self.predict(X) - y) ** 2))
+            history.append(loss)
+            log(f"epoch {epoch + 1}/{epochs}: mse {loss:.4f}")
+        return history
+
+    def save(self, path):
+        np.savez(path, hidden=self.hidden, **self.params)
+
+    @classmethod
+    def load(cls, path):
+        data = np.load(path)
+        model = cls.__new__(cls)
+        model.hidden = int(data["hidden"])
+        model.params = {k: data[k] for k in data.files if k != "hidden"}
+        return model
+
+def score_actions(state, model, actions, is_player=False):
+    """全部候选动作的预测值（一次批量前向）"""
+    return model.predict(action_features(state, actions, is_player))
+
+def choose_action(state, model, is_player=False):
+    """
+    按模型预测值选择动作
+    返回: (sr, sc, tr, tc)，无动作可执行返回 None
+    """
+    actions = state.legal_actions(is_player)
+    if not actions:
+        return None
+    return actions[int(score_actions(state, model, actions, is_player).argmax())]
+
+def load_records(paths):
+    """合并多个自对弈记录文件（selfplay --record），返回 (X, y, seeds)，seeds 为每个样本所在对局的种子"""
+    data = [np.load(path) for path in paths]
+    return (np.concatenate([d["X"] for d in data]), np.concatenate([d["y"] for d in data]),
+            np.concatenate([d["seed"] for d in data]))
+
+def split_by_game(seeds, validation, seed=0):
+    """
+    按对局划分训练集与验证集（同一局的样本高度相关，按样本划分会高估验证结果）
+    seeds: 每个样本所在对局的种子（同一种子的两局布局相同，整体划入同一侧）
+    返回: (验证集下标, 训练集下标)
+    """
+    games = np.unique(seeds)
+    np.random.default_rng(seed).shuffle(games)
+    valid = np.isin(seeds, games[:int(len(games) * validation)])
+    return np.flatnonzero(valid), np.flatnonzero(~valid)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="由自对弈记录训练 KOF 动作评估模型")
+    parser.add_argument("records", nargs="+", help="selfplay --record 生成的 .npz 文件")
+    parser.add_argument("output", help="输出的模型 .npz 路径")
+    parser.add_argument("--hidden", type=int, default=64, help="隐藏层宽度，0 为线性模型（默认 64）")
+    parser.add_argument("--epochs", type=int, default=20, help="训练轮数（默认 20）")
+    parser.add_argument("--lr", type=float, default=1e-3, help="学习率（默认 0.001）")
+    parser.add_argument("--validation", type=float, default=0.1, help="留作验证的对局比例（默认 0.1）")
+    parser.add_argument("--seed", type=int, default=0, help="随机种子（默认 0）")
+    args = parser.parse_args(argv)
+    X, y, seeds = load_records(args.records)
+    valid, train = split_by_game(seeds, args.validation, args.seed)
+    n_valid = len(valid)
+    model = ValueModel(X.shape[1], args.hidden, args.seed)
+    model.fit(X[train], y[train], args.epochs, lr=args.lr, seed=args.seed)
+    if n_valid:
+        predicted = model.predict(X[valid])
+        print(f"validation: mse {np.mean((predicted - y[valid]) ** 2):.4f}, "
+              f"sign accuracy {np.mean(np.sign(predicted) == np.sign(y[valid])):.3f} "
+              f"({n_valid} samples from {len(np.unique(seeds[valid]))} starting positions)")
+    model.save(args.output)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,171 @@
+# opponent.py
+# 对方行为模型（无 pygame 依赖）：对方每走一步，被选中走子的棋子按行为类别（knowledge.classify_move：
+# 攻击、靠近、后撤等）得到各类型的似然，其余存活棋子得到“未被选中”的似然（不常走动的多半是 Athena 等）。
+# IdentityTracker 每步 O(1) 累加，BeliefTracker 把它作为权重乘进精确后验（与初始阵容、战斗结果的硬约束一起计算）
+# 拟合与验证: python -m kof_engine.opponent games.jsonl --output kof_opponent.json
+# （games.jsonl 由 python -m kof_engine.selfplay ... --save-games 生成，每行一局）
+import argparse
+import json
+import math
+import random
+import numpy as np
+from .rules import NUM_CHIP_TYPES, CHIP_NAMES
+from .knowledge import BEHAVIOURS, classify_move
+from .belief import BeliefTracker
+from .state import GameState
+
+DEFAULT_STRENGTH = 0.2  # 相邻的走子并不独立，证据打折以免过度自信
+
+# 默认模型由 heuristic 对 heuristic 的 3000 局自对弈拟合（可用真人对局记录重新拟合）
+# DEFAULT_ACTIVITY[type_id]: 对方每走一步时，该类型的某个存活棋子恰好被选中的概率
+DEFAULT_ACTIVITY = [0.2306, 0.2985, 0.1336, 0.0661, 0.1755, 0.1512, 0.0157]
+# DEFAULT_LIKELIHOOD[type_id][behaviour_id]: 被选中时各行为的概率（列顺序同 BEHAVIOURS）
+DEFAULT_LIKELIHOOD = [
+    [0.014, 0.121, 0.355, 0.300, 0.210],  # orichi
+    [0.039, 0.068, 0.353, 0.330, 0.211],  # yagami
+    [0.025, 0.027, 0.360, 0.365, 0.224],  # kula
+    [0.019, 0.007, 0.361, 0.376, 0.237],  # k
+    [0.306, 0.007, 0.261, 0.203, 0.223],  # mai
+    [0.310, 0.031, 0.252, 0.185, 0.222],  # kyo
+    [0.008, 0.197, 0.300, 0.267, 0.228],  # athena
+]
+
+class OpponentModel:
+    """
+    对方的行为模型
+      - activity: [type_id] = 对方每走一步时，该类型的某个存活棋子被选中的概率
+      - likelihood: [type_id][behaviour_id] = 被选中时该行为的概率
+      - strength: 证据的权重（对数似然的倍数）
+      - log_likelihood: [behaviour_id] -> 长度 7 的列表，被选中并做出该行为相对“未被选中”的对数似然（已乘 strength），
+        供 IdentityTracker.observe_move 累加
+      - log_idle: 长度 7 的列表，一步中未被选中的对数似然（已乘 strength），每个存活棋子按对方走子数计入
+    """
+    def __init__(self, activity=DEFAULT_ACTIVITY, likelihood=DEFAULT_LIKELIHOOD, strength=DEFAULT_STRENGTH):
+        self.activity = list(map(float, activity))
+        self.likelihood = [list(map(float, row)) for row in likelihood]
+        self.strength = strength
+        self.log_idle = [strength * math.log(1 - q) for q in self.activity]
+        self.log_likelihood = [[strength * (math.log(self.activity[t]) + math.log(self.likelihood[t][b]))
+                                - self.log_idle[t] for t in range(NUM_CHIP_TYPES)]
+                               for b in range(len(BEHAVIOURS))]
+
+    @classmethod
+    def fit(cls, counts, exposure, strength=DEFAULT_STRENGTH, smoothing=1.0):
+        """
+        counts: [type_id][behaviour_id] 的次数（加 smoothing 平滑后按行归一化）
+        exposure: [type_id] = 对方每次走子时该类型存活棋子数之和
+        """
+        counts = np.asarray(counts, dtype=float)
+        activity = (counts.sum(axis=1) + smoothing) / (np.asarray(exposure, dtype=float) + 2 * smoothing)
+        counts = counts + smoothing
+        return cls(activity.tolist(), (counts / counts.sum(axis=1, keepdims=True)).tolist(), strength)
+
+    def to_dict(self):
+        return {"strength": self.strength,
+                "activity": dict(zip(CHIP_NAMES, self.activity)),
+                "likelihood": {CHIP_NAMES[t]: dict(zip(BEHAVIOURS, row)) for t, row in enumerate(self.likelihood)}}
+
+    def save(self, path):
+        with open(path, "w") as f:
+            json.dump(self.to_dict(), f, indent=2)
+
+    @classmethod
+    def load(cls, path):
+        with open(path) as f:
+            data = json.load(f)
+        activity = [data["activity"][name] for name in CHIP_NAMES]
+        likelihood = [[data["likelihood"][name][b] for b in BEHAVIOURS] for name in CHIP_NAMES]
+        return cls(activity, likelihood, data.get("strength", DEFAULT_STRENGTH))
+
+DEFAULT_MODEL = OpponentModel()
+
+def load_games(path):
+    """读取对局记录（每行一局 JSON: {"start", "moves", ...}）"""
+    with open(path) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+def replay(game, model=None):
+    """
+    重放一局记录，每步动作执行前产出 (局面, 行动方, 动作或 None)
+    model: 可选的 OpponentModel，AI 一方据此累积玩家棋子的行为证据
+    """
+    state = GameState.unpack(bytes.fromhex(game["start"]))
+    state.knowledge[False].behaviour = model
+    for action in game["moves"]:
+        side = state.player_to_move
+        yield state, side, action and tuple(action)
+        if action is not None:
+            state.apply_action(*action)
+        state.end_turn(side, action is not None)
+
+def behaviour_counts(games):
+    """
+    玩家一方的走子统计
+    返回: (counts [type_id][behaviour_id] 的次数, exposure [type_id] 每次走子时该类型存活棋子数之和)
+    """
+    counts = np.zeros((NUM_CHIP_TYPES, len(BEHAVIOURS)), dtype=np.int64)
+    exposure = np.zeros(NUM_CHIP_TYPES, dtype=np.int64)
+    for game in games:
+        for state, side, action in replay(game):
+            if side and action is not None:
+                chip = state.board[action[0]][action[1]]
+                counts[chip.type_id, classify_move(state, *action)] += 1
+                exposure += [state.count(t, True) for t in range(NUM_CHIP_TYPES)]
+    return counts, exposure
+
+def evaluate(games, model):
+    """
+    AI 一方在每次玩家走子后对玩家存活棋子的后验，与真实类型比较
+    返回: {"samples", "log_loss", "accuracy", "baseline_log_loss", "baseline_accuracy"}
+          （log_loss 为真实类型的平均负对数概率（比特），baseline 为不使用行为证据的精确后验）
+    """
+    totals = {"log_loss": 0.0, "accuracy": 0, "baseline_log_loss": 0.0, "baseline_accuracy": 0}
+    samples = 0
+    for game in games:
+        with_model = without_model = None
+        for state, side, action in replay(game, model):
+            if side or not state.knowledge[False].allowed:
+                continue  # 只在 AI 行动前（玩家刚走完）评估
+            tracker = state.knowledge[False]
+            if with_model is None or with_model.tracker is not tracker:
+                with_model, without_model = BeliefTracker(tracker), BeliefTracker(tracker, use_evidence=False)
+            with_model.update()
+            without_model.update()
+            for chip in tracker.allowed:
+                for prefix, belief in (("", with_model), ("baseline_", without_model)):
+                    probs = belief.distribution(chip)
+                    totals[prefix + "log_loss"] -= math.log2(max(probs[chip.type_id], 1e-12))
+                    totals[prefix + "accuracy"] += int(probs.argmax() == chip.type_id)
+                samples += 1
+    return dict({key: value / max(samples, 1) for key, value in totals.items()}, samples=samples)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="由对局记录拟合对方行为模型，并在留出的对局上验证预测价值")
+    parser.add_argument("games", nargs="+", help="对局记录文件（selfplay --save-games 生成）")
+    parser.add_argument("--output", default=None, help="输出的模型 JSON（Pro 版本读取 settings.AI_OPPONENT_MODEL）")
+    parser.add_argument("--strength", type=float, default=DEFAULT_STRENGTH,
+                        help=f"证据的权重（默认 {DEFAULT_STRENGTH}）")
+    parser.add_argument("--holdout", type=float, default=0.2, help="留作验证的对局比例（默认 0.2）")
+    parser.add_argument("--seed", type=int, default=0, help="划分对局的随机种子（默认 0）")
+    args = parser.parse_args(argv)
+    games = [game for path in args.games for game in load_games(path)]
+    random.Random(args.seed).shuffle(games)
+    n_holdout = int(len(games) * args.holdout)
+    holdout, train = games[:n_holdout], games[n_holdout:]
+    counts, exposure = behaviour_counts(train)
+    model = OpponentModel.fit(counts, exposure, args.strength)
+    print(f"fitted on {len(train)} games ({counts.sum()} player moves)")
+    for t, row in enumerate(model.likelihood):
+        print(f"  {CHIP_NAMES[t]:>7}: activity {model.activity[t]:.4f}, " +
+              " ".join(f"{b} {p:.3f}" for b, p in zip(BEHAVIOURS, row)))
+    if holdout:
+        for name, candidate in (("fitted", model), ("default", DEFAULT_MODEL)):
+            stats = evaluate(holdout, candidate)
+            print(f"{name} model on {len(holdout)} held-out games ({stats['samples']} chip estimates): "
+                  f"log loss {stats['log_loss']:.4f} bits (exact posterior alone {stats['baseline_log_loss']:.4f}), "
+                  f"accuracy {stats['accuracy']:.3f} ({stats['baseline_accuracy']:.3f})")
+    if args.output:
+        model.save(args.output)
+
+if __name__ == "__main__":
+    main()
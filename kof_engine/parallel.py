@@ -0,0 +1,67 @@
+# parallel.py
+# 根并行 ISMCTS（无 pygame 依赖）：每个进程独立搜索同一局面，合并根节点统计后给出一个决策
+import os
+import random
+from concurrent.futures import ProcessPoolExecutor, wait
+from . import ismcts
+
+def _search_root(state, is_player, iterations, time_limit, seed):
+    """工作进程：独立搜索，返回根节点统计 {action: (visits, wins)}"""
+    _, root = ismcts.search(state, is_player, iterations, time_limit, rng=random.Random(seed))
+    return {action: (child.visits, child.wins) for action, child in root.children.items()}
+
+def merge_root_stats(results):
+    """合并多个根节点统计，返回 {action: [visits, wins]}"""
+    merged = {}
+    for stats in results:
+        for action, (visits, wins) in stats.items():
+            total = merged.setdefault(action, [0, 0.0])
+            total[0] += visits
+            total[1] += wins
+    return merged
+
+class ParallelSearcher:
+    """
+    持有一个进程池，跨多步复用（避免每步重新创建进程）
+      - workers: 进程数，默认为 CPU 核数
+      - grace: 超过时间上限后等待工作进程返回的额外时间（秒），超时的结果被丢弃
+    用法: with ParallelSearcher(4) as searcher: action = searcher.choose_action(state, time_limit=1.0)
+    """
+    def __init__(self, workers=None, grace=0.5):
+        self.workers = workers or os.cpu_count() or 1
+        self.grace = grace
+        self.executor = ProcessPoolExecutor(max_workers=self.workers)
+
+    def search(self, state, is_player=False, iterations=None, time_limit=1.0, rng=random):
+        """
+        每个进程各做 iterations 次迭代 / time_limit 秒（至少给出一个，否则子进程永不返回）
+        返回: (访问次数最多的动作, 合并后的统计 {action: [visits, wins]})
+        """
+        if iterations is None and time_limit is None:
+            raise ValueError("parallel search needs iterations or time_limit")
+        futures = [self.executor.submit(_search_root, state, is_player, iterations, time_limit,
+                                        rng.getrandbits(32))
+                   for _ in range(self.workers)]
+        timeout = time_limit + self.grace if time_limit is not None else None
+        done, not_done = wait(futures, timeout=timeout)
+        for future in not_done:
+            future.cancel()
+        merged = merge_root_stats(future.result() for future in done)
+        if not merged:
+            # 所有进程都未按时返回：退回单进程的最少搜索，保证有动作可选
+            return ismcts.search(state, is_player, iterations=1, rng=rng)[0], merged
+        best = max(merged, key=lambda action: merged[action][0])
+        return best, merged
+
+    def choose_action(self, state, is_player=False, iterations=None, time_limit=1.0, rng=random):
+        """AI 单步决策，返回 (sr, sc, tr, tc)，无动作可执行返回 None"""
+        return self.search(state, is_player, iterations, time_limit, rng)[0]
+
+    def close(self):
+        self.executor.shutdown(cancel_futures=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,67 @@
+# ponder.py
+# 对方思考期间的后台搜索（无 pygame 依赖）：对方落子后只保留与实际动作匹配的部分
+import random
+import threading
+from . import ismcts, expectimax
+from .ttable import TranspositionTable
+
+class Ponderer:
+    """
+    在对方回合中于后台线程搜索（搜索方 is_player 的视角）
+      - engine: "ismcts" 保留实际动作对应的子树；"expectimax" 保留共享的置换表
+      - nodes: 最近一次 ponder 完成的迭代 / 节点数
+    用法: 对方回合开始时 start(state)；对方落子后 stop(action)，再把 reuse() 的结果交给搜索
+    """
+    def __init__(self, engine="ismcts", is_player=False, tt=None):
+        self.engine = engine
+        self.is_player = is_player
+        self.tt = tt if tt is not None else TranspositionTable()
+        self.nodes = 0
+        self._stop = threading.Event()
+        self._thread = None
+        self._root = None  # ISMCTS: ponder 的根（对方行动）
+        self._reuse = None  # ISMCTS: 与对方实际动作匹配的子树
+
+    def start(self, state, rng=random):
+        """开始 ponder（使用局面快照，不影响调用方继续修改 state）"""
+        self.stop()
+        self._reuse = None
+        snapshot = state.copy(knowledge=True)
+        self._stop = threading.Event()
+
+        def run():
+            if self.engine == "ismcts":
+                self._root = ismcts.ponder(snapshot, self._stop, self.is_player, rng=rng)
+                self.nodes = self._root.visits
+            else:
+                self.nodes = expectimax.ponder(snapshot, self.tt, self._stop, self.is_player)
+
+        self._thread = threading.Thread(target=run, daemon=True)
+        self._thread.start()
+
+    def stop(self, action=None):
+        """
+        结束 ponder 并等待线程退出
+        action: 对方实际执行的动作 (sr, sc, tr, tc)，None 表示无动作；ISMCTS 据此保留子树
+        """
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+        if self._root is not None:
+            child = self._root.children.get(action)
+            if child is not None:
+                child.parent = None  # 作为新根，回传到此为止
+            self._reuse = child
+            self._root = None
+
+    def reuse(self):
+        """
+        交给下一次搜索的结果（取用一次后清空）
+        返回: ISMCTS 的子树根节点（可能为 None），expectimax 为置换表
+        """
+        if self.engine == "ismcts":
+            root, self._reuse = self._reuse, None
+            return root
+        return self.tt
@@ -0,0 +1,91 @@
+# rules.py
+# 游戏规则（无 pygame 依赖）：棋盘尺寸、棋子等级、胜负判定
+
+# -------- 棋盘与回合 --------
+ROWS, COLS = 5, 6
+MAX_TURNS = 60
+MAX_IDLE_TURNS = 5  # 连续无动作最大回合数
+
+# -------- 棋子定义 --------
+CHIP_NAMES = ["orichi", "yagami", "kula", "k", "mai", "kyo", "athena"]
+
+# 每方初始棋子：orichi1, yagami2, kula2, k2, mai2, kyo4, athena2
+START_COMPOSITION = ["orichi"]*1 + ["yagami"]*2 + ["kula"]*2 + ["k"]*2 + ["mai"]*2 + ["kyo"]*4 + ["athena"]*2
+
+# 棋子等级排序（从高到低）
+CHIP_HIERARCHY = ["orichi", "yagami", "kula", "k", "mai", "kyo"]
+
+DIRECTIONS = [(1, 0), (-1, 0), (0, 1), (0, -1)]
+
+# -------- 棋子类型编号（与 CHIP_NAMES 顺序一致） --------
+ORICHI, YAGAMI, KULA, K, MAI, KYO, ATHENA = range(len(CHIP_NAMES))
+NUM_CHIP_TYPES = len(CHIP_NAMES)
+CHIP_IDS = {name: i for i, name in enumerate(CHIP_NAMES)}
+WINNER_ORDER = [CHIP_IDS[name] for name in CHIP_HIERARCHY]  # check_winner 的比较顺序
+
+# 等级（数字越大等级越高，Athena 为 -1 不参与比较）
+CHIP_LEVELS = [len(CHIP_HIERARCHY) - CHIP_HIERARCHY.index(name) if name in CHIP_HIERARCHY else -1
+               for name in CHIP_NAMES]
+_LEVEL_BY_NAME = dict(zip(CHIP_NAMES, CHIP_LEVELS))
+
+# -------- 战斗结果 --------
+ATTACK_SUCCESS, ATTACK_FAIL, FUSION = 0, 1, 2
+OUTCOME_NAMES = ["attack_success", "attack_fail", "fusion"]
+
+def _duel(attacker, defender):
+    """单次战斗结果（仅用于生成 COMBAT_TABLE）"""
+    if attacker == ATHENA or defender == ATHENA:
+        return FUSION  # 同归于尽
+    if attacker == KYO and defender == ORICHI:
+        return ATTACK_SUCCESS
+    if attacker == ORICHI and defender == KYO:
+        return ATTACK_FAIL
+    if attacker == defender:
+        return ATTACK_SUCCESS  # 同级时攻击方获胜
+    return ATTACK_SUCCESS if CHIP_LEVELS[attacker] > CHIP_LEVELS[defender] else ATTACK_FAIL
+
+# 7x7 战斗结果表：COMBAT_TABLE[攻击方类型][防守方类型]
+COMBAT_TABLE = [[_duel(a, d) for d in range(NUM_CHIP_TYPES)] for a in range(NUM_CHIP_TYPES)]
+
+# -------- defeat 更新 --------
+NO_DEFEAT = -1  # 没有 defeat 记录
+
+def _should_update(current_id, new_id):
+    """defeat 是否更新（仅用于生成 DEFEAT_UPDATE）"""
+    if current_id == NO_DEFEAT:
+        return True  # 没有 defeat 记录，直接更新
+    if new_id == ATHENA:
+        return False  # Athena 不算等级
+    if current_id == ATHENA:
+        return True  # 之前是 Athena，任何棋子都更高
+    return CHIP_LEVELS[new_id] > CHIP_LEVELS[current_id]  # 只有新击败的等级更高才更新
+
+# DEFEAT_UPDATE[当前 defeat_id + 1][新击败的类型]
+DEFEAT_UPDATE = [[_should_update(cur, new) for new in range(NUM_CHIP_TYPES)]
+                 for cur in range(NO_DEFEAT, NUM_CHIP_TYPES)]
+
+def get_chip_level(chip_name):
+    """获取棋子等级（数字越大等级越高）"""
+    return _LEVEL_BY_NAME.get(chip_name, 0)
+
+def should_update_defeat(current_defeat, new_defeat):
+    """判断是否应该更新 defeat 信息（只有击败更高等级才更新，按名称查表）"""
+    current_id = CHIP_IDS[current_defeat] if current_defeat is not None else NO_DEFEAT
+    return DEFEAT_UPDATE[current_id + 1][CHIP_IDS[new_defeat]]
+
+def can_attack(attacker, defender):
+    """判断能否击败（查表）"""
+    return COMBAT_TABLE[attacker.type_id][defender.type_id] == ATTACK_SUCCESS
+
+def check_winner(board):
+    """判定胜负：从 orichi 到 kyo 逐级比较双方剩余数量"""
+    counts = [[0] * NUM_CHIP_TYPES, [0] * NUM_CHIP_TYPES]  # counts[is_player][type_id]
+    for row in board:
+        for chip in row:
+            if chip:
+                counts[chip.is_player][chip.type_id] += 1
+    player_counts, ai_counts = counts[True], counts[False]
+    for t in WINNER_ORDER:
+        if player_counts[t] > ai_counts[t]: return "Player"
+        elif player_counts[t] < ai_counts[t]: return "AI"
+    return "Draw"
@@ -0,0 +1,235 @@
+# selfplay.py
+# 无界面的 AI 对战（无 pygame 依赖）：多进程并行对局，统计胜负、Elo 与对局速度
+# 用法: python -m kof_engine.selfplay heuristic basic --games 200 --workers 4 --seed 1
+# 记录训练样本: python -m kof_engine.selfplay heuristic heuristic --games 2000 --record games.npz
+# 保存对局记录: python -m kof_engine.selfplay heuristic heuristic --games 2000 --save-games games.jsonl
+import argparse
+import json
+import math
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from . import ai_basic, ai_pro, learned
+from .features import action_features
+from .anytime import think
+from .state import GameState
+
+AGENTS = ("basic", "heuristic", "expectimax", "ismcts", "learned")
+# 搜索类 AI 在既无节点上限也无思考时间时的每步节点数（expectimax 为搜索节点，ISMCTS 为迭代次数）
+DEFAULT_NODES = {"expectimax": 2000, "ismcts": 200}
+
+def parse_agent(spec):
+    """
+    'ismcts:500' -> ('ismcts', 500, None)：名称、每步节点上限（省略为 None）与参数
+    'heuristic@tuned.json' -> ('heuristic', None, EvalWeights)：启发式 AI 使用权重文件
+    'learned@kof_model.npz' -> ('learned', None, ValueModel)：学习模型（必须指定模型文件）
+    """
+    spec, _, path = spec.partition("@")
+    name, _, nodes = spec.partition(":")
+    if name not in AGENTS:
+        raise ValueError(f"unknown agent: {name}")
+    if name == "learned":
+        if not path:
+            raise ValueError("learned agent needs a model: learned@model.npz")
+        return name, None, learned.ValueModel.load(path)
+    return name, int(nodes) if nodes else None, ai_pro.EvalWeights.load(path) if path else None
+
+def choose_action(state, is_player, agent, rng=random, think_time=None):
+    """
+    agent: parse_agent 的结果
+    think_time: 每步思考时间（秒），None 表示只受节点上限约束（对局可按种子复现）
+    返回: (sr, sc, tr, tc)，无动作可执行返回 None
+    """
+    name, nodes, weights = agent
+    if name == "learned":
+        return learned.choose_action(state, weights, is_player)
+    if name in ("basic", "heuristic"):
+        view = state.mirror() if is_player else state  # 只能为 AI 一方决策
+        if name == "basic":
+            return ai_basic.choose_action(view, rng)
+        scored = ai_pro.choose_action(view, rng, weights or ai_pro.DEFAULT_WEIGHTS)
+        return scored and scored[1:5]
+    deadline = time.perf_counter() + think_time if think_time is not None else None
+    if nodes is None and deadline is None:
+        nodes = DEFAULT_NODES[name]
+    return think(state, name, is_player, deadline, nodes, rng=rng)[0]
+
+def play_game(player_agent, ai_agent, seed, think_time=None, record=None, history=None):
+    """
+    一局对战：player_agent 为玩家一方（每回合先行动），ai_agent 为 AI 一方
+    seed: 初始布局与双方随机决策的种子
+    record: 可选的列表，对局结束后追加每步所选动作的 (行动方视角特征, 行动方视角结果 1 / 0 / -1)
+    history: 可选的字典，写入对局记录 {"start": 初始局面 pack() 的十六进制, "moves": [动作或 None, ...]}
+    返回: (胜方 "Player" / "AI" / "Draw", 回合数)
+    """
+    rng = random.Random(seed)
+    state = GameState()
+    state.random_init(rng)
+    agents = {True: player_agent, False: ai_agent}
+    samples = []
+    if history is not None:
+        history["start"] = state.pack().hex()
+        history["moves"] = []
+    while True:
+        result = state.result()
+        if result is not None:
+            winner = result.split()[0]
+            if record is not None:
+                outcome = {"Player": 1.0, "AI": -1.0}.get(winner, 0.0)
+                record.extend((x, outcome if side else -outcome) for x, side in samples)
+            return winner, state.turn_count
+        side = state.player_to_move
+        action = choose_action(state, side, agents[side], rng, think_time)
+        if history is not None:
+            history["moves"].append(action and list(action))
+        if action is not None:
+            if record is not None:
+                samples.append((action_features(state, [action], side)[0], side))
+            state.apply_action(*action)
+        state.end_turn(side, action is not None)
+
+def _play(task):
+    """工作进程：一局对战，返回 (agent_a 的得分 1 / 0.5 / 0, 回合数)"""
+    agent_a, agent_b, seed, a_first, think_time = task
+    if a_first:
+        winner, turns = play_game(agent_a, agent_b, seed, think_time)
+        a_side = "Player"
+    else:
+        winner, turns = play_game(agent_b, agent_a, seed, think_time)
+        a_side = "AI"
+    return 0.5 if winner == "Draw" else float(winner == a_side), turns
+
+def _record(task):
+    """工作进程：一局对战，返回该局的训练样本 (X, y)"""
+    player_agent, ai_agent, seed, think_time = task
+    samples = []
+    play_game(player_agent, ai_agent, seed, think_time, samples)
+    if not samples:
+        return np.zeros((0, learned.N_FEATURES)), np.zeros(0)
+    X, y = zip(*samples)
+    return np.array(X), np.array(y)
+
+def record_games(executor, agent_a, agent_b, games, seed=0, think_time=None):
+    """
+    在进程池 executor 上记录 games 局对战的训练样本（种子与先后手同 play_match）
+    返回: (X (样本数, N_FEATURES), y (样本数,), seeds (样本数,) 每个样本所在对局的种子)
+    交换先后手的两局初始布局相同、样本高度相关，同一种子的样本应整体划入训练集或验证集
+    """
+    tasks = [(agent_a, agent_b, seed + i // 2, think_time) if i % 2 == 0
+             else (agent_b, agent_a, seed + i // 2, think_time) for i in range(games)]
+    parts = list(executor.map(_record, tasks))
+    seeds = np.concatenate([np.full(len(y), task[2]) for task, (_, y) in zip(tasks, parts)])
+    return np.concatenate([X for X, _ in parts]), np.concatenate([y for _, y in parts]), seeds
+
+def _history(task):
+    """工作进程：一局对战，返回对局记录（见 play_game 的 history）"""
+    player_spec, ai_spec, seed, think_time = task
+    history = {"player": player_spec, "ai": ai_spec, "seed": seed}
+    history["winner"], history["turns"] = play_game(parse_agent(player_spec), parse_agent(ai_spec), seed,
+                                                    think_time, history=history)
+    return history
+
+def save_games(executor, spec_a, spec_b, games, path, seed=0, think_time=None):
+    """
+    在进程池 executor 上进行 games 局对战（种子与先后手同 play_match），对局记录逐行写入 JSON 文件 path
+    spec_a / spec_b: parse_agent 的参数（记录中保存双方名称）
+    """
+    tasks = [(spec_a, spec_b, seed + i // 2, think_time) if i % 2 == 0
+             else (spec_b, spec_a, seed + i // 2, think_time) for i in range(games)]
+    with open(path, "w") as f:
+        for history in executor.map(_history, tasks):
+            f.write(json.dumps(history) + "\n")
+
+def elo(score):
+    """得分率 -> Elo 差"""
+    if score <= 0:
+        return -math.inf
+    if score >= 1:
+        return math.inf
+    return -400 * math.log10(1 / score - 1)
+
+def elo_interval(wins, draws, losses, z=1.96):
+    """
+    Elo 差及其置信区间 (elo, low, high)，按每局得分的样本方差在 logit 尺度上估计（z=1.96 为 95%）
+    elo 取实际得分率；区间（以及得分率为 0 或 100% 时的 elo）按胜负各加半局计算，结果总是有限
+    """
+    n = wins + draws + losses
+    score = (wins + draws / 2) / n
+    wins, losses = wins + 0.5, losses + 0.5
+    n += 1
+    adjusted = (wins + draws / 2) / n
+    variance = (wins * (1 - adjusted) ** 2 + draws * (0.5 - adjusted) ** 2 + losses * adjusted ** 2) / n
+    # Elo = 400 / ln 10 * logit(score)，logit 的导数为 1 / (score * (1 - score))
+    margin = z * math.sqrt(variance / n) / (adjusted * (1 - adjusted)) * 400 / math.log(10)
+    center = elo(adjusted)
+    rating = elo(score) if 0 < score < 1 else center
+    return rating, min(rating, center - margin), max(rating, center + margin)
+
+def play_match(executor, agent_a, agent_b, games, seed=0, think_time=None):
+    """
+    在进程池 executor 上进行 agent_a 对 agent_b 共 games 局：相邻两局使用同一初始布局（种子 seed + i // 2）
+    并交换先后手
+    返回: [(agent_a 的得分, 回合数), ...]
+    """
+    tasks = [(agent_a, agent_b, seed + i // 2, i % 2 == 0, think_time) for i in range(games)]
+    return list(executor.map(_play, tasks))
+
+def run_tournament(agent_a, agent_b, games, workers=None, seed=0, think_time=None):
+    """
+    agent_a 对 agent_b 共 games 局（见 play_match）
+    返回: {"wins", "draws", "losses"（agent_a 视角）, "score", "elo", "elo_low", "elo_high",
+           "avg_turns", "games_per_second", "workers"}
+    """
+    workers = workers or os.cpu_count() or 1
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        results = play_match(executor, agent_a, agent_b, games, seed, think_time)
+    elapsed = time.perf_counter() - start
+    scores = [score for score, _ in results]
+    wins, draws = scores.count(1.0), scores.count(0.5)
+    losses = games - wins - draws
+    rating, low, high = elo_interval(wins, draws, losses)
+    return {"wins": wins, "draws": draws, "losses": losses, "score": sum(scores) / games,
+            "elo": rating, "elo_low": low, "elo_high": high,
+            "avg_turns": sum(turns for _, turns in results) / games,
+            "games_per_second": games / elapsed, "workers": workers}
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="KOF AI 对战评测（多进程）")
+    parser.add_argument("agent_a", help=f"AI 名称[:每步节点上限][@权重文件]，名称为 {' / '.join(AGENTS)}")
+    parser.add_argument("agent_b", help="对手，格式同上")
+    parser.add_argument("--games", type=int, default=100, help="对局数（默认 100，两局一组交换先后手）")
+    parser.add_argument("--workers", type=int, default=None, help="进程数（默认 CPU 核数）")
+    parser.add_argument("--seed", type=int, default=0, help="起始种子（默认 0）")
+    parser.add_argument("--think-time", type=float, default=None,
+                        help="搜索类 AI 每步思考时间（秒），默认只按节点上限（可复现）")
+    parser.add_argument("--record", default=None,
+                        help="只记录训练样本并写入该 .npz 文件（供 python -m kof_engine.learned 训练）")
+    parser.add_argument("--save-games", default=None,
+                        help="只保存对局记录（每行一局 JSON，供 python -m kof_engine.opponent 拟合与验证）")
+    args = parser.parse_args(argv)
+    agent_a, agent_b = parse_agent(args.agent_a), parse_agent(args.agent_b)
+    if args.save_games:
+        with ProcessPoolExecutor(max_workers=args.workers or os.cpu_count() or 1) as executor:
+            save_games(executor, args.agent_a, args.agent_b, args.games, args.save_games, args.seed, args.think_time)
+        print(f"saved {args.games} games -> {args.save_games}")
+        return
+    if args.record:
+        start = time.perf_counter()
+        with ProcessPoolExecutor(max_workers=args.workers or os.cpu_count() or 1) as executor:
+            X, y, seeds = record_games(executor, agent_a, agent_b, args.games, args.seed, args.think_time)
+        np.savez_compressed(args.record, X=X.astype(np.float32), y=y.astype(np.float32), seed=seeds)
+        print(f"recorded {len(y)} samples from {args.games} games in {time.perf_counter() - start:.1f}s "
+              f"-> {args.record}")
+        return
+    stats = run_tournament(agent_a, agent_b, args.games, args.workers, args.seed, args.think_time)
+    print(f"{args.agent_a} vs {args.agent_b}: {args.games} games, "
+          f"+{stats['wins']} ={stats['draws']} -{stats['losses']} (score {stats['score']:.3f})")
+    print(f"Elo {stats['elo']:+.1f} (95% CI {stats['elo_low']:+.1f} .. {stats['elo_high']:+.1f})")
+    print(f"average length {stats['avg_turns']:.1f} turns, "
+          f"{stats['games_per_second']:.2f} games/s ({stats['workers']} workers)")
+
+if __name__ == "__main__":
+    main()
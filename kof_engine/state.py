@@ -0,0 +1,332 @@
+# state.py
+# 单局游戏状态：一个进程内可同时存在任意多个互不干扰的 GameState
+import random
+from .rules import ROWS, COLS, MAX_TURNS, MAX_IDLE_TURNS, NUM_CHIP_TYPES, WINNER_ORDER
+from .game import new_board, random_init, resolve_action, apply_action
+from .chip import encode_chip, decode_chip
+from .knowledge import IdentityTracker, classify_move
+from .bitboard import (SQUARES, FULL_MASK, NEIGHBOUR_MASKS, AROUND_MASKS, ACTION_TUPLES, square,
+                       iter_bits, popcount)
+from .zobrist import SIDE_KEY, cell_key, full_hash
+
+class GameState:
+    """
+    一局游戏的完整状态，包含：
+      - board: 棋盘（原地修改，引用始终有效）
+      - occupancy: 双方占位位棋盘，occupancy[is_player]
+      - piece_masks: 每种棋子（双方合并）的位棋盘，piece_masks[type_id]
+      - actions: 双方的合法动作（有序集合 {(sr, sc, tr, tc): None}），随动作只更新变化格子附近的部分
+      - targets: 每个起点可走到的格子，targets[is_player][sq]（位棋盘）
+      - turn_count: 已完成的回合数（AI 行动后 +1）
+      - player_idle_count / ai_idle_count: 双方连续无动作计数
+      - player_to_move: 当前是否轮到玩家行动
+      - key: Zobrist 哈希（摆放、defeat、行动方与 AI 的身份约束），随动作增量更新
+      - ai_memory: AI 模块的私有缓存（如 ai_pro 的身份后验 "belief"），新局时清空
+      - knowledge: 双方对对方棋子身份的约束，knowledge[观察方 is_player]
+      - undo_stack: make_move 的撤销记录，供搜索在同一局面上前进 / 回退
+    """
+    def __init__(self):
+        self.board = new_board()
+        self.occupancy = [0, 0]
+        self.piece_masks = [0] * NUM_CHIP_TYPES
+        self.actions = [{}, {}]
+        self.targets = [[0] * SQUARES, [0] * SQUARES]
+        self.turn_count = 0
+        self.player_idle_count = 0
+        self.ai_idle_count = 0
+        self.player_to_move = True
+        self.key = 0
+        self.ai_memory = {}
+        self.knowledge = [IdentityTracker(False), IdentityTracker(True)]
+        self.undo_stack = []
+
+    def random_init(self, rng=random):
+        """重置并随机布局"""
+        random_init(self.board, rng)
+        self.turn_count = 0
+        self.player_idle_count = 0
+        self.ai_idle_count = 0
+        self.player_to_move = True
+        self.ai_memory.clear()
+        self.undo_stack.clear()
+        for tracker in self.knowledge:
+            tracker.reset(self.board)
+        self.sync_bitboards()
+
+    def sync_bitboards(self):
+        """根据 board 重建位棋盘、合法动作与哈希（直接修改 board 后调用）"""
+        old_occupancy = self.occupancy
+        self.occupancy = [0, 0]
+        self.piece_masks = [0] * NUM_CHIP_TYPES
+        for r, row in enumerate(self.board):
+            for c, chip in enumerate(row):
+                if chip:
+                    bit = 1 << square(r, c)
+                    self.occupancy[chip.is_player] |= bit
+                    self.piece_masks[chip.type_id] |= bit
+        self.key = full_hash(self)
+        if self.occupancy != old_occupancy:  # 只改了类型（如确定化）时动作不变
+            self.actions = [{}, {}]
+            self.targets = [[0] * SQUARES, [0] * SQUARES]
+            self._update_actions(FULL_MASK)
+
+    def pack(self):
+        """
+        压缩为 34 字节：30 格棋子编码 + turn_count / player_idle_count / ai_idle_count / player_to_move
+        （不含 ai_memory 与撤销记录，用于搜索节点、回放缓存、服务器房间等大量存储）
+        """
+        return bytes([encode_chip(chip) for row in self.board for chip in row] +
+                     [self.turn_count, self.player_idle_count, self.ai_idle_count, self.player_to_move])
+
+    def copy(self, knowledge=False):
+        """
+        复制棋盘（新的棋子对象）、位棋盘与计数，不含 ai_memory / 撤销记录
+        knowledge=True 时一并复制双方的身份约束（映射到新的棋子对象，供后台线程独立搜索）
+        """
+        other = GameState()
+        copies = {}
+        for row, other_row in zip(self.board, other.board):
+            for c, chip in enumerate(row):
+                if chip:
+                    other_row[c] = copies[chip] = chip.copy()
+        if knowledge:
+            for tracker, other_tracker in zip(self.knowledge, other.knowledge):
+                other_tracker.allowed = {copies[chip]: mask for chip, mask in tracker.allowed.items()
+                                         if chip in copies}
+                other_tracker.dead = list(tracker.dead)
+                other_tracker.behaviour = tracker.behaviour
+                other_tracker.evidence = {copies[chip]: ll for chip, ll in tracker.evidence.items() if chip in copies}
+                other_tracker.observed_moves = tracker.observed_moves
+        other.occupancy = list(self.occupancy)
+        other.piece_masks = list(self.piece_masks)
+        other.actions = [dict(actions) for actions in self.actions]
+        other.targets = [list(targets) for targets in self.targets]
+        other.turn_count = self.turn_count
+        other.player_idle_count = self.player_idle_count
+        other.ai_idle_count = self.ai_idle_count
+        other.player_to_move = self.player_to_move
+        other.key = full_hash(other)
+        return other
+
+    def mirror(self):
+        """
+        复制并交换双方阵营（棋子、身份约束、无动作计数与行动方一并交换，坐标不变）
+        供只能为 AI 一方决策的 AI 代替玩家一方决策
+        """
+        other = GameState()
+        copies = {}
+        for row, other_row in zip(self.board, other.board):
+            for c, chip in enumerate(row):
+                if chip:
+                    other_row[c] = copies[chip] = chip.copy()
+                    copies[chip].is_player = not chip.is_player
+        for tracker, other_tracker in zip(self.knowledge, reversed(other.knowledge)):
+            other_tracker.allowed = {copies[chip]: mask for chip, mask in tracker.allowed.items() if chip in copies}
+            other_tracker.dead = list(tracker.dead)
+            other_tracker.behaviour = tracker.behaviour
+            other_tracker.evidence = {copies[chip]: ll for chip, ll in tracker.evidence.items() if chip in copies}
+            other_tracker.observed_moves = tracker.observed_moves
+        other.turn_count = self.turn_count
+        other.player_idle_count, other.ai_idle_count = self.ai_idle_count, self.player_idle_count
+        other.player_to_move = not self.player_to_move
+        other.sync_bitboards()
+        return other
+
+    @classmethod
+    def unpack(cls, data):
+        """由 pack() 的结果还原出新的 GameState"""
+        state = cls()
+        for i, code in enumerate(data[:ROWS * COLS]):
+            state.board[i // COLS][i % COLS] = decode_chip(code)
+        state.turn_count, state.player_idle_count, state.ai_idle_count, to_move = data[ROWS * COLS:]
+        state.player_to_move = bool(to_move)
+        for tracker in state.knowledge:
+            tracker.reset(state.board)
+        state.sync_bitboards()
+        return state
+
+    def resolve_action(self, sr, sc, tr, tc):
+        """判定动作类型（不修改棋盘）"""
+        return resolve_action(self.board, sr, sc, tr, tc)
+
+    def apply_action(self, sr, sc, tr, tc):
+        """
+        执行实际对局中的动作（双方据公开结果更新身份约束）
+        返回: (action_type, defeat_info)
+        """
+        chip = self.board[sr][sc]
+        target = self.board[tr][tc]
+        watchers = [tracker for tracker in self.knowledge
+                    if tracker.behaviour is not None and chip is not None and
+                    chip.is_player != tracker.observer_is_player]
+        behaviour_id = classify_move(self, sr, sc, tr, tc) if watchers else None
+        action_type, defeat_info = self._apply(sr, sc, tr, tc)
+        if action_type is not None:
+            for tracker in watchers:
+                tracker.observe_move(chip, behaviour_id)
+        for tracker in self.knowledge:
+            tracker.observe(chip, target, action_type, defeat_info)
+        if action_type not in (None, "move"):
+            self.key = full_hash(self)  # 身份约束已变化
+        return action_type, defeat_info
+
+    def _apply(self, sr, sc, tr, tc):
+        """执行动作并同步位棋盘与哈希，返回 (action_type, defeat_info)"""
+        chip = self.board[sr][sc]
+        target = self.board[tr][tc]
+        s, t = square(sr, sc), square(tr, tc)
+        tracker = self.knowledge[False]
+        old_key = cell_key(s, chip, tracker) ^ cell_key(t, target, tracker)
+        action_type, defeat_info = apply_action(self.board, sr, sc, tr, tc)
+        if action_type is None:
+            return action_type, defeat_info
+        # 两个格子的哈希分量先移除旧内容，再加入新内容（defeat 变化也包含在内）
+        self.key ^= old_key ^ cell_key(s, self.board[sr][sc], tracker) ^ cell_key(t, self.board[tr][tc], tracker)
+
+        src, dst = 1 << s, 1 << t
+        side = chip.is_player
+        self.occupancy[side] ^= src
+        self.piece_masks[chip.type_id] ^= src
+        if action_type in ("attack_success", "fusion"):
+            # 先移除防守方，再放置攻击方
+            self.occupancy[not side] ^= dst
+            self.piece_masks[target.type_id] &= ~dst
+        if action_type in ("move", "attack_success"):
+            self.occupancy[side] |= dst
+            self.piece_masks[chip.type_id] |= dst
+        self._touch(s, t)
+        return action_type, defeat_info
+
+    def _touch(self, s, t):
+        """记录两个格子发生了变化（更新附近的合法动作），在位棋盘更新之后调用"""
+        self._update_actions(1 << s | 1 << t)
+
+    def _update_actions(self, cells):
+        """重新生成以 cells 中格子及其相邻格子为起点的动作（其余起点的动作不受影响）"""
+        affected = 0
+        for sq in iter_bits(cells):
+            affected |= AROUND_MASKS[sq]
+        for side in (False, True):
+            own = self.occupancy[side]
+            free = ~own & FULL_MASK
+            targets, actions = self.targets[side], self.actions[side]
+            for p in iter_bits(affected):
+                new = NEIGHBOUR_MASKS[p] & free if own >> p & 1 else 0
+                old = targets[p]
+                if new != old:
+                    row = ACTION_TUPLES[p]
+                    for t in iter_bits(old & ~new):
+                        del actions[row[t]]
+                    for t in iter_bits(new & ~old):
+                        actions[row[t]] = None
+                    targets[p] = new
+
+    def make_move(self, is_player, action):
+        """
+        执行一方的完整回合并压入撤销记录（搜索用，O(1)，不更新 knowledge）
+        action: (sr, sc, tr, tc)，None 表示本回合无动作
+        返回: action_type，无动作返回 None
+        """
+        if action is None:
+            chip = target = None
+            chip_defeat = target_defeat = None
+        else:
+            sr, sc, tr, tc = action
+            chip = self.board[sr][sc]
+            target = self.board[tr][tc]
+            chip_defeat = chip.defeat_id
+            target_defeat = target.defeat_id if target else None
+        self.undo_stack.append((action, chip, target, chip_defeat, target_defeat,
+                                self.occupancy[0], self.occupancy[1],
+                                list(self.piece_masks),
+                                self.turn_count, self.player_idle_count, self.ai_idle_count,
+                                self.player_to_move, self.key))
+
+        action_type = self._apply(*action)[0] if action else None
+        self.end_turn(is_player, action is not None)
+        return action_type
+
+    def unmake_move(self):
+        """撤销最近一次 make_move，精确恢复棋盘、defeat、位棋盘、计数与哈希"""
+        (action, chip, target, chip_defeat, target_defeat, ai_occ, player_occ, piece_masks,
+         self.turn_count, self.player_idle_count, self.ai_idle_count,
+         self.player_to_move, self.key) = self.undo_stack.pop()
+        self.occupancy[0], self.occupancy[1] = ai_occ, player_occ
+        self.piece_masks[:] = piece_masks
+        if action is not None:
+            sr, sc, tr, tc = action
+            self.board[sr][sc] = chip
+            self.board[tr][tc] = target
+            chip.defeat_id = chip_defeat
+            if target:
+                target.defeat_id = target_defeat
+            self._touch(square(sr, sc), square(tr, tc))
+
+    def legal_actions(self, is_player):
+        """某一方所有合法动作的列表（增量维护集合的快照）: [(sr, sc, tr, tc), ...]"""
+        return list(self.actions[is_player])
+
+    def iter_actions(self, is_player):
+        """
+        某一方合法动作的迭代器（可提前停止，不复制）
+        迭代期间不能修改局面，需要边遍历边 make_move 时使用 legal_actions
+        """
+        return iter(self.actions[is_player])
+
+    def is_legal(self, is_player, action):
+        """动作 (sr, sc, tr, tc) 对某一方是否合法，O(1)"""
+        return action in self.actions[is_player]
+
+    def has_chips(self, is_player):
+        """某一方是否还有棋子"""
+        return self.occupancy[is_player] != 0
+
+    def count(self, type_id, is_player):
+        """某一方某种棋子的剩余数量"""
+        return popcount(self.piece_masks[type_id] & self.occupancy[is_player])
+
+    def check_winner(self):
+        """判定胜负：从 orichi 到 kyo 逐级比较双方剩余数量"""
+        for t in WINNER_ORDER:
+            player_count = self.count(t, True)
+            ai_count = self.count(t, False)
+            if player_count > ai_count: return "Player"
+            elif player_count < ai_count: return "AI"
+        return "Draw"
+
+    def score(self, is_player):
+        """
+        对某一方的得分：胜 1，平 0.5，负 0
+        未结束时按 check_winner 计分（用于搜索截断）
+        """
+        winner = self.result() or self.check_winner()
+        if winner == "Draw":
+            return 0.5
+        return 1.0 if winner.startswith("Player") == is_player else 0.0
+
+    def end_turn(self, is_player, acted):
+        """
+        记录一方回合结束：更新无动作计数，AI 行动后回合数 +1
+        acted: 本回合是否执行了动作
+        """
+        if is_player:
+            self.player_idle_count = 0 if acted else self.player_idle_count + 1
+        else:
+            self.ai_idle_count = 0 if acted else self.ai_idle_count + 1
+            self.turn_count += 1
+        if self.player_to_move == is_player:
+            self.player_to_move = not is_player
+            self.key ^= SIDE_KEY
+
+    def result(self):
+        """
+        判定游戏是否结束
+        返回: 胜者描述字符串，未结束返回 None
+        """
+        if self.player_idle_count >= MAX_IDLE_TURNS:
+            return "AI (Player Idle)"
+        if self.ai_idle_count >= MAX_IDLE_TURNS:
+            return "Player (AI Idle)"
+        if self.turn_count >= MAX_TURNS or not self.has_chips(True) or not self.has_chips(False):
+            return self.check_winner()
+        return None
@@ -0,0 +1,311 @@
+# tablebase.py
+# 残局库（无 pygame 依赖）：少子局面在完全信息下的精确胜负，离线生成，对局中 O(1) 查询
+# 局面值取决于距回合上限还剩几步（到达上限时按 check_winner 判定），因此从剩余 0 步起
+# 逐步逆推：V_k = 行动方在所有后继局面的 V_{k-1} 中取最优，直到所有局面的值不再变化。
+# 每个局面保存最终值以及从剩余多少步起值不再变化；defeat 标签不影响胜负，不计入索引。
+# 生成: python -m kof_engine.tablebase kof_endgame.tb --pieces 3
+import argparse
+import itertools
+import json
+import time
+import numpy as np
+from .rules import (ROWS, COLS, NUM_CHIP_TYPES, CHIP_NAMES, DIRECTIONS, COMBAT_TABLE, ATTACK_SUCCESS, ATTACK_FAIL,
+                    WINNER_ORDER, MAX_TURNS)
+from .bitboard import SQUARES, SQUARE_POS, square, iter_bits
+from .belief import BeliefTracker
+
+# 局面值（玩家视角）
+PLAYER_WIN, DRAW, AI_WIN = 1, 0, -1
+MAX_PLIES = 2 * MAX_TURNS  # 一局最多的单方行动数
+MAX_PIECES = 3  # build 支持的最大子数（见 build 的说明）
+_MAGIC = b"KOFTB1\n\0"
+
+# _STEP[格子][方向]: 相邻格子编号，越界为 -1（方向顺序与 rules.DIRECTIONS 一致）
+_STEP = np.array([[square(r + dr, c + dc) if 0 <= r + dr < ROWS and 0 <= c + dc < COLS else -1
+                   for dr, dc in DIRECTIONS] for r, c in SQUARE_POS])
+
+# -------- 子力签名与局面编号 --------
+# 签名: 按编码排序的棋子元组，编码 = is_player * NUM_CHIP_TYPES + type_id
+# 局面编号: 行动方 * 排列数 + 各棋子所在格子（按签名顺序，互不相同）在所有排列中的字典序
+
+def piece_code(is_player, type_id):
+    return is_player * NUM_CHIP_TYPES + type_id
+
+def signature_name(signature):
+    """签名的可读形式，如 'A:kyo P:orichi'"""
+    return " ".join(f"{'P' if code >= NUM_CHIP_TYPES else 'A'}:{CHIP_NAMES[code % NUM_CHIP_TYPES]}"
+                    for code in signature)
+
+def static_value(signature):
+    """按 check_winner 判定（回合上限或一方棋子耗尽时的值）"""
+    counts = [[0] * NUM_CHIP_TYPES, [0] * NUM_CHIP_TYPES]
+    for code in signature:
+        counts[code >= NUM_CHIP_TYPES][code % NUM_CHIP_TYPES] += 1
+    for t in WINNER_ORDER:
+        if counts[True][t] != counts[False][t]:
+            return PLAYER_WIN if counts[True][t] > counts[False][t] else AI_WIN
+    return DRAW
+
+def is_terminal(signature):
+    """一方没有棋子"""
+    sides = {code >= NUM_CHIP_TYPES for code in signature}
+    return len(sides) < 2
+
+def rank(squares):
+    """
+    格子元组在所有排列中的字典序（与 itertools.permutations(range(SQUARES), n) 的顺序一致）
+    squares: (..., n) 的整数数组，支持批量
+    """
+    squares = np.asarray(squares, dtype=np.int64)
+    n = squares.shape[-1]
+    index = np.zeros(squares.shape[:-1], dtype=np.int64)
+    for j in range(n):
+        digit = squares[..., j].copy()
+        for i in range(j):
+            digit -= squares[..., i] < squares[..., j]
+        index = index * (SQUARES - j) + digit
+    return index
+
+def signatures(max_pieces):
+    """双方都有棋子、总数不超过 max_pieces 的全部签名（子力少的在前）"""
+    codes = range(2 * NUM_CHIP_TYPES)
+    result = []
+    for n in range(2, max_pieces + 1):
+        for signature in itertools.combinations_with_replacement(codes, n):
+            if not is_terminal(signature):
+                result.append(signature)
+    return result
+
+# -------- 生成 --------
+class _Table:
+    """
+    生成期间的一张表（一个签名）
+      - moves[行动方]: [(行号, 后继签名, 后继编号 / 终局值), ...]，行号为 squares 中的下标
+    """
+    def __init__(self, signature):
+        self.signature = signature
+        n = len(signature)
+        self.squares = np.array(list(itertools.permutations(range(SQUARES), n)), dtype=np.int64)
+        self.size = len(self.squares)
+        self.moves = [self._moves(False), self._moves(True)]
+
+    def _child(self, rows, removed, moved, targets):
+        """移除 removed 中的棋子、把 moved 号棋子移到 targets 后的 (后继签名, 编号或终局值)"""
+        keep = [j for j in range(len(self.signature)) if j not in removed]
+        signature = tuple(self.signature[j] for j in keep)
+        if is_terminal(signature):
+            return signature, static_value(signature)
+        squares = self.squares[rows].copy()
+        if moved is not None:
+            squares[:, moved] = targets
+        return signature, rank(squares[:, keep])
+
+    def _moves(self, mover):
+        moves = []
+        squares = self.squares
+        for j, code in enumerate(self.signature):
+            if (code >= NUM_CHIP_TYPES) != mover:
+                continue
+            for d in range(len(DIRECTIONS)):
+                targets = _STEP[squares[:, j], d]
+                occupant = np.full(self.size, -1)
+                for i in range(len(self.signature)):
+                    if i != j:
+                        occupant[squares[:, i] == targets] = i
+                rows = np.nonzero((targets >= 0) & (occupant == -1))[0]
+                moves.append((rows,) + self._child(rows, (), j, targets[rows]))
+                for i, other in enumerate(self.signature):
+                    if (other >= NUM_CHIP_TYPES) == mover:
+                        continue  # 己方棋子挡路
+                    rows = np.nonzero(occupant == i)[0]
+                    if not len(rows):
+                        continue
+                    outcome = COMBAT_TABLE[code % NUM_CHIP_TYPES][other % NUM_CHIP_TYPES]
+                    if outcome == ATTACK_SUCCESS:
+                        child = self._child(rows, (i,), j, targets[rows])
+                    elif outcome == ATTACK_FAIL:
+                        child = self._child(rows, (j,), None, None)
+                    else:
+                        child = self._child(rows, (i, j), None, None)
+                    moves.append((rows,) + child)
+        return moves
+
+    def step(self, previous):
+        """由剩余 k-1 步的值（previous: {签名: 数组}）算出剩余 k 步的值"""
+        values = np.empty(2 * self.size, dtype=np.int8)
+        for mover in (False, True):
+            # 玩家取最大，AI 取最小；后继局面由另一方行动
+            best = np.full(self.size, -2 if mover else 2, dtype=np.int8)
+            better = np.maximum if mover else np.minimum
+            for rows, signature, child in self.moves[mover]:
+                if is_terminal(signature):
+                    child_values = child
+                else:
+                    child_table = previous[signature]
+                    child_values = child_table[(0 if mover else len(child_table) // 2) + child]
+                best[rows] = better(best[rows], child_values)
+            values[mover * self.size:(mover + 1) * self.size] = best
+        return values
+
+def build(max_pieces=MAX_PIECES, log=print):
+    """
+    逆推生成 max_pieces 子以内的全部残局表
+    返回: {签名: np.uint8 数组}，每个字节 = (值 + 1) | (值稳定起的剩余回合数 << 2)
+    不建模无动作（跳过回合）：3 子以内非终局的行动方总有合法动作，step 中的 ±2 哨兵不会留下；
+    子数更多时需要先加入无动作的后继与无动作计数
+    """
+    if max_pieces > MAX_PIECES:
+        raise ValueError(f"tablebase does not model idle turns; max_pieces must be at most {MAX_PIECES}")
+    start = time.perf_counter()
+    tables = {signature: _Table(signature) for signature in signatures(max_pieces)}
+    log(f"{len(tables)} tables, {sum(2 * t.size for t in tables.values())} positions "
+        f"({time.perf_counter() - start:.1f}s)")
+    values = {signature: np.full(2 * table.size, static_value(signature), dtype=np.int8)
+              for signature, table in tables.items()}
+    changed_at = {signature: np.zeros(2 * table.size, dtype=np.int16) for signature, table in tables.items()}
+    for plies in range(1, MAX_PLIES + 1):
+        current = {signature: table.step(values) for signature, table in tables.items()}
+        changed = 0
+        for signature, new in current.items():
+            diff = new != values[signature]
+            changed_at[signature][diff] = plies
+            changed += int(diff.sum())
+        values = current
+        log(f"plies {plies}: {changed} changed ({time.perf_counter() - start:.1f}s)")
+        if not changed:
+            break  # 已是不动点，更多的剩余步数不再改变任何值
+    # 稳定起点按回合（两步）向上取整存储，查询时略保守
+    return {signature: ((values[signature].astype(np.int16) + 1) | ((changed_at[signature] + 1) // 2 << 2)
+                        ).astype(np.uint8) for signature in tables}
+
+def save(path, tables):
+    """写入单个文件：魔数 + 头部长度 + JSON 头部（签名 -> [偏移, 长度]）+ 各表数据"""
+    header, offset = {}, 0
+    for signature, data in tables.items():
+        header[",".join(map(str, signature))] = [offset, len(data)]
+        offset += len(data)
+    encoded = json.dumps(header).encode()
+    with open(path, "wb") as f:
+        f.write(_MAGIC)
+        f.write(len(encoded).to_bytes(4, "little"))
+        f.write(encoded)
+        for data in tables.values():
+            f.write(data.tobytes())
+
+# -------- 查询 --------
+def remaining_plies(state):
+    """距回合上限还能行动的单方步数"""
+    return 2 * (MAX_TURNS - state.turn_count) - (not state.player_to_move)
+
+class Tablebase:
+    """
+    内存映射的残局库文件（只读，按需分页，多个进程可共享）
+      - tables: {签名: (数据起点, 长度)}
+    """
+    def __init__(self, path):
+        with open(path, "rb") as f:
+            if f.read(len(_MAGIC)) != _MAGIC:
+                raise ValueError(f"not a tablebase file: {path}")
+            length = int.from_bytes(f.read(4), "little")
+            header = json.loads(f.read(length))
+        base = len(_MAGIC) + 4 + length
+        self.data = np.memmap(path, dtype=np.uint8, mode="r")
+        self.tables = {tuple(int(code) for code in key.split(",")): (base + offset, size)
+                       for key, (offset, size) in header.items()}
+        self.max_pieces = max((len(signature) for signature in self.tables), default=0)
+
+    def probe(self, pieces, player_to_move, plies):
+        """
+        pieces: [(is_player, type_id, sq), ...]；plies: 距回合上限还能行动的单方步数
+        返回: 玩家视角的值 PLAYER_WIN / DRAW / AI_WIN，不在库中或剩余步数不足以确定时返回 None
+        """
+        pieces = sorted((piece_code(is_player, type_id), sq) for is_player, type_id, sq in pieces)
+        signature = tuple(code for code, _ in pieces)
+        if plies <= 0 or is_terminal(signature):
+            return static_value(signature)
+        table = self.tables.get(signature)
+        if table is None:
+            return None
+        start, size = table
+        index = player_to_move * (size // 2) + int(rank([sq for _, sq in pieces]))
+        entry = int(self.data[start + index])
+        if plies < 2 * (entry >> 2):
+            return None
+        return (entry & 3) - 1
+
+def known_types(state, is_player=False):
+    """
+    is_player 一方眼中全部棋子的类型 {Chip: type_id}（对方棋子按身份后验）
+    有对方棋子身份不确定时返回 None
+    """
+    if is_player:
+        belief = BeliefTracker(state.knowledge[True])
+        belief.update()
+    else:
+        from .ai_pro import beliefs
+        belief = beliefs(state)
+    types = {}
+    for row in state.board:
+        for chip in row:
+            if chip is None:
+                continue
+            if chip.is_player == is_player:
+                types[chip] = chip.type_id
+                continue
+            probs = belief.distribution(chip)
+            t = int(probs.argmax())
+            if probs[t] < 1 - 1e-9:
+                return None
+            types[chip] = t
+    return types
+
+def choose_action(tablebase, state, is_player=False):
+    """
+    残局库决策：局面在库中、剩余步数足以确定其值且对方身份已确定时，返回保持该值的动作
+    返回: ((sr, sc, tr, tc) 或 None, 玩家视角的值)，无法由残局库决定时返回 None
+    """
+    if sum(map(int.bit_count, state.occupancy)) > tablebase.max_pieces:
+        return None
+    types = known_types(state, is_player)
+    if types is None:
+        return None
+    pieces = {}
+    for sq in iter_bits(state.occupancy[0] | state.occupancy[1]):
+        r, c = SQUARE_POS[sq]
+        chip = state.board[r][c]
+        pieces[sq] = (chip.is_player, types[chip])
+    plies = remaining_plies(state)
+    value = tablebase.probe([piece + (sq,) for sq, piece in pieces.items()], is_player, plies)
+    if value is None:
+        return None
+    actions = state.legal_actions(is_player)
+    if not actions:
+        return None, value
+    for action in actions:
+        child = _after(pieces, action)
+        if tablebase.probe(child, not is_player, plies - 1) == value:
+            return action, value
+    return None  # 达到该值的后继局面剩余步数不足，交给搜索
+
+def _after(pieces, action):
+    """按已知类型执行动作后的棋子列表 [(is_player, type_id, sq), ...]"""
+    sr, sc, tr, tc = action
+    s, t = square(sr, sc), square(tr, tc)
+    pieces = dict(pieces)
+    mover = pieces.pop(s)
+    target = pieces.get(t)
+    if target is None or COMBAT_TABLE[mover[1]][target[1]] == ATTACK_SUCCESS:
+        pieces[t] = mover
+    elif COMBAT_TABLE[mover[1]][target[1]] != ATTACK_FAIL:
+        del pieces[t]  # 融合
+    return [piece + (sq,) for sq, piece in pieces.items()]
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="生成 KOF 残局库（逆推分析）")
+    parser.add_argument("output", help="输出文件路径")
+    parser.add_argument("--pieces", type=int, default=MAX_PIECES, help=f"双方棋子总数上限（默认且至多 {MAX_PIECES}）")
+    args = parser.parse_args(argv)
+    save(args.output, build(args.pieces))
+
+if __name__ == "__main__":
+    main()
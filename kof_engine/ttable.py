@@ -0,0 +1,43 @@
+# ttable.py
+# 固定大小的置换表（无 pygame 依赖）：按 Zobrist 键低位直接寻址，O(1) 查找，内存恒定
+
+# 值的类型
+EXACT, LOWER, UPPER = 0, 1, 2
+
+class TranspositionTable:
+    """
+    置换表，每个槽位保存一个条目 (key, depth, value, flag, move, generation)
+      - size_bits: 槽位数为 2**size_bits
+    替换策略：空槽 / 同一局面 / 旧一轮搜索留下的条目 / 新条目深度不小于旧条目时覆盖
+    """
+    def __init__(self, size_bits=16):
+        self.size = 1 << size_bits
+        self.mask = self.size - 1
+        self.slots = [None] * self.size
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+
+    def new_search(self):
+        """开始新一轮搜索（旧条目优先被替换）"""
+        self.generation = (self.generation + 1) & 0xFF
+
+    def probe(self, key):
+        """查找局面，返回 (depth, value, flag, move)，不存在返回 None"""
+        entry = self.slots[key & self.mask]
+        if entry is not None and entry[0] == key:
+            self.hits += 1
+            return entry[1:5]
+        self.misses += 1
+        return None
+
+    def store(self, key, depth, value, flag=EXACT, move=None):
+        """写入局面（按替换策略决定是否覆盖）"""
+        index = key & self.mask
+        entry = self.slots[index]
+        if entry is None or entry[0] == key or entry[5] != self.generation or depth >= entry[1]:
+            self.slots[index] = (key, depth, value, flag, move, self.generation)
+
+    def clear(self):
+        self.slots = [None] * self.size
+        self.hits = self.misses = 0
@@ -0,0 +1,73 @@
+# tune.py
+# 启发式评分权重的自对弈调优（SPSA，无 pygame 依赖）：每轮把全部权重沿随机 ±1 方向同时扰动出两组，
+# 两组之间并行对战若干局（种子固定，结果可复现，与进程数无关），按得分差估计梯度并更新
+# 用法: python -m kof_engine.tune kof_weights.json --iterations 200 --games 32 --workers 8 --seed 1
+import argparse
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from .ai_pro import EvalWeights, DEFAULT_WEIGHTS, CHIP_VALUES
+from .selfplay import play_match, run_tournament
+
+# 权重按默认值的绝对值归一化后再扰动（不同量级的权重使用相同的相对步长）
+_SCALE = [max(abs(x), 1.0) for x in DEFAULT_WEIGHTS.vector()]
+_MIN_CHIP_VALUE = 1.0  # 棋子价值保持为正
+
+def _weights(theta):
+    vector = [t * scale for t, scale in zip(theta, _SCALE)]
+    for i in range(len(CHIP_VALUES)):
+        vector[i] = max(vector[i], _MIN_CHIP_VALUE)
+    return EvalWeights.from_vector(vector)
+
+def spsa(weights=DEFAULT_WEIGHTS, iterations=100, games=32, workers=None, seed=0, a=0.2, c=0.1,
+         output=None, log=print):
+    """
+    weights: 初始权重；games: 每轮两组权重之间的对局数（两局一组交换先后手）
+    a / c: 步长 / 扰动幅度（归一化后），按 SPSA 的标准衰减（a_k = a / (k + 1 + A)^0.602，c_k = c / (k + 1)^0.101）
+    output: 每轮结束后写入当前权重的 JSON 路径（可中途停止），None 表示不写
+    返回: 调优后的 EvalWeights
+    """
+    theta = [x / scale for x, scale in zip(weights.vector(), _SCALE)]
+    rng = random.Random(seed)
+    stability = iterations / 10
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers or os.cpu_count() or 1) as executor:
+        for k in range(iterations):
+            a_k = a / (k + 1 + stability) ** 0.602
+            c_k = c / (k + 1) ** 0.101
+            delta = [rng.choice((-1, 1)) for _ in theta]
+            plus = _weights([t + c_k * d for t, d in zip(theta, delta)])
+            minus = _weights([t - c_k * d for t, d in zip(theta, delta)])
+            results = play_match(executor, ("heuristic", None, plus), ("heuristic", None, minus), games,
+                                 seed * 1_000_000 + k * games)
+            score = sum(s for s, _ in results) / games
+            # plus 与 minus 的得分差 = 2 * score - 1
+            theta = [t + a_k * (2 * score - 1) / (2 * c_k * d) for t, d in zip(theta, delta)]
+            if output:
+                _weights(theta).save(output)
+            log(f"iteration {k + 1}/{iterations}: plus scored {score:.3f} "
+                f"({(k + 1) * games / (time.perf_counter() - start):.1f} games/s)")
+    return _weights(theta)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="KOF 启发式评分权重的自对弈调优（SPSA，多进程）")
+    parser.add_argument("output", help="输出的权重 JSON 路径（Pro 版本启动时读取 settings.AI_WEIGHTS）")
+    parser.add_argument("--start", default=None, help="初始权重 JSON（默认使用内置权重）")
+    parser.add_argument("--iterations", type=int, default=100, help="SPSA 轮数（默认 100）")
+    parser.add_argument("--games", type=int, default=32, help="每轮对局数（默认 32）")
+    parser.add_argument("--workers", type=int, default=None, help="进程数（默认 CPU 核数）")
+    parser.add_argument("--seed", type=int, default=0, help="随机种子（默认 0）")
+    parser.add_argument("--verify", type=int, default=200, help="结束后与内置权重对战的局数（0 表示不验证）")
+    args = parser.parse_args(argv)
+    weights = EvalWeights.load(args.start) if args.start else DEFAULT_WEIGHTS
+    tuned = spsa(weights, args.iterations, args.games, args.workers, args.seed, output=args.output)
+    tuned.save(args.output)
+    if args.verify:
+        stats = run_tournament(("heuristic", None, tuned), ("heuristic", None, DEFAULT_WEIGHTS), args.verify,
+                               args.workers, seed=args.seed + 1_000_000_007)
+        print(f"tuned vs default: +{stats['wins']} ={stats['draws']} -{stats['losses']}, "
+              f"Elo {stats['elo']:+.1f} (95% CI {stats['elo_low']:+.1f} .. {stats['elo_high']:+.1f})")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+# zobrist.py
+# Zobrist 哈希键（无 pygame 依赖）：棋子摆放 + defeat 标签、行动方、AI 的身份约束
+# 使用固定种子生成，保证不同进程（根并行、自对弈）得到相同的键
+import random
+from .rules import MAX_TURNS
+from .bitboard import SQUARES
+from .chip import encode_chip
+
+_rng = random.Random(0x4B4F46)
+# PIECE_KEYS[格子][棋子编码]（编码含类型、阵营与 defeat，见 chip.encode_chip），空格为 0
+PIECE_KEYS = [[0] + [_rng.getrandbits(64) for _ in range(255)] for _ in range(SQUARES)]
+SIDE_KEY = _rng.getrandbits(64)  # AI 行动时异或
+# KNOWLEDGE_KEYS[格子][可能类型掩码]：该格玩家棋子在 AI 眼中的约束
+KNOWLEDGE_KEYS = [[_rng.getrandbits(64) for _ in range(128)] for _ in range(SQUARES)]
+# DEAD_KEYS[可能类型掩码][第几个相同掩码]：AI 记录的已阵亡玩家棋子
+DEAD_KEYS = [[_rng.getrandbits(64) for _ in range(16)] for _ in range(128)]
+# PLY_KEYS[距回合上限的剩余单方步数]：不计入 GameState.key，回合上限附近的搜索按剩余步数区分局面
+PLY_KEYS = [_rng.getrandbits(64) for _ in range(2 * MAX_TURNS + 1)]
+
+def cell_key(sq, chip, tracker):
+    """单个格子的哈希分量（tracker 为 AI 一方的 IdentityTracker）"""
+    if chip is None:
+        return 0
+    key = PIECE_KEYS[sq][encode_chip(chip)]
+    if chip.is_player:
+        key ^= KNOWLEDGE_KEYS[sq][tracker.mask(chip)]
+    return key
+
+def dead_key(tracker):
+    """已阵亡棋子约束的哈希分量（与顺序无关）"""
+    key = 0
+    seen = {}
+    for mask in tracker.dead:
+        n = seen.get(mask, 0)
+        key ^= DEAD_KEYS[mask][n]
+        seen[mask] = n + 1
+    return key
+
+def full_hash(state):
+    """从头计算局面的哈希值"""
+    tracker = state.knowledge[False]
+    key = dead_key(tracker)
+    for r, row in enumerate(state.board):
+        for c, chip in enumerate(row):
+            key ^= cell_key(r * len(row) + c, chip, tracker)
+    if not state.player_to_move:
+        key ^= SIDE_KEY
+    return key
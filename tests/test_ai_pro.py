@@ -0,0 +1,29 @@
+# test_ai_pro.py
+# ai_pro 评分：跨回合复用的身份后验与 TurnMaps（ai_memory）给出的评分与从头计算完全一致
+import random
+import pytest
+from kof_engine import ai_pro
+from kof_engine.state import GameState
+from kof_engine.opponent import DEFAULT_MODEL
+
+def fresh_scores(state):
+    """从头计算的评分（复制局面与身份约束，ai_memory 为空）"""
+    return {a[1:5]: a[0] for a in ai_pro.get_all_possible_actions(state.copy(knowledge=True))}
+
+@pytest.mark.parametrize("seed", range(8))
+@pytest.mark.parametrize("behaviour", [None, DEFAULT_MODEL])
+def test_reused_memory_scores_match_fresh(seed, behaviour):
+    rng = random.Random(seed)
+    state = GameState()
+    state.random_init(rng)
+    state.knowledge[False].behaviour = behaviour
+    while state.result() is None:
+        side = state.player_to_move
+        actions = state.legal_actions(side)
+        if not side:
+            scores = {a[1:5]: a[0] for a in ai_pro.get_all_possible_actions(state)}
+            assert scores == fresh_scores(state)
+        action = rng.choice(actions) if actions else None
+        if action is not None:
+            state.apply_action(*action)
+        state.end_turn(side, action is not None)
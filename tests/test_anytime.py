@@ -0,0 +1,44 @@
+# test_anytime.py
+# anytime.think 的预算与行动方处理
+import random
+import pytest
+from kof_engine.state import GameState
+from kof_engine.parallel import ParallelSearcher
+from kof_engine.anytime import think, DEFAULT_ITERATIONS
+
+def test_parallel_search_requires_budget():
+    state = GameState()
+    state.random_init(random.Random(0))
+    with ParallelSearcher(1) as searcher:
+        with pytest.raises(ValueError):
+            searcher.search(state, False, None, None)
+
+def test_parallel_think_without_budget_uses_default_iterations():
+    state = GameState()
+    state.random_init(random.Random(0))
+    with ParallelSearcher(2) as searcher:
+        action, stats = think(state, "ismcts", False, searcher=searcher, rng=random.Random(0))
+    assert state.is_legal(False, action)
+    assert stats["nodes"] == DEFAULT_ITERATIONS
+
+@pytest.mark.parametrize("seed", range(10))
+@pytest.mark.parametrize("is_player", [False, True])
+def test_heuristic_returns_move_for_requested_side(seed, is_player):
+    rng = random.Random(seed)
+    state = GameState()
+    state.random_init(rng)
+    for _ in range(2 * seed):  # 走几步，使双方都有不同的局面
+        side = state.player_to_move
+        actions = state.legal_actions(side)
+        action = rng.choice(actions) if actions else None
+        if action is not None:
+            state.apply_action(*action)
+        state.end_turn(side, action is not None)
+    action, _ = think(state, "heuristic", is_player, rng=rng)
+    assert action is None or state.is_legal(is_player, action)
+
+def test_learned_requires_model():
+    state = GameState()
+    state.random_init(random.Random(0))
+    with pytest.raises(ValueError, match="requires a model"):
+        think(state, "learned")
@@ -0,0 +1,41 @@
+# test_batch.py
+# 向量化批量模拟与 GameState 逐步一致：合法动作、战斗结算后的棋盘、结束判定与结果
+import random
+import numpy as np
+import pytest
+from kof_engine.rules import DIRECTIONS
+from kof_engine.bitboard import SQUARE_POS, SQUARES, square
+from kof_engine.state import GameState
+from kof_engine.tablebase import piece_code
+from kof_engine.batch import BatchGames, EMPTY, N_DIRECTIONS
+
+RESULT_VALUES = {"Player": 1, "Draw": 0, "AI": -1}
+
+def board_codes(state):
+    return [piece_code(chip.is_player, chip.type_id) if chip else EMPTY
+            for chip in (state.board[r][c] for r, c in SQUARE_POS)]
+
+@pytest.mark.parametrize("seed", range(30))
+def test_batch_game_follows_game_state(seed):
+    rng = random.Random(seed)
+    state = GameState()
+    state.random_init(rng)
+    sim = BatchGames.from_state(state, 1)
+    while state.result() is None:
+        assert not sim.done[0]
+        side = state.player_to_move
+        actions = state.legal_actions(side)
+        legal = sim.legal_mask()
+        assert legal.sum() == len(actions)
+        action = rng.choice(actions) if actions else None
+        index = 0
+        if action is not None:
+            sr, sc, tr, tc = action
+            index = square(sr, sc) * N_DIRECTIONS + DIRECTIONS.index((tr - sr, tc - sc))
+            assert legal[0, index]
+            state.apply_action(*action)
+        state.end_turn(side, action is not None)
+        sim.step(lambda games, legal, rng: np.array([index]))
+        assert list(sim.board[0, :SQUARES]) == board_codes(state)
+    assert sim.done[0]
+    assert sim.winner[0] == RESULT_VALUES[state.result().split()[0]]
@@ -0,0 +1,115 @@
+# test_belief.py
+# 精确后验（计数 DP）与暴力枚举全部一致分配的结果对照；期望信息增益与枚举出的联合分布熵的减少量对照
+import itertools
+import math
+import random
+import numpy as np
+import pytest
+from kof_engine.rules import NUM_CHIP_TYPES, NO_DEFEAT
+from kof_engine.knowledge import START_COUNTS, ALL_TYPES, types_of
+from kof_engine.state import GameState
+from kof_engine.belief import (OBSERVATIONS, BeliefTracker, marginals, count_distribution, conditional,
+                               completions, draw)
+
+N_TOTAL = sum(START_COUNTS)
+
+def random_constraints(rng, n_uncertain):
+    """真实身份为初始阵容的随机排列；n_uncertain 个棋子的掩码放宽为包含真实类型的随机掩码，其余已确定"""
+    truth = [t for t in range(NUM_CHIP_TYPES) for _ in range(START_COUNTS[t])]
+    rng.shuffle(truth)
+    masks = [1 << t for t in truth]
+    for i in rng.sample(range(N_TOTAL), n_uncertain):
+        masks[i] |= rng.randrange(ALL_TYPES + 1)
+    return masks
+
+def assignments(masks):
+    """暴力枚举与掩码及初始阵容一致的全部类型分配"""
+    for types in itertools.product(*(types_of(mask) for mask in masks)):
+        if all(types.count(t) == START_COUNTS[t] for t in range(NUM_CHIP_TYPES)):
+            yield types
+
+@pytest.mark.parametrize("seed", range(10))
+def test_marginals_match_enumeration(seed):
+    rng = random.Random(seed)
+    masks = random_constraints(rng, 6)
+    weights = [np.array([rng.uniform(0.1, 2.0) for _ in range(NUM_CHIP_TYPES)]) for _ in masks]
+    for w in (None, weights):
+        expected = np.zeros((N_TOTAL, NUM_CHIP_TYPES))
+        for types in assignments(masks):
+            weight = 1.0 if w is None else np.prod([w[i][t] for i, t in enumerate(types)])
+            expected[np.arange(N_TOTAL), types] += weight
+        expected /= expected.sum(axis=1, keepdims=True)
+        assert marginals(masks, weights=w) == pytest.approx(expected)
+
+@pytest.mark.parametrize("seed", range(5))
+def test_draw_matches_enumeration(seed):
+    rng = random.Random(50 + seed)
+    masks = random_constraints(rng, 6)
+    weights = [np.array([rng.uniform(0.1, 2.0) for _ in range(NUM_CHIP_TYPES)]) for _ in masks[:10]]  # 其余不加权
+    worlds = {types: np.prod([weights[i][t] for i, t in enumerate(types[:10])]) for types in assignments(masks)}
+    total = sum(worlds.values())
+    backward = completions(masks, weights)
+    n = 4000
+    counts = {}
+    for _ in range(n):
+        types = tuple(draw(masks, backward, weights, rng))
+        assert types in worlds  # 每次抽取都是一致的分配
+        counts[types] = counts.get(types, 0) + 1
+    for types, weight in worlds.items():
+        assert counts.get(types, 0) / n == pytest.approx(weight / total, abs=0.03)
+
+@pytest.mark.parametrize("seed", range(10))
+def test_count_distribution_and_conditional_match_enumeration(seed):
+    rng = random.Random(100 + seed)
+    masks = random_constraints(rng, 6)
+    n_live = rng.randrange(1, N_TOTAL)
+    live, dead = masks[:n_live], masks[n_live:]
+    expected = np.zeros([n + 1 for n in START_COUNTS])
+    first = np.zeros(NUM_CHIP_TYPES)
+    for types in assignments(masks):
+        expected[tuple(types[:n_live].count(t) for t in range(NUM_CHIP_TYPES))] += 1
+        first[types[0]] += 1
+    assert count_distribution(live, dead) == pytest.approx(expected / expected.sum())
+    assert conditional(masks[0], masks[1:]) == pytest.approx(first / first.sum())
+
+def test_inconsistent_constraints_return_none():
+    masks = [1] * (START_COUNTS[0] + 1)  # orichi 比初始阵容多
+    assert marginals(masks) is None
+    assert count_distribution(masks) is None
+    masks += [ALL_TYPES] * (N_TOTAL - len(masks))
+    assert draw(masks, completions(masks)) is None
+
+def entropy(counts):
+    """等概率分配下按观察分组后的熵（比特），counts: 每组的分配数"""
+    total = sum(counts)
+    return -sum(n / total * math.log2(n / total) for n in counts)
+
+@pytest.mark.parametrize("seed", range(5))
+def test_information_gain_matches_enumerated_entropy(seed):
+    rng = random.Random(200 + seed)
+    state = GameState()
+    state.random_init(rng)
+    tracker = state.knowledge[False]
+    chips = list(tracker.allowed)
+    for chip in chips:
+        tracker.allowed[chip] = 1 << chip.type_id
+    for chip in rng.sample(chips, 5):
+        tracker.allowed[chip] |= rng.randrange(ALL_TYPES + 1)
+    belief = BeliefTracker(tracker, use_evidence=False)
+    belief.update()
+    worlds = list(assignments([tracker.allowed[chip] for chip in chips]))
+    attackers = [chip for row in state.board for chip in row if chip and not chip.is_player]
+    for attacker in attackers:
+        attacker.defeat_id = rng.randrange(NO_DEFEAT, NUM_CHIP_TYPES)
+    pairs = [(rng.choice(attackers), i) for i in range(len(chips))]
+    gains = belief.information_gain([a for a, _ in pairs], [chips[i] for _, i in pairs])
+    for (attacker, i), gain in zip(pairs, gains):
+        # 联合分布熵 log2(N) 减去观察后的期望条件熵 sum p(o) log2(N_o)
+        table = OBSERVATIONS[attacker.type_id, attacker.defeat_id + 1]
+        groups = {}
+        for types in worlds:
+            o = int(table[types[i]].argmax())
+            groups[o] = groups.get(o, 0) + 1
+        expected = math.log2(len(worlds)) - sum(n / len(worlds) * math.log2(n) for n in groups.values())
+        assert gain == pytest.approx(expected)
+        assert gain == pytest.approx(entropy(groups.values()))
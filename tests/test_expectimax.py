@@ -0,0 +1,55 @@
+# test_expectimax.py
+# Star1 剪枝 + 置换表的根节点值与不剪枝的朴素 expectimax 一致
+import random
+import pytest
+from kof_engine.state import GameState
+from kof_engine.bitboard import square
+from kof_engine.expectimax import ExpectimaxSearch
+
+def random_position(rng, moves):
+    """随机对局 moves 个单方步后的局面（apply_action 更新身份约束）"""
+    state = GameState()
+    state.random_init(rng)
+    for _ in range(moves):
+        side = state.player_to_move
+        actions = state.legal_actions(side)
+        action = rng.choice(actions) if actions else None
+        if action is not None:
+            state.apply_action(*action)
+        state.end_turn(side, action is not None)
+    return state
+
+def expectimax(searcher, depth, side):
+    """朴素 expectimax：与 ExpectimaxSearch 相同的机会分支与估值，不剪枝、不用置换表"""
+    value = searcher._leaf(depth)
+    if value is not None:
+        return value
+    sim = searcher.sim
+    values = []
+    for action in sim.legal_actions(side) or [None]:
+        target = action and sim.board[action[2]][action[3]]
+        if target is None:
+            sim.make_move(side, action)
+            values.append(expectimax(searcher, depth - 1, not side))
+            sim.unmake_move()
+            continue
+        sr, sc, tr, tc = action
+        attacker = sim.board[sr][sc]
+        enemy_sq = square(sr, sc) if side else square(tr, tc)
+        enemy = attacker if side else target
+        expected = 0.0
+        for p, mask in searcher._branches(attacker, target, side):
+            old = searcher._narrow(enemy_sq, enemy, mask)
+            sim.make_move(side, action)
+            expected += p * expectimax(searcher, depth - 1, not side)
+            sim.unmake_move()
+            searcher._restore(enemy_sq, enemy, old)
+        values.append(expected)
+    return min(values) if side else max(values)
+
+@pytest.mark.parametrize("depth, seeds", [(2, range(8)), (3, range(1))])
+def test_star1_matches_unpruned_expectimax(depth, seeds):
+    for seed in seeds:
+        state = random_position(random.Random(seed), 12)
+        _, value = ExpectimaxSearch(state).search_root(depth)
+        assert value == pytest.approx(expectimax(ExpectimaxSearch(state), depth, False))
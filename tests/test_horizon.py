@@ -0,0 +1,88 @@
+# test_horizon.py
+# 回合上限附近的精确求解：对方身份已知时与完全信息 minimax 一致；置换表键区分搜索中被吃掉的棋子
+import random
+import pytest
+from kof_engine.rules import MAX_TURNS
+from kof_engine.state import GameState
+from kof_engine.horizon import HorizonSolver, HorizonSearch
+
+RESULT_VALUES = {"AI": 1.0, "Draw": 0.0, "Player": -1.0}
+
+def minimax(state, side):
+    """完全信息下的精确值（AI 视角），搜索到 result() 给出结果"""
+    result = state.result()
+    if result is not None:
+        return RESULT_VALUES[result.split()[0]]
+    values = []
+    for action in state.legal_actions(side) or [None]:
+        state.make_move(side, action)
+        values.append(minimax(state, not side))
+        state.unmake_move()
+    return min(values) if side else max(values)
+
+def random_position(rng, moves):
+    """随机对局 moves 个单方步后的局面（未结束），对局已结束返回 None"""
+    state = GameState()
+    state.random_init(rng)
+    for _ in range(moves):
+        side = state.player_to_move
+        actions = state.legal_actions(side)
+        action = rng.choice(actions) if actions else None
+        if action is not None:
+            state.apply_action(*action)
+        state.end_turn(side, action is not None)
+        if state.result() is not None:
+            return None
+    return state
+
+def near_limit(state, plies):
+    """把局面移到距回合上限还剩 plies 个单方步（AI 行动），AI 已知全部玩家棋子的身份"""
+    tracker = state.knowledge[False]
+    for chip in tracker.allowed:
+        tracker.allowed[chip] = 1 << chip.type_id
+    state.turn_count = MAX_TURNS - (plies + 1) // 2
+    state.player_to_move = False
+    state.player_idle_count = state.ai_idle_count = 0
+    state.sync_bitboards()
+    return state
+
+def test_solver_matches_minimax_with_known_identities():
+    rng = random.Random(5)
+    solver = HorizonSolver()
+    checked = 0
+    while checked < 60:
+        state = random_position(rng, rng.choice([30, 50, 70]))
+        if state is None:
+            continue
+        state = near_limit(state, rng.choice([1, 3]))
+        action, value = solver.solve(state, False)
+        assert value == pytest.approx(minimax(state, False))
+        if action is not None:
+            state.make_move(False, action)
+            assert minimax(state, True) == pytest.approx(value)  # 所选动作达到该值
+            state.unmake_move()
+        checked += 1
+
+def test_position_key_includes_chips_captured_in_search():
+    rng = random.Random(3)
+    while True:
+        state = random_position(rng, 20)
+        if state is None:
+            continue
+        state.player_to_move = False
+        state.sync_bitboards()
+        search = HorizonSearch(state)
+        sim = search.sim
+        attacks = [a for a in sim.legal_actions(False) if sim.board[a[2]][a[3]] is not None]
+        if attacks:
+            break
+    sr, sc, tr, tc = attacks[0]
+    victim = sim.board[tr][tc]
+    sim.board[tr][tc] = None  # 模拟搜索中吃掉该棋子（约束仍留在 tracker.allowed）
+    sim.sync_bitboards()
+    key = search.position_key(3)
+    mask = search.tracker.allowed[victim]
+    search.tracker.allowed[victim] = mask & -mask if mask & (mask - 1) else mask ^ 0x7f
+    assert search.position_key(3) != key
+    search.tracker.allowed[victim] = mask
+    assert search.position_key(3) == key
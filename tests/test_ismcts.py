@@ -0,0 +1,40 @@
+# test_ismcts.py
+# 确定化只使用观察方的约束：采样身份落在各棋子的掩码内，约束矛盾时也不会退回到真实身份
+import random
+import pytest
+from kof_engine.rules import NUM_CHIP_TYPES
+from kof_engine.state import GameState
+from kof_engine.belief import BeliefTracker
+from kof_engine.ismcts import determinize
+
+def hidden_types(state, is_player):
+    return {(r, c): chip.type_id for r, row in enumerate(state.board)
+            for c, chip in enumerate(row) if chip and chip.is_player == is_player}
+
+@pytest.mark.parametrize("seed", range(5))
+def test_determinize_respects_masks(seed):
+    rng = random.Random(seed)
+    state = GameState()
+    state.random_init(rng)
+    tracker = state.knowledge[False]
+    for chip in rng.sample(list(tracker.allowed), 10):
+        tracker.allowed[chip] = 1 << chip.type_id
+    det = determinize(state, False, rng)
+    for (r, c), t in hidden_types(det, True).items():
+        assert tracker.mask(state.board[r][c]) >> t & 1
+    assert sorted(hidden_types(det, True).values()) == sorted(hidden_types(state, True).values())
+
+@pytest.mark.parametrize("seed", range(5))
+def test_determinize_never_falls_back_to_true_types(seed):
+    rng = random.Random(seed)
+    state = GameState()
+    state.random_init(rng)
+    tracker = state.knowledge[False]
+    for chip in tracker.allowed:
+        tracker.allowed[chip] = 1 << (chip.type_id + 1) % NUM_CHIP_TYPES  # 与初始阵容矛盾，且不含真实类型
+    assert BeliefTracker(tracker).sample(rng) is None
+    det = determinize(state, False, rng)
+    truth = hidden_types(state, True)
+    for square, t in hidden_types(det, True).items():
+        assert t == (truth[square] + 1) % NUM_CHIP_TYPES
+    assert hidden_types(det, False) == hidden_types(state, False)
@@ -0,0 +1,11 @@
+# test_learned.py
+# 学习评估：训练 / 验证按对局划分
+import numpy as np
+from kof_engine.learned import split_by_game
+
+def test_split_keeps_each_game_on_one_side():
+    seeds = np.repeat(np.arange(50), np.random.default_rng(0).integers(1, 30, 50))
+    valid, train = split_by_game(seeds, 0.2, seed=1)
+    assert len(valid) + len(train) == len(seeds)
+    assert not set(seeds[valid]) & set(seeds[train])
+    assert len(np.unique(seeds[valid])) == 10
@@ -0,0 +1,93 @@
+# test_opponent.py
+# 对方行为模型：拟合与存取、走子时的证据累加、证据对身份后验与 ismcts 确定化的影响
+import math
+import random
+import numpy as np
+import pytest
+from kof_engine.rules import NUM_CHIP_TYPES, MAI, KYO, ATHENA
+from kof_engine.knowledge import BEHAVIOURS, ATTACK, classify_move
+from kof_engine.state import GameState
+from kof_engine.belief import BeliefTracker
+from kof_engine.opponent import OpponentModel, DEFAULT_MODEL
+from kof_engine.ismcts import determinize
+
+def test_fit_and_log_likelihood():
+    counts = np.arange(NUM_CHIP_TYPES * len(BEHAVIOURS)).reshape(NUM_CHIP_TYPES, len(BEHAVIOURS))
+    exposure = np.full(NUM_CHIP_TYPES, 1000)
+    model = OpponentModel.fit(counts, exposure, strength=0.5)
+    for t in range(NUM_CHIP_TYPES):
+        assert model.activity[t] == pytest.approx((counts[t].sum() + 1) / 1002)
+        assert model.likelihood[t] == pytest.approx((counts[t] + 1) / (counts[t] + 1).sum())
+        idle = 0.5 * math.log(1 - model.activity[t])
+        assert model.log_idle[t] == pytest.approx(idle)
+        for b in range(len(BEHAVIOURS)):
+            expected = 0.5 * (math.log(model.activity[t]) + math.log(model.likelihood[t][b])) - idle
+            assert model.log_likelihood[b][t] == pytest.approx(expected)
+
+def test_save_and_load(tmp_path):
+    path = tmp_path / "model.json"
+    DEFAULT_MODEL.save(path)
+    model = OpponentModel.load(path)
+    assert model.activity == DEFAULT_MODEL.activity
+    assert model.likelihood == DEFAULT_MODEL.likelihood
+    assert model.log_likelihood == DEFAULT_MODEL.log_likelihood
+
+@pytest.mark.parametrize("seed", range(5))
+def test_player_moves_accumulate_evidence(seed):
+    rng = random.Random(seed)
+    state = GameState()
+    state.random_init(rng)
+    tracker = state.knowledge[False]
+    tracker.behaviour = DEFAULT_MODEL
+    expected, moves = {}, 0
+    for _ in range(30):
+        side = state.player_to_move
+        actions = state.legal_actions(side)
+        action = rng.choice(actions) if actions else None
+        if action is not None:
+            chip = state.board[action[0]][action[1]]
+            row = DEFAULT_MODEL.log_likelihood[classify_move(state, *action)]
+            state.apply_action(*action)
+            if side:
+                moves += 1
+                if chip in tracker.allowed:
+                    expected[chip] = [a + b for a, b in zip(expected.get(chip, [0.0] * NUM_CHIP_TYPES), row)]
+        state.end_turn(side, action is not None)
+    assert tracker.observed_moves == moves
+    assert state.knowledge[True].observed_moves == 0  # 玩家一方未设置行为模型
+    for chip, ll in expected.items():
+        if chip in tracker.allowed:
+            assert tracker.evidence[chip] == pytest.approx(ll)
+
+def evidence_state(seed):
+    """开局后 AI 观察到某个玩家棋子连续 10 次攻击（其余棋子一直未动），返回 (局面, 该棋子)"""
+    state = GameState()
+    state.random_init(random.Random(seed))
+    tracker = state.knowledge[False]
+    tracker.behaviour = DEFAULT_MODEL
+    chip = next(iter(tracker.allowed))
+    for _ in range(10):
+        tracker.observe_move(chip, ATTACK)
+    return state, chip
+
+@pytest.mark.parametrize("seed", range(3))
+def test_evidence_shifts_posterior(seed):
+    state, chip = evidence_state(seed)
+    tracker = state.knowledge[False]
+    with_model, without_model = BeliefTracker(tracker), BeliefTracker(tracker, use_evidence=False)
+    probs, baseline = with_model.distribution(chip), without_model.distribution(chip)
+    assert probs[MAI] + probs[KYO] > 0.9 > baseline[MAI] + baseline[KYO]
+    # 一直未动的棋子更可能是很少走动的 Athena
+    idle = next(other for other in tracker.allowed if other is not chip)
+    assert with_model.distribution(idle)[ATHENA] > without_model.distribution(idle)[ATHENA]
+
+def test_determinize_samples_the_evidence_posterior():
+    state, chip = evidence_state(0)
+    belief = BeliefTracker(state.knowledge[False])
+    r, c = next((r, c) for r, row in enumerate(state.board) for c, other in enumerate(row) if other is chip)
+    rng = random.Random(0)
+    n = 2000
+    counts = np.zeros(NUM_CHIP_TYPES)
+    for _ in range(n):
+        counts[determinize(state, False, rng, belief).board[r][c].type_id] += 1
+    assert counts / n == pytest.approx(belief.distribution(chip), abs=0.03)
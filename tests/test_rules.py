@@ -0,0 +1,29 @@
+# test_rules.py
+# 7x7 战斗结果表与原版按名称比较的 can_attack 一致
+import pytest
+from kof_engine.rules import (CHIP_NAMES, CHIP_IDS, COMBAT_TABLE, ATTACK_SUCCESS, ATTACK_FAIL, FUSION,
+                              can_attack)
+from kof_engine.chip import Chip
+
+def baseline_can_attack(attacker, defender):
+    """原版 board.can_attack（按名称比较等级）"""
+    hierarchy = ["kyo", "mai", "k", "kula", "yagami", "orichi"]
+    if attacker == "athena" or defender == "athena":
+        return False
+    if attacker == "kyo" and defender == "orichi":
+        return True
+    if attacker == "orichi" and defender == "kyo":
+        return False
+    if attacker == defender:
+        return True
+    return hierarchy.index(attacker) > hierarchy.index(defender)
+
+@pytest.mark.parametrize("attacker", CHIP_NAMES)
+@pytest.mark.parametrize("defender", CHIP_NAMES)
+def test_combat_table_matches_baseline(attacker, defender):
+    outcome = COMBAT_TABLE[CHIP_IDS[attacker]][CHIP_IDS[defender]]
+    if "athena" in (attacker, defender):
+        assert outcome == FUSION  # Athena 与任何棋子同归于尽
+    else:
+        assert outcome == (ATTACK_SUCCESS if baseline_can_attack(attacker, defender) else ATTACK_FAIL)
+    assert can_attack(Chip(attacker, False), Chip(defender, True)) == baseline_can_attack(attacker, defender)
@@ -0,0 +1,25 @@
+# test_selfplay.py
+# 自对弈统计：Elo 区间在任何比分下有限且对称
+import math
+import pytest
+from kof_engine.selfplay import elo_interval
+
+@pytest.mark.parametrize("record", [(10, 0, 0), (0, 0, 10), (0, 7, 0), (1, 0, 0), (427, 0, 373), (40, 20, 30)])
+def test_elo_interval_is_finite_and_contains_estimate(record):
+    rating, low, high = elo_interval(*record)
+    assert all(math.isfinite(x) for x in (rating, low, high))
+    assert low < rating < high
+
+def test_elo_interval_is_symmetric_between_sides():
+    rating, low, high = elo_interval(30, 10, 20)
+    assert elo_interval(20, 10, 30) == pytest.approx((-rating, -high, -low))
+
+def test_elo_interval_narrows_with_more_games():
+    _, low, high = elo_interval(60, 0, 40)
+    _, low10, high10 = elo_interval(600, 0, 400)
+    assert high10 - low10 < high - low
+
+def test_elo_point_estimate_uses_raw_score():
+    rating, low, high = elo_interval(3, 0, 1)
+    assert rating == pytest.approx(-400 * math.log10(1 / 0.75 - 1))  # 约 191
+    assert low < rating < high
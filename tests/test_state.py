@@ -0,0 +1,83 @@
+# test_state.py
+# GameState 的一致性检查：make_move / unmake_move 往返、增量 Zobrist 哈希、增量合法动作与 game.legal_actions
+import random
+import pytest
+from kof_engine import game
+from kof_engine.state import GameState
+from kof_engine.zobrist import full_hash
+from kof_engine.ttable import TranspositionTable, EXACT
+
+SEEDS = range(20)
+
+def snapshot(state):
+    """make / unmake 应精确恢复的全部内容"""
+    return (state.pack(), state.key, list(state.occupancy), list(state.piece_masks),
+            [dict(actions) for actions in state.actions], [list(targets) for targets in state.targets],
+            [[chip and (chip.type_id, chip.is_player, chip.defeat_id) for chip in row] for row in state.board])
+
+def random_moves(state, rng, apply=False):
+    """随机对局直到结束，每步之前产出行动方；apply=True 时用 apply_action（更新身份约束）"""
+    while state.result() is None:
+        side = state.player_to_move
+        yield side
+        actions = state.legal_actions(side)
+        action = rng.choice(actions) if actions and rng.random() > 0.05 else None
+        if apply:
+            if action is not None:
+                state.apply_action(*action)
+            state.end_turn(side, action is not None)
+        else:
+            state.make_move(side, action)
+
+@pytest.mark.parametrize("seed", SEEDS)
+def test_make_unmake_round_trip(seed):
+    rng = random.Random(seed)
+    state = GameState()
+    state.random_init(rng)
+    history = [snapshot(state) for _ in random_moves(state, rng)]  # 每步之前的局面
+    while history:
+        state.unmake_move()
+        assert snapshot(state) == history.pop()
+    assert not state.undo_stack
+
+@pytest.mark.parametrize("seed", SEEDS)
+@pytest.mark.parametrize("apply", [False, True])
+def test_incremental_key_matches_full_hash(seed, apply):
+    rng = random.Random(seed)
+    state = GameState()
+    state.random_init(rng)
+    assert state.key == full_hash(state)
+    for _ in random_moves(state, rng, apply):
+        assert state.key == full_hash(state)
+    assert state.key == full_hash(state)
+
+@pytest.mark.parametrize("seed", SEEDS)
+def test_key_distinguishes_side_to_move(seed):
+    state = GameState()
+    state.random_init(random.Random(seed))
+    other = state.copy(knowledge=True)
+    other.player_to_move = False
+    other.key = full_hash(other)
+    assert state.key != other.key
+
+def test_transposition_table_replacement():
+    tt = TranspositionTable(size_bits=3)
+    tt.store(1, 5, 0.5, EXACT, (0, 0, 1, 0))
+    tt.store(9, 2, -0.5)  # 同一槽位、同一轮搜索、深度更浅：不覆盖
+    assert tt.probe(1) == (5, 0.5, EXACT, (0, 0, 1, 0))
+    assert tt.probe(9) is None
+    tt.new_search()
+    tt.store(9, 2, -0.5)  # 旧一轮的条目优先被替换
+    assert tt.probe(9) == (2, -0.5, EXACT, None)
+    assert tt.probe(1) is None
+
+@pytest.mark.parametrize("seed", SEEDS)
+@pytest.mark.parametrize("apply", [False, True])
+def test_legal_actions_match_baseline(seed, apply):
+    rng = random.Random(seed)
+    state = GameState()
+    state.random_init(rng)
+    for _ in random_moves(state, rng, apply):
+        for side in (True, False):
+            assert sorted(state.legal_actions(side)) == sorted(game.legal_actions(state.board, side))
+            assert state.has_chips(side) == game.has_chips(state.board, side)
@@ -0,0 +1,61 @@
+# test_tablebase.py
+# 残局库与完全信息下的暴力 minimax 对照（随机的 2~3 子局面，距回合上限 1~3 回合）
+import random
+import pytest
+from kof_engine import tablebase
+from kof_engine.rules import CHIP_NAMES, MAX_TURNS
+from kof_engine.chip import Chip
+from kof_engine.bitboard import SQUARE_POS, SQUARES
+from kof_engine.state import GameState
+
+RESULT_VALUES = {"Player": tablebase.PLAYER_WIN, "Draw": tablebase.DRAW, "AI": tablebase.AI_WIN}
+
+@pytest.fixture(scope="module")
+def tb(tmp_path_factory):
+    path = tmp_path_factory.mktemp("tablebase") / "kof_endgame.tb"
+    tablebase.save(path, tablebase.build(log=lambda *args: None))
+    return tablebase.Tablebase(path)
+
+def minimax(state, side):
+    """完全信息下的精确值（玩家视角），搜索到 result() 给出结果"""
+    result = state.result()
+    if result is not None:
+        return RESULT_VALUES[result.split()[0]]
+    values = []
+    for action in state.legal_actions(side) or [None]:
+        state.make_move(side, action)
+        values.append(minimax(state, not side))
+        state.unmake_move()
+    return max(values) if side else min(values)
+
+def random_endgame(rng):
+    state = GameState()
+    n = rng.choice([2, 3])
+    sides = [False, True] + [rng.random() < 0.5 for _ in range(n - 2)]
+    for sq, side in zip(rng.sample(range(SQUARES), n), sides):
+        r, c = SQUARE_POS[sq]
+        state.board[r][c] = Chip(rng.choice(CHIP_NAMES), side)
+    state.player_to_move = rng.random() < 0.5
+    state.turn_count = MAX_TURNS - rng.choice([1, 2, 3])
+    for tracker in state.knowledge:
+        tracker.reset(state.board)
+    state.sync_bitboards()
+    return state
+
+def test_probe_matches_minimax(tb):
+    rng = random.Random(1)
+    checked = 0
+    for _ in range(200):
+        state = random_endgame(rng)
+        pieces = [(chip.is_player, chip.type_id, sq) for sq, (r, c) in enumerate(SQUARE_POS)
+                  for chip in [state.board[r][c]] if chip]
+        value = tb.probe(pieces, state.player_to_move, tablebase.remaining_plies(state))
+        if value is None:
+            continue  # 剩余步数不足以确定值
+        assert value == minimax(state, state.player_to_move), pieces
+        checked += 1
+    assert checked >= 50
+
+def test_build_rejects_more_pieces_than_modelled():
+    with pytest.raises(ValueError):
+        tablebase.build(tablebase.MAX_PIECES + 1)